@@ -25,4 +25,8 @@ def create_app():
     app.register_blueprint(main)
     app.register_blueprint(auth)
 
+    # Cola de impresión en segundo plano
+    from app.print_spooler import print_spooler
+    print_spooler.init_app(app)
+
     return app
\ No newline at end of file
@@ -0,0 +1,92 @@
+"""
+Día de operación (jornada) de ingresos y asistencias
+La jornada empieza a Config.BUSINESS_DAY_START_HOUR en lugar de a las 00:00,
+así un turno nocturno que termina a las 3 de la mañana sigue contando para
+el día en que empezó. El día se guarda en la columna business_day de vehicle
+y attendance (con índice), de modo que "hoy" es una búsqueda por igualdad en
+lugar de DATE(columna) = ?, que no puede usar ningún índice.
+"""
+
+from datetime import datetime, time, timedelta
+from sqlalchemy import text
+from config import Config
+
+
+def business_day(moment, start_hour=None):
+    """
+    Jornada a la que pertenece un momento
+
+    Args:
+        moment: datetime
+        start_hour: hora de inicio de la jornada (None = la de Config)
+
+    Returns:
+        date: día de la jornada (None si moment es None)
+    """
+    if moment is None:
+        return None
+    if start_hour is None:
+        start_hour = Config.BUSINESS_DAY_START_HOUR
+    return (moment - timedelta(hours=start_hour)).date()
+
+
+def current_business_day():
+    """Jornada actual"""
+    return business_day(datetime.now())
+
+
+def business_day_range(day):
+    """
+    Rango [inicio, fin) de una jornada
+
+    Args:
+        day: date de la jornada
+
+    Returns:
+        tuple: (datetime de inicio, datetime del inicio de la jornada siguiente)
+    """
+    start = datetime.combine(day, time(hour=Config.BUSINESS_DAY_START_HOUR))
+    return start, start + timedelta(days=1)
+
+
+def column_default(time_column):
+    """
+    Default de business_day calculado desde otra columna de la misma fila
+
+    Se evalúa al insertar (ORM o Core), después del default de time_column,
+    así que también funciona si la hora la pone datetime.now.
+    """
+    def default(context):
+        return business_day(context.get_current_parameters().get(time_column))
+    return default
+
+
+# Tablas con día de jornada y la columna de la que se calcula
+BUSINESS_DAY_COLUMNS = {
+    'vehicle': 'entry_time',
+    'attendance': 'login_time',
+}
+
+
+def backfill_business_days(conn, start_hour=None):
+    """
+    Recalcular business_day de todas las filas de vehicle y attendance
+
+    Args:
+        conn: conexión o sesión de SQLAlchemy (el llamador hace el commit)
+        start_hour: hora de inicio de la jornada (None = la de Config)
+
+    Returns:
+        dict: {tabla: filas actualizadas}
+    """
+    if start_hour is None:
+        start_hour = Config.BUSINESS_DAY_START_HOUR
+
+    updated = {}
+    for table, time_column in BUSINESS_DAY_COLUMNS.items():
+        result = conn.execute(text(
+            f"UPDATE {table} SET business_day = date({time_column}, :shift) "
+            f"WHERE {time_column} IS NOT NULL"
+        ), {'shift': f'-{int(start_hour)} hours'})
+        updated[table] = result.rowcount
+    return updated
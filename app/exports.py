@@ -0,0 +1,150 @@
+"""
+Exportaciones en streaming (CSV y NDJSON)
+Las filas se leen de la base en lotes (yield_per) y se envían al navegador a
+medida que se generan, así que la memoria usada no depende de la cantidad de
+filas exportadas. Las consultas seleccionan solo las columnas necesarias
+(con JOIN a user cuando hace falta) en lugar de cargar objetos del ORM.
+"""
+
+import csv
+import json
+from collections import namedtuple
+from datetime import date, datetime
+from flask import Response, current_app, stream_with_context
+from app.models.models import monthly_status
+from app.monthly_clients import STATUS_LABELS
+
+# Columna exportada: encabezado CSV, clave NDJSON, función fila -> valor y,
+# opcionalmente, otra función para NDJSON (valores sin formatear)
+ExportColumn = namedtuple('ExportColumn', ['header', 'key', 'value', 'raw'], defaults=[None])
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+
+
+class _LineWriter:
+    """Destino de csv.writer que devuelve la línea en lugar de guardarla"""
+
+    def write(self, line):
+        return line
+
+
+def _json_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _csv_lines(rows, columns):
+    writer = csv.writer(_LineWriter())
+    yield writer.writerow([col.header for col in columns])
+    for row in rows:
+        yield writer.writerow(['' if v is None else v for v in (col.value(row) for col in columns)])
+
+
+def _ndjson_lines(rows, columns):
+    for row in rows:
+        record = {col.key: _json_value((col.raw or col.value)(row)) for col in columns}
+        yield json.dumps(record, ensure_ascii=False) + '\n'
+
+
+def _batched(lines, size):
+    """Agrupar líneas para no escribir una por una en el socket"""
+    buffer = []
+    for line in lines:
+        buffer.append(line)
+        if len(buffer) >= size:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
+
+
+def stream_export(query, columns, fmt, filename_prefix):
+    """
+    Respuesta que exporta una consulta fila por fila
+
+    Args:
+        query: query de SQLAlchemy (idealmente con with_entities / JOIN)
+        columns: lista de ExportColumn
+        fmt: 'csv' o 'ndjson'
+        filename_prefix: prefijo del archivo descargado
+
+    Returns:
+        Response en streaming, o None si el formato no existe
+    """
+    if fmt not in EXPORT_FORMATS:
+        return None
+
+    mimetype, extension = EXPORT_FORMATS[fmt]
+    batch_size = current_app.config['EXPORT_BATCH_SIZE']
+    rows = query.yield_per(batch_size)
+    lines = _csv_lines(rows, columns) if fmt == 'csv' else _ndjson_lines(rows, columns)
+
+    filename = f"{filename_prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+    return Response(
+        stream_with_context(_batched(lines, batch_size)),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment;filename={filename}"}
+    )
+
+
+# ============================================
+# COLUMNAS DE CADA EXPORTACIÓN
+# ============================================
+
+def _time_or(value, fmt, default):
+    return value.strftime(fmt) if value else default
+
+
+ATTENDANCE_COLUMNS = [
+    ExportColumn('ID', 'id', lambda r: r.id),
+    ExportColumn('Usuario', 'username', lambda r: r.username),
+    ExportColumn('Nombre', 'name', lambda r: r.name),
+    ExportColumn('Rol', 'role', lambda r: r.role),
+    ExportColumn('Fecha', 'date', lambda r: r.login_time.strftime('%Y-%m-%d')),
+    ExportColumn('Hora Entrada', 'login_time', lambda r: r.login_time.strftime('%H:%M:%S'),
+                 lambda r: r.login_time),
+    ExportColumn('Hora Salida', 'logout_time',
+                 lambda r: _time_or(r.logout_time, '%H:%M:%S', 'En curso'),
+                 lambda r: r.logout_time),
+    ExportColumn('Horas Trabajadas', 'total_hours',
+                 lambda r: f"{r.total_hours:.2f}" if r.total_hours else '0.00',
+                 lambda r: round(r.total_hours or 0, 2)),
+    ExportColumn('Estado', 'status', lambda r: 'Completado' if r.logout_time else 'Activo'),
+]
+
+VEHICLE_COLUMNS = [
+    ExportColumn('ID', 'id', lambda r: r.id),
+    ExportColumn('Patente', 'plate', lambda r: r.plate),
+    ExportColumn('Tipo', 'type', lambda r: r.type),
+    ExportColumn('Ingreso', 'entry_time', lambda r: r.entry_time.strftime('%Y-%m-%d %H:%M:%S')),
+    ExportColumn('Salida', 'exit_time',
+                 lambda r: _time_or(r.exit_time, '%Y-%m-%d %H:%M:%S', None)),
+    ExportColumn('Mensual', 'is_monthly', lambda r: bool(r.is_monthly)),
+    ExportColumn('Costo', 'cost', lambda r: r.total_cost),
+    ExportColumn('Operador Ingreso', 'operator', lambda r: r.operator_name),
+    ExportColumn('Operador Salida', 'exit_operator', lambda r: r.exit_operator_name),
+]
+
+
+def _monthly_status(row):
+    status = monthly_status(row.expiration_date, current_app.config['MONTHLY_EXPIRING_DAYS'])
+    return STATUS_LABELS[status]
+
+
+MONTHLY_COLUMNS = [
+    ExportColumn('ID', 'id', lambda r: r.id),
+    ExportColumn('Patente', 'plate', lambda r: r.plate),
+    ExportColumn('Titular', 'owner_name', lambda r: r.owner_name),
+    ExportColumn('Modelo', 'model', lambda r: r.model),
+    ExportColumn('Teléfono', 'phone', lambda r: r.phone),
+    ExportColumn('Tipo', 'vehicle_type', lambda r: r.vehicle_type),
+    ExportColumn('Inicio', 'start_date', lambda r: r.start_date.strftime('%Y-%m-%d')),
+    ExportColumn('Meses', 'duration_months', lambda r: r.duration_months),
+    ExportColumn('Vencimiento', 'expiration_date', lambda r: r.expiration_date.strftime('%Y-%m-%d')),
+    ExportColumn('Estado', 'status', _monthly_status),
+    ExportColumn('Registrado por', 'registered_by', lambda r: r.registered_by or 'Sistema'),
+]
@@ -0,0 +1,445 @@
+"""
+Migraciones versionadas del esquema de la base de datos
+Cada migración tiene un número de versión y se aplica una sola vez; la
+versión aplicada se guarda en la tabla schema_version. Al iniciar, la
+aplicación solo lee ese número y aplica las migraciones pendientes.
+
+Las migraciones usan SQL de SQLite y deben poder ejecutarse dos veces sin
+error (IF NOT EXISTS, verificar columnas antes de agregarlas), porque SQLite
+confirma las sentencias DDL aunque la migración falle a mitad de camino.
+
+Ejecutar a mano: python migrate.py
+"""
+
+import os
+import shutil
+from collections import namedtuple
+from datetime import datetime
+from sqlalchemy import inspect, text
+
+Migration = namedtuple('Migration', ['version', 'description', 'upgrade', 'vacuum'])
+
+MIGRATIONS = []
+
+
+def migration(version, description, vacuum=False):
+    """
+    Registrar una migración
+
+    Args:
+        version: número de versión (consecutivo)
+        description: texto que se muestra al aplicarla
+        vacuum: True si después hay que compactar la base (VACUUM)
+    """
+    def decorator(func):
+        MIGRATIONS.append(Migration(version, description, func, vacuum))
+        MIGRATIONS.sort(key=lambda m: m.version)
+        return func
+    return decorator
+
+
+# ============================================
+# UTILIDADES PARA LAS MIGRACIONES
+# ============================================
+
+def _table_exists(conn, table):
+    return inspect(conn).has_table(table)
+
+
+def _columns(conn, table):
+    return [col['name'] for col in inspect(conn).get_columns(table)]
+
+
+def _add_column(conn, table, column, definition):
+    """Agregar una columna si todavía no existe"""
+    if column in _columns(conn, table):
+        return False
+    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {definition}"))
+    return True
+
+
+# ============================================
+# MIGRACIONES
+# ============================================
+
+@migration(1, "Esquema inicial (usuarios, vehículos, mensuales, asistencias)")
+def _initial_schema(conn):
+    # Reemplaza a db.create_all() y a migrate_add_attendance.py
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS user (
+            id INTEGER NOT NULL,
+            username VARCHAR(64) NOT NULL,
+            password_hash VARCHAR(128),
+            name VARCHAR(100),
+            role VARCHAR(20),
+            PRIMARY KEY (id),
+            UNIQUE (username)
+        )
+    """))
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS vehicle (
+            id INTEGER NOT NULL,
+            plate VARCHAR(10) NOT NULL,
+            type VARCHAR(10) NOT NULL,
+            entry_time DATETIME,
+            exit_time DATETIME,
+            qr_code TEXT,
+            is_monthly BOOLEAN,
+            total_cost FLOAT,
+            operator_name VARCHAR(64),
+            exit_operator_name VARCHAR(64),
+            PRIMARY KEY (id)
+        )
+    """))
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS monthly_client (
+            id INTEGER NOT NULL,
+            plate VARCHAR(10) NOT NULL,
+            owner_name VARCHAR(100) NOT NULL,
+            model VARCHAR(50),
+            phone VARCHAR(20),
+            start_date DATETIME NOT NULL,
+            duration_months INTEGER,
+            vehicle_type VARCHAR(10) NOT NULL,
+            created_at DATETIME,
+            registered_by VARCHAR(64),
+            PRIMARY KEY (id),
+            UNIQUE (plate)
+        )
+    """))
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS attendance (
+            id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            login_time DATETIME NOT NULL,
+            logout_time DATETIME,
+            total_hours FLOAT,
+            notes VARCHAR(200),
+            PRIMARY KEY (id),
+            FOREIGN KEY(user_id) REFERENCES user (id)
+        )
+    """))
+
+    # Bases anteriores a migrate_add_owner.py
+    if _add_column(conn, 'monthly_client', 'owner_name',
+                   "VARCHAR(100) DEFAULT 'Sin especificar'"):
+        conn.execute(text("""
+            UPDATE monthly_client
+            SET owner_name = 'Cliente - ' || plate
+            WHERE owner_name IS NULL OR owner_name = '' OR owner_name = 'Sin especificar'
+        """))
+
+    # Bases anteriores a migrate_add_operator.py
+    if _add_column(conn, 'monthly_client', 'registered_by', "VARCHAR(64)"):
+        conn.execute(text("""
+            UPDATE monthly_client
+            SET registered_by = 'Sistema'
+            WHERE registered_by IS NULL OR registered_by = ''
+        """))
+
+
+@migration(2, "Cola de impresión de tickets (print_job)")
+def _print_jobs(conn):
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS print_job (
+            id INTEGER NOT NULL,
+            kind VARCHAR(10) NOT NULL,
+            vehicle_id INTEGER NOT NULL,
+            status VARCHAR(10) NOT NULL,
+            attempts INTEGER NOT NULL,
+            last_error VARCHAR(200),
+            created_at DATETIME NOT NULL,
+            next_attempt_at DATETIME NOT NULL,
+            printed_at DATETIME,
+            PRIMARY KEY (id),
+            FOREIGN KEY(vehicle_id) REFERENCES vehicle (id)
+        )
+    """))
+
+
+@migration(3, "Eliminar imágenes QR guardadas en vehicle", vacuum=True)
+def _drop_vehicle_qr_code(conn):
+    # El QR se genera a pedido desde el ID (/vehicle/<id>/qr.png)
+    if 'qr_code' not in _columns(conn, 'vehicle'):
+        return
+
+    if conn.dialect.server_version_info >= (3, 35, 0):
+        conn.execute(text("ALTER TABLE vehicle DROP COLUMN qr_code"))
+        return
+
+    # SQLite antiguo: reconstruir la tabla sin la columna
+    columns = ("id, plate, type, entry_time, exit_time, is_monthly, total_cost, "
+               "operator_name, exit_operator_name")
+    conn.execute(text("""
+        CREATE TABLE vehicle_new (
+            id INTEGER NOT NULL,
+            plate VARCHAR(10) NOT NULL,
+            type VARCHAR(10) NOT NULL,
+            entry_time DATETIME,
+            exit_time DATETIME,
+            is_monthly BOOLEAN,
+            total_cost FLOAT,
+            operator_name VARCHAR(64),
+            exit_operator_name VARCHAR(64),
+            PRIMARY KEY (id)
+        )
+    """))
+    conn.execute(text(f"INSERT INTO vehicle_new ({columns}) SELECT {columns} FROM vehicle"))
+    conn.execute(text("DROP TABLE vehicle"))
+    conn.execute(text("ALTER TABLE vehicle_new RENAME TO vehicle"))
+
+
+@migration(4, "Índices para consultas frecuentes")
+def _hot_query_indexes(conn):
+    statements = [
+        "CREATE INDEX IF NOT EXISTS ix_vehicle_plate_exit_time ON vehicle (plate, exit_time)",
+        "CREATE INDEX IF NOT EXISTS ix_vehicle_entry_time ON vehicle (entry_time)",
+        "CREATE INDEX IF NOT EXISTS ix_vehicle_open ON vehicle (entry_time) "
+        "WHERE exit_time IS NULL",
+        "CREATE INDEX IF NOT EXISTS ix_attendance_user_logout ON attendance (user_id, logout_time)",
+        "CREATE INDEX IF NOT EXISTS ix_attendance_user_login ON attendance (user_id, login_time)",
+        "CREATE INDEX IF NOT EXISTS ix_attendance_login_time ON attendance (login_time)",
+        "CREATE INDEX IF NOT EXISTS ix_attendance_open ON attendance (user_id) "
+        "WHERE logout_time IS NULL",
+        "CREATE INDEX IF NOT EXISTS ix_print_job_status_next ON print_job (status, next_attempt_at)",
+    ]
+    for statement in statements:
+        conn.execute(text(statement))
+    conn.execute(text("ANALYZE"))
+
+
+@migration(5, "Totales por día y hora de ingreso (vehicle_rollup)")
+def _vehicle_rollup(conn):
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS vehicle_rollup (
+            day DATE NOT NULL,
+            hour INTEGER NOT NULL,
+            vehicle_type VARCHAR(10) NOT NULL,
+            operator_name VARCHAR(64) NOT NULL,
+            entries INTEGER NOT NULL,
+            monthly_entries INTEGER NOT NULL,
+            exits INTEGER NOT NULL,
+            revenue FLOAT NOT NULL,
+            total_minutes FLOAT NOT NULL,
+            PRIMARY KEY (day, hour, vehicle_type, operator_name)
+        )
+    """))
+
+    # Cargar el historial existente
+    from app.rollup import rebuild_rollup
+    rebuild_rollup(conn)
+
+
+@migration(6, "Índice de búsqueda por subcadena de patentes y operadores (FTS5)")
+def _vehicle_search_index(conn):
+    # El tokenizador trigram existe desde SQLite 3.34; sin él la búsqueda
+    # sigue usando LIKE (app/search.py)
+    fts5 = conn.execute(text("SELECT sqlite_compileoption_used('ENABLE_FTS5')")).scalar()
+    if not fts5 or conn.dialect.server_version_info < (3, 34, 0):
+        return
+
+    conn.execute(text("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS vehicle_search USING fts5(
+            plate, operator_name, exit_operator_name,
+            content='vehicle', content_rowid='id', tokenize='trigram'
+        )
+    """))
+    conn.execute(text("""
+        CREATE TRIGGER IF NOT EXISTS vehicle_search_insert AFTER INSERT ON vehicle BEGIN
+            INSERT INTO vehicle_search (rowid, plate, operator_name, exit_operator_name)
+            VALUES (new.id, new.plate, new.operator_name, new.exit_operator_name);
+        END
+    """))
+    conn.execute(text("""
+        CREATE TRIGGER IF NOT EXISTS vehicle_search_delete AFTER DELETE ON vehicle BEGIN
+            INSERT INTO vehicle_search (vehicle_search, rowid, plate, operator_name,
+                                        exit_operator_name)
+            VALUES ('delete', old.id, old.plate, old.operator_name, old.exit_operator_name);
+        END
+    """))
+    conn.execute(text("""
+        CREATE TRIGGER IF NOT EXISTS vehicle_search_update
+        AFTER UPDATE OF plate, operator_name, exit_operator_name ON vehicle BEGIN
+            INSERT INTO vehicle_search (vehicle_search, rowid, plate, operator_name,
+                                        exit_operator_name)
+            VALUES ('delete', old.id, old.plate, old.operator_name, old.exit_operator_name);
+            INSERT INTO vehicle_search (rowid, plate, operator_name, exit_operator_name)
+            VALUES (new.id, new.plate, new.operator_name, new.exit_operator_name);
+        END
+    """))
+
+    # Indexar el historial existente
+    conn.execute(text("INSERT INTO vehicle_search (vehicle_search) VALUES ('rebuild')"))
+
+
+@migration(7, "Día de jornada (business_day) en vehicle y attendance")
+def _business_day(conn):
+    _add_column(conn, 'vehicle', 'business_day', 'DATE')
+    _add_column(conn, 'attendance', 'business_day', 'DATE')
+
+    from app.business_day import backfill_business_days
+    backfill_business_days(conn)
+
+    statements = [
+        "CREATE INDEX IF NOT EXISTS ix_vehicle_business_day ON vehicle (business_day, entry_time)",
+        "CREATE INDEX IF NOT EXISTS ix_attendance_business_day "
+        "ON attendance (business_day, login_time)",
+        "CREATE INDEX IF NOT EXISTS ix_attendance_user_business_day "
+        "ON attendance (user_id, business_day)",
+    ]
+    for statement in statements:
+        conn.execute(text(statement))
+    conn.execute(text("ANALYZE"))
+
+
+@migration(8, "Vencimiento precalculado de clientes mensuales")
+def _monthly_expiration(conn):
+    _add_column(conn, 'monthly_client', 'expiration_date', 'DATETIME')
+
+    # Mismo formato que guarda SQLAlchemy: se conservan los microsegundos de start_date
+    conn.execute(text("""
+        UPDATE monthly_client
+        SET expiration_date = strftime('%Y-%m-%d %H:%M:%S', start_date,
+                                       '+' || (30 * COALESCE(duration_months, 1)) || ' days')
+                              || substr(start_date, 20)
+        WHERE start_date IS NOT NULL
+    """))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_monthly_client_expiration_date "
+        "ON monthly_client (expiration_date)"
+    ))
+
+
+@migration(9, "Índice por titular de clientes mensuales")
+def _monthly_owner_index(conn):
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_monthly_client_owner_name ON monthly_client (owner_name)"
+    ))
+
+
+# ============================================
+# EJECUCIÓN
+# ============================================
+
+def latest_version():
+    """Última versión definida en el código"""
+    return MIGRATIONS[-1].version if MIGRATIONS else 0
+
+
+def get_version(engine):
+    """Versión aplicada en la base de datos (0 si nunca se migró)"""
+    with engine.connect() as conn:
+        if not _table_exists(conn, 'schema_version'):
+            return 0
+        version = conn.execute(text("SELECT MAX(version) FROM schema_version")).scalar()
+        return version or 0
+
+
+def pending_migrations(engine):
+    """Migraciones que todavía no se aplicaron"""
+    current = get_version(engine)
+    return [m for m in MIGRATIONS if m.version > current]
+
+
+def _sqlite_path(engine):
+    """Ruta del archivo SQLite, o None si la base no es un archivo SQLite existente"""
+    db_path = engine.url.database
+    if engine.url.get_backend_name() != 'sqlite' or not db_path or not os.path.exists(db_path):
+        return None
+    return db_path
+
+
+def format_size(size):
+    """Tamaño de archivo legible"""
+    if abs(size) >= 1024 * 1024:
+        return f"{size / (1024 * 1024):.2f} MB"
+    return f"{size / 1024:.1f} KB"
+
+
+def backup_database(engine):
+    """
+    Copiar el archivo SQLite antes de migrar
+
+    Returns:
+        str: ruta del backup, o None si no hay archivo que respaldar
+    """
+    db_path = _sqlite_path(engine)
+    if not db_path:
+        return None
+
+    backup_path = os.path.join(
+        os.path.dirname(db_path),
+        f'app_backup_{datetime.now().strftime("%Y%m%d_%H%M%S")}.db'
+    )
+    shutil.copy2(db_path, backup_path)
+    return backup_path
+
+
+def upgrade(engine, log=print):
+    """
+    Aplicar en orden todas las migraciones pendientes
+
+    Args:
+        engine: engine de SQLAlchemy (db.engine)
+        log: función para mostrar el progreso
+
+    Returns:
+        list: migraciones aplicadas
+    """
+    with engine.begin() as conn:
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER NOT NULL,
+                description VARCHAR(200),
+                applied_at DATETIME NOT NULL,
+                PRIMARY KEY (version)
+            )
+        """))
+
+    pending = pending_migrations(engine)
+    db_path = _sqlite_path(engine)
+    # Tamaño antes de las migraciones que compactan, para informar lo recuperado
+    size_before = os.path.getsize(db_path) if db_path and any(m.vacuum for m in pending) else None
+
+    applied = []
+    for m in pending:
+        log(f"📝 Versión {m.version}: {m.description}...")
+        with engine.begin() as conn:
+            m.upgrade(conn)
+            conn.execute(
+                text("INSERT INTO schema_version (version, description, applied_at) "
+                     "VALUES (:version, :description, :applied_at)"),
+                {'version': m.version, 'description': m.description,
+                 'applied_at': datetime.now()}
+            )
+        applied.append(m)
+        log(f"✅ Versión {m.version} aplicada")
+
+    if any(m.vacuum for m in applied) and engine.url.get_backend_name() == 'sqlite':
+        log("📝 Compactando base de datos (VACUUM)...")
+        with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+            conn.execute(text("VACUUM"))
+        log("✅ Base de datos compactada")
+
+        if size_before is not None:
+            size_after = os.path.getsize(db_path)
+            log(f"📊 Tamaño de la base: {format_size(size_before)} → {format_size(size_after)} "
+                f"(ahorro: {format_size(size_before - size_after)})")
+
+    return applied
+
+
+def ensure_schema(engine, log=print):
+    """
+    Verificación al iniciar: solo lee el número de versión y, si la base
+    está atrasada, hace un backup y aplica las migraciones pendientes.
+    """
+    current = get_version(engine)
+    if current >= latest_version():
+        return
+
+    log(f"🔄 Base de datos en versión {current}, actualizando a {latest_version()}...")
+    backup_path = backup_database(engine)
+    if backup_path:
+        log(f"✅ Backup creado: {backup_path}")
+    upgrade(engine, log=log)
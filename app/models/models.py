@@ -3,6 +3,7 @@ from app import db
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import UserMixin
 from app import login_manager
+from app.business_day import column_default, current_business_day
 
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -36,20 +37,36 @@ class User(UserMixin, db.Model):
         ).first()
     
     def get_today_attendance(self):
-        """Obtiene la asistencia del día actual"""
-        today = datetime.now().date()
+        """Obtiene la asistencia de la jornada actual"""
         return Attendance.query.filter(
             Attendance.user_id == self.id,
-            db.func.date(Attendance.login_time) == today
+            Attendance.business_day == current_business_day()
         ).first()
 
 class Attendance(db.Model):
     """Registro de asistencia de empleados"""
+    __table_args__ = (
+        # Asistencia activa de un usuario (get_active_attendance)
+        db.Index('ix_attendance_user_logout', 'user_id', 'logout_time'),
+        # Historial y reportes por usuario y rango de fechas
+        db.Index('ix_attendance_user_login', 'user_id', 'login_time'),
+        # Paneles filtrados solo por rango de fechas
+        db.Index('ix_attendance_login_time', 'login_time'),
+        # Usuarios trabajando ahora (índice parcial)
+        db.Index('ix_attendance_open', 'user_id',
+                 sqlite_where=db.text('logout_time IS NULL'),
+                 postgresql_where=db.text('logout_time IS NULL')),
+        # Asistencias de una jornada (panel y asistencia de hoy de un usuario)
+        db.Index('ix_attendance_business_day', 'business_day', 'login_time'),
+        db.Index('ix_attendance_user_business_day', 'user_id', 'business_day'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     login_time = db.Column(db.DateTime, nullable=False, default=datetime.now)
     logout_time = db.Column(db.DateTime, nullable=True)
     total_hours = db.Column(db.Float, nullable=True)  # Horas trabajadas
+    business_day = db.Column(db.Date, default=column_default('login_time'))  # Jornada del ingreso
     notes = db.Column(db.String(200), nullable=True)  # Notas opcionales
     
     def calculate_hours(self):
@@ -84,24 +101,56 @@ class Attendance(db.Model):
         return f'<Attendance {self.user.username} - {self.login_time}>'
 
 class Vehicle(db.Model):
+    __table_args__ = (
+        # Salida por patente: plate = ? AND exit_time IS NULL
+        db.Index('ix_vehicle_plate_exit_time', 'plate', 'exit_time'),
+        # Reportes, auditoría y estadísticas por rango de ingreso
+        db.Index('ix_vehicle_entry_time', 'entry_time'),
+        # Vehículos estacionados (índice parcial)
+        db.Index('ix_vehicle_open', 'entry_time',
+                 sqlite_where=db.text('exit_time IS NULL'),
+                 postgresql_where=db.text('exit_time IS NULL')),
+        # Vehículos de una jornada (reportes del día)
+        db.Index('ix_vehicle_business_day', 'business_day', 'entry_time'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     plate = db.Column(db.String(10), nullable=False)
     type = db.Column(db.String(10), nullable=False)  # 'auto' or 'moto'
     entry_time = db.Column(db.DateTime, default=datetime.now)
     exit_time = db.Column(db.DateTime, nullable=True)
-    qr_code = db.Column(db.Text, nullable=True)  # Base64 del QR
     is_monthly = db.Column(db.Boolean, default=False)
     total_cost = db.Column(db.Float, default=0.0)
     operator_name = db.Column(db.String(64))  # Operador que registró ingreso
     exit_operator_name = db.Column(db.String(64))  # Operador que registró salida
+    business_day = db.Column(db.Date, default=column_default('entry_time'))  # Jornada del ingreso
     
     def __repr__(self):
         return f'<Vehicle {self.plate}>'
 
+def monthly_status(expiration_date, expiring_days, now=None):
+    """
+    Estado de un abono según su vencimiento
+
+    Returns:
+        str: 'expired', 'expiring' (vence en menos de expiring_days días) o 'active'
+    """
+    now = now or datetime.now()
+    if expiration_date < now:
+        return 'expired'
+    if expiration_date < now + timedelta(days=expiring_days):
+        return 'expiring'
+    return 'active'
+
+def _expiration_default(context):
+    """Default de expiration_date al insertar, desde start_date y duration_months"""
+    params = context.get_current_parameters()
+    return MonthlyClient.calculate_expiration(params.get('start_date'), params.get('duration_months'))
+
 class MonthlyClient(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     plate = db.Column(db.String(10), nullable=False, unique=True)
-    owner_name = db.Column(db.String(100), nullable=False)
+    owner_name = db.Column(db.String(100), nullable=False, index=True)
     model = db.Column(db.String(50))
     phone = db.Column(db.String(20))
     start_date = db.Column(db.DateTime, nullable=False)
@@ -109,10 +158,57 @@ class MonthlyClient(db.Model):
     vehicle_type = db.Column(db.String(10), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.now)
     registered_by = db.Column(db.String(64))
+    # Vencimiento precalculado (start_date + 30 días por mes) para consultas por rango
+    expiration_date = db.Column(db.DateTime, index=True, default=_expiration_default)
+    
+    @staticmethod
+    def calculate_expiration(start_date, duration_months):
+        """Vencimiento de un abono de duration_months meses (30 días cada uno)"""
+        if start_date is None:
+            return None
+        return start_date + timedelta(days=30 * (duration_months or 1))
+    
+    def renew(self, duration_months, now=None):
+        """
+        Renovar (abono vencido: reinicia desde hoy) o extender (abono activo:
+        suma los meses manteniendo la fecha de inicio)
+        
+        Returns:
+            bool: True si se renovó, False si se extendió
+        """
+        now = now or datetime.now()
+        renewed = self.get_expiration_date() < now
+        if renewed:
+            self.start_date = now
+            self.duration_months = duration_months
+        else:
+            self.duration_months = self.duration_months + duration_months
+        self.refresh_expiration()
+        return renewed
+    
+    def refresh_expiration(self):
+        """Recalcular expiration_date después de cambiar el inicio o la duración"""
+        self.expiration_date = self.calculate_expiration(self.start_date, self.duration_months)
+        return self.expiration_date
+    
+    @classmethod
+    def expiring_within(cls, days, now=None):
+        """Clientes cuyo abono vence en los próximos días (rango sobre el índice)"""
+        now = now or datetime.now()
+        return cls.query.filter(
+            cls.expiration_date >= now,
+            cls.expiration_date < now + timedelta(days=days)
+        )
+    
+    @classmethod
+    def expired(cls, now=None):
+        """Clientes con el abono vencido"""
+        return cls.query.filter(cls.expiration_date < (now or datetime.now()))
     
     def get_expiration_date(self):
-        days = 30 * self.duration_months
-        return self.start_date + timedelta(days=days)
+        if self.expiration_date is not None:
+            return self.expiration_date
+        return self.calculate_expiration(self.start_date, self.duration_months)
     
     def is_expired(self):
         return self.get_expiration_date() < datetime.now()
@@ -122,6 +218,10 @@ class MonthlyClient(db.Model):
         remaining = (expiration - datetime.now()).days
         return max(0, remaining)
     
+    def status(self, expiring_days, now=None):
+        """'expired', 'expiring' (vence en menos de expiring_days días) o 'active'"""
+        return monthly_status(self.get_expiration_date(), expiring_days, now)
+    
     def get_duration_text(self):
         if self.duration_months == 1:
             return "1 mes"
@@ -137,6 +237,51 @@ class MonthlyClient(db.Model):
     def __repr__(self):
         return f'<MonthlyClient {self.plate} - {self.owner_name}>'
 
+class PrintJob(db.Model):
+    """Trabajo pendiente en la cola de impresión de tickets"""
+    __table_args__ = (
+        # Próximo trabajo pendiente de la cola
+        db.Index('ix_print_job_status_next', 'status', 'next_attempt_at'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(10), nullable=False)  # 'entry' o 'exit'
+    vehicle_id = db.Column(db.Integer, db.ForeignKey('vehicle.id'), nullable=False)
+    status = db.Column(db.String(10), nullable=False, default='pending')  # 'pending', 'printing', 'done', 'failed'
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.String(200), nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+    printed_at = db.Column(db.DateTime, nullable=True)
+    
+    def is_finished(self):
+        """Verifica si el trabajo ya no será reintentado"""
+        return self.status in ('done', 'failed')
+    
+    def __repr__(self):
+        return f'<PrintJob {self.id} {self.kind} - {self.status}>'
+
+class VehicleRollup(db.Model):
+    """
+    Totales de vehículos por día, hora de ingreso, tipo y operador de ingreso
+    Se actualiza en cada ingreso y salida (app/rollup.py); los reportes de
+    semanas o meses leen estas filas en lugar de todos los vehículos.
+    """
+    __tablename__ = 'vehicle_rollup'
+    
+    day = db.Column(db.Date, primary_key=True)
+    hour = db.Column(db.Integer, primary_key=True)
+    vehicle_type = db.Column(db.String(10), primary_key=True)
+    operator_name = db.Column(db.String(64), primary_key=True)  # '' si no hay operador
+    entries = db.Column(db.Integer, nullable=False, default=0)
+    monthly_entries = db.Column(db.Integer, nullable=False, default=0)
+    exits = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0.0)
+    total_minutes = db.Column(db.Float, nullable=False, default=0.0)
+    
+    def __repr__(self):
+        return f'<VehicleRollup {self.day} {self.hour:02d}h {self.vehicle_type} {self.operator_name}>'
+
 @login_manager.user_loader
 def load_user(id):
     return User.query.get(int(id))
\ No newline at end of file
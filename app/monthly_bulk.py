@@ -0,0 +1,235 @@
+"""
+Operaciones masivas sobre clientes mensuales
+- Importación desde CSV (por ejemplo la lista de inquilinos de un edificio):
+  el archivo se valida en una sola pasada contra las patentes ya registradas,
+  que se leen con un único SELECT, y las filas válidas se insertan con
+  executemany en lotes dentro de una sola transacción. Cada fila inválida se
+  informa con su número de línea y no impide importar las demás.
+- Renovación o extensión de varios abonos a la vez (la flota de una empresa)
+  con un SELECT y un commit en total.
+
+El CSV puede tener los encabezados de la exportación de clientes (Patente,
+Titular, Modelo, Teléfono, Tipo, Inicio, Meses) o sus claves en inglés;
+las demás columnas se ignoran. Se aceptan ',' y ';' como separador.
+"""
+
+import csv
+import io
+from collections import namedtuple
+from datetime import datetime, time
+from flask import current_app
+from app import db
+from app.models.models import MonthlyClient
+from app.monthly_cache import monthly_cache
+
+VEHICLE_TYPES = ('auto', 'moto')
+DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y')
+MAX_DURATION_MONTHS = 120
+
+# Encabezados aceptados para cada campo (en minúsculas)
+HEADER_ALIASES = {
+    'plate': ('patente', 'plate'),
+    'owner_name': ('titular', 'owner_name'),
+    'model': ('modelo', 'model'),
+    'phone': ('teléfono', 'telefono', 'phone'),
+    'vehicle_type': ('tipo', 'vehicle_type', 'type'),
+    'start_date': ('inicio', 'start_date'),
+    'duration_months': ('meses', 'duration_months'),
+}
+REQUIRED_FIELDS = ('plate', 'owner_name', 'vehicle_type')
+
+# Largo máximo de las columnas de texto de monthly_client
+MAX_LENGTHS = {'plate': 10, 'owner_name': 100, 'model': 50, 'phone': 20}
+
+# Error de una fila: número de línea del archivo, patente (si se leyó) y motivo
+RowError = namedtuple('RowError', ['line', 'plate', 'message'])
+
+# Resultado de una importación
+ImportResult = namedtuple('ImportResult', ['total', 'imported', 'errors', 'dry_run'])
+
+
+class InvalidImportFile(ValueError):
+    """Archivo vacío o sin las columnas obligatorias"""
+
+
+def _field_positions(header):
+    """Campo -> índice de columna según los encabezados del archivo"""
+    names = [name.strip().lower() for name in header]
+    positions = {}
+    for field, aliases in HEADER_ALIASES.items():
+        for alias in aliases:
+            if alias in names:
+                positions[field] = names.index(alias)
+                break
+
+    missing = [field for field in REQUIRED_FIELDS if field not in positions]
+    if missing:
+        expected = ', '.join(HEADER_ALIASES[field][0].capitalize() for field in missing)
+        raise InvalidImportFile(f"Faltan columnas obligatorias: {expected}")
+    return positions
+
+
+def _parse_date(value, default):
+    if not value:
+        return default
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format)
+        except ValueError:
+            continue
+    raise ValueError(f"Fecha de inicio inválida: {value} (usar AAAA-MM-DD)")
+
+
+def _parse_row(values, positions, today):
+    """Fila del CSV -> dict de columnas de monthly_client (ValueError si es inválida)"""
+    def get(field):
+        index = positions.get(field)
+        if index is None or index >= len(values):
+            return ''
+        return values[index].strip()
+
+    row = {
+        'plate': get('plate').upper(),
+        'owner_name': get('owner_name'),
+        'model': get('model') or None,
+        'phone': get('phone') or None,
+        'vehicle_type': get('vehicle_type').lower(),
+    }
+
+    if not row['plate']:
+        raise ValueError("La patente es obligatoria")
+    if not row['owner_name']:
+        raise ValueError("El nombre del titular es obligatorio")
+    if row['vehicle_type'] not in VEHICLE_TYPES:
+        raise ValueError(f"Tipo de vehículo inválido: {row['vehicle_type'] or '(vacío)'}")
+    for field, max_length in MAX_LENGTHS.items():
+        if row[field] and len(row[field]) > max_length:
+            raise ValueError(f"{HEADER_ALIASES[field][0].capitalize()} supera {max_length} caracteres")
+
+    row['start_date'] = _parse_date(get('start_date'), today)
+
+    months = get('duration_months') or '1'
+    if not months.isdigit() or not 1 <= int(months) <= MAX_DURATION_MONTHS:
+        raise ValueError(f"Cantidad de meses inválida: {months}")
+    row['duration_months'] = int(months)
+
+    row['expiration_date'] = MonthlyClient.calculate_expiration(row['start_date'], row['duration_months'])
+    return row
+
+
+def validate_csv(text, existing_plates, today=None):
+    """
+    Validar un CSV de clientes mensuales en una sola pasada
+
+    Args:
+        text: contenido del archivo
+        existing_plates: patentes ya registradas (set)
+        today: fecha de inicio para filas sin Inicio (por defecto hoy)
+
+    Returns:
+        tuple: (filas válidas, lista de RowError, cantidad de filas leídas)
+    """
+    today = today or datetime.combine(datetime.now().date(), time.min)
+    header_line = text.lstrip().split('\n', 1)[0]
+    if not header_line.strip():
+        raise InvalidImportFile("El archivo está vacío")
+
+    delimiter = ';' if header_line.count(';') > header_line.count(',') else ','
+    reader = csv.reader(io.StringIO(text.lstrip()), delimiter=delimiter)
+    positions = _field_positions(next(reader))
+
+    rows, errors, seen, total = [], [], set(), 0
+    for values in reader:
+        if not any(value.strip() for value in values):
+            continue  # Línea en blanco
+        total += 1
+        line = reader.line_num
+        try:
+            row = _parse_row(values, positions, today)
+        except ValueError as e:
+            plate = values[positions['plate']].strip().upper() if positions['plate'] < len(values) else ''
+            errors.append(RowError(line, plate or None, str(e)))
+            continue
+
+        if row['plate'] in existing_plates:
+            errors.append(RowError(line, row['plate'], "Ya existe un cliente mensual con esta patente"))
+        elif row['plate'] in seen:
+            errors.append(RowError(line, row['plate'], "Patente repetida en el archivo"))
+        else:
+            seen.add(row['plate'])
+            rows.append(row)
+
+    return rows, errors, total
+
+
+def import_monthly_clients(text, registered_by=None, dry_run=False):
+    """
+    Importar clientes mensuales desde un CSV
+
+    Args:
+        text: contenido del archivo
+        registered_by: usuario que figura como registrador
+        dry_run: True para solo validar, sin guardar nada
+
+    Returns:
+        ImportResult
+    """
+    existing_plates = {plate for (plate,) in db.session.query(MonthlyClient.plate)}
+    rows, errors, total = validate_csv(text, existing_plates)
+
+    if rows and not dry_run:
+        created_at = datetime.now()
+        for row in rows:
+            row['registered_by'] = registered_by
+            row['created_at'] = created_at
+
+        batch_size = current_app.config['MONTHLY_IMPORT_BATCH_SIZE']
+        insert = MonthlyClient.__table__.insert()
+        try:
+            for start in range(0, len(rows), batch_size):
+                db.session.execute(insert, rows[start:start + batch_size])
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        monthly_cache.invalidate()
+
+    return ImportResult(total=total, imported=len(rows), errors=errors, dry_run=dry_run)
+
+
+def renew_clients(client_ids, duration_months, now=None):
+    """
+    Renovar (vencidos) o extender (activos) varios abonos en una transacción
+
+    Args:
+        client_ids: IDs de los clientes
+        duration_months: meses a renovar o agregar
+        now: momento de referencia (por defecto ahora)
+
+    Returns:
+        dict: {'renewed', 'extended'} con {'id', 'plate', 'expiration_date'}
+              de los clientes de cada caso y 'missing' con los IDs que no existen
+    """
+    now = now or datetime.now()
+    ids = set(client_ids)
+    clients = MonthlyClient.query.filter(MonthlyClient.id.in_(ids)).all() if ids else []
+
+    result = {'renewed': [], 'extended': [], 'missing': sorted(ids - {c.id for c in clients})}
+    for client in clients:
+        renewed = client.renew(duration_months, now)
+        # Datos armados antes del commit (después cada atributo sería un SELECT)
+        result['renewed' if renewed else 'extended'].append({
+            'id': client.id,
+            'plate': client.plate,
+            'expiration_date': client.expiration_date
+        })
+
+    if clients:
+        try:
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        monthly_cache.invalidate()
+
+    return result
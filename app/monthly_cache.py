@@ -0,0 +1,119 @@
+"""
+Caché en memoria de clientes mensuales por patente
+Cada ingreso necesita saber si la patente es de un cliente mensual y si su
+abono está vencido. En lugar de consultar monthly_client en cada ingreso, se
+guarda patente -> (id, vencimiento) para todos los clientes; el vencimiento
+viene de la columna expiration_date, ya calculada al guardar el cliente.
+
+Las rutas que crean, renuevan, editan o eliminan clientes invalidan la caché
+después del commit, y el próximo ingreso la vuelve a cargar (un SELECT de
+los clientes y otro de la firma descrita abajo). Como el índice de
+ocupación, la caché es por proceso.
+
+Los cambios hechos desde otro proceso (por ejemplo import_monthly.py) no
+pasan por esas rutas: cada MONTHLY_CACHE_CHECK_SECONDS la caché compara una
+firma de la tabla (cantidad de clientes, último ID y suma de vencimientos)
+con la que tenía al cargarse, y se invalida si cambió. Altas, bajas y
+renovaciones cambian la firma.
+"""
+
+import threading
+import time
+from collections import namedtuple
+from sqlalchemy import Integer, cast, func
+from app import db
+from config import Config
+from app.models.models import MonthlyClient
+
+# Datos de un cliente mensual necesarios en el ingreso
+MonthlyEntry = namedtuple('MonthlyEntry', ['id', 'expiration_date'])
+
+
+class MonthlyClientCache:
+    """Patente -> MonthlyEntry de todos los clientes mensuales"""
+
+    def __init__(self, check_interval=None):
+        self._lock = threading.Lock()
+        self._entries = None
+        self._generation = 0  # Aumenta con cada invalidación
+        self._signature = None  # Firma de la tabla al cargar la caché
+        self._checked_at = 0.0
+        self._check_interval = (check_interval if check_interval is not None
+                                else Config.MONTHLY_CACHE_CHECK_SECONDS)
+
+    @staticmethod
+    def _load_from_db():
+        rows = db.session.query(
+            MonthlyClient.plate, MonthlyClient.id, MonthlyClient.expiration_date
+        ).all()
+        return {plate: MonthlyEntry(client_id, expiration) for plate, client_id, expiration in rows}
+
+    @staticmethod
+    def _signature_from_db():
+        """Cantidad, último ID y suma de vencimientos (un SELECT que recorre un índice)"""
+        return tuple(db.session.query(
+            func.count(MonthlyClient.id),
+            func.max(MonthlyClient.id),
+            func.sum(cast(func.strftime('%s', MonthlyClient.expiration_date), Integer))
+        ).one())
+
+    def rebuild(self):
+        """Recargar la caché completa desde la base de datos"""
+        with self._lock:
+            generation = self._generation
+        # La firma se lee antes: si la tabla cambia en el medio, la próxima
+        # verificación ve una firma distinta y vuelve a cargar
+        signature = self._signature_from_db()
+        entries = self._load_from_db()
+
+        with self._lock:
+            # Si se invalidó mientras se leía, lo leído puede estar desactualizado
+            if generation == self._generation:
+                self._entries = entries
+                self._signature = signature
+                self._checked_at = time.monotonic()
+        return entries
+
+    def _expire_if_stale(self):
+        """Invalidar la caché si otro proceso cambió monthly_client (cada tantos segundos)"""
+        with self._lock:
+            now = time.monotonic()
+            if self._entries is None or now - self._checked_at < self._check_interval:
+                return
+            self._checked_at = now
+            signature = self._signature
+
+        if self._signature_from_db() != signature:
+            self.invalidate()
+
+    def invalidate(self):
+        """Descartar la caché (se recarga en la próxima búsqueda)"""
+        with self._lock:
+            self._entries = None
+            self._generation += 1
+
+    def snapshot(self):
+        """
+        Generación y entradas de la caché, cargándola si hace falta
+
+        La generación se lee antes de cargar: si la caché se invalida mientras
+        tanto, quien guarde la generación verá el cambio en la próxima llamada.
+        """
+        self._expire_if_stale()
+        with self._lock:
+            generation, entries = self._generation, self._entries
+        if entries is None:
+            entries = self.rebuild()
+        return generation, entries
+
+    def lookup(self, plate):
+        """Cliente mensual de una patente, o None si no es mensual"""
+        self._expire_if_stale()
+        with self._lock:
+            entries = self._entries
+        if entries is None:
+            entries = self.rebuild()
+        return entries.get(plate)
+
+
+monthly_cache = MonthlyClientCache()
@@ -0,0 +1,93 @@
+"""
+Lista de clientes mensuales para la API JSON (/api/monthly)
+Los filtros y los órdenes se traducen a condiciones que pueden usar los
+índices de monthly_client: el prefijo de patente es un rango sobre el índice
+único de plate, el estado un rango sobre expiration_date, y cada orden tiene
+su índice para que la paginación por clave (app/pagination.py) lea solo las
+filas de la página pedida, sin importar cuántos clientes haya.
+"""
+
+from datetime import timedelta
+from app.models.models import MonthlyClient
+from app.search import like_pattern
+
+# Órdenes disponibles: columnas de la clave de paginación (la última es única)
+MONTHLY_SORTS = {
+    'created': [MonthlyClient.id],
+    'plate': [MonthlyClient.plate, MonthlyClient.id],
+    'owner': [MonthlyClient.owner_name, MonthlyClient.id],
+    'expiration': [MonthlyClient.expiration_date, MonthlyClient.id],
+}
+
+MONTHLY_STATUSES = ('active', 'expiring', 'expired')
+
+STATUS_LABELS = {'active': 'activo', 'expiring': 'por vencer', 'expired': 'vencido'}
+
+
+def _prefix_range(column, prefix):
+    """column LIKE 'prefix%' escrito como rango, para que SQLite use el índice"""
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return (column >= prefix) & (column < upper)
+
+
+def status_filter(status, now, expiring_days):
+    """Condición sobre expiration_date para un estado"""
+    soon = now + timedelta(days=expiring_days)
+    if status == 'expired':
+        return MonthlyClient.expiration_date < now
+    if status == 'expiring':
+        return (MonthlyClient.expiration_date >= now) & (MonthlyClient.expiration_date < soon)
+    return MonthlyClient.expiration_date >= soon
+
+
+def filtered_query(now, expiring_days, plate=None, owner=None, q=None,
+                   vehicle_type=None, status=None):
+    """
+    Query de clientes mensuales con los filtros de la API (sin order_by)
+
+    Args:
+        now: momento de referencia para el estado
+        expiring_days: días antes del vencimiento en que un abono está "por vencer"
+        plate: prefijo de patente
+        owner: texto contenido en el nombre del titular
+        q: búsqueda general (prefijo de patente o texto del titular)
+        vehicle_type: 'auto' o 'moto'
+        status: 'active', 'expiring' o 'expired'
+    """
+    query = MonthlyClient.query
+    if plate:
+        query = query.filter(_prefix_range(MonthlyClient.plate, plate.upper()))
+    if owner:
+        query = query.filter(MonthlyClient.owner_name.like(like_pattern(owner), escape='\\'))
+    if q:
+        query = query.filter(
+            _prefix_range(MonthlyClient.plate, q.upper()) |
+            MonthlyClient.owner_name.like(like_pattern(q), escape='\\')
+        )
+    if vehicle_type:
+        query = query.filter(MonthlyClient.vehicle_type == vehicle_type)
+    if status:
+        query = query.filter(status_filter(status, now, expiring_days))
+    return query
+
+
+def client_to_dict(client, now, expiring_days, include_registered_by=False):
+    """Cliente mensual en formato JSON, con vencimiento y estado ya calculados"""
+    expiration = client.get_expiration_date()
+    data = {
+        'id': client.id,
+        'plate': client.plate,
+        'owner_name': client.owner_name,
+        'model': client.model,
+        'phone': client.phone,
+        'vehicle_type': client.vehicle_type,
+        'start_date': client.start_date.strftime('%Y-%m-%d'),
+        'duration_months': client.duration_months,
+        'duration_text': client.get_duration_text(),
+        'expiration_date': expiration.strftime('%Y-%m-%d'),
+        'days_remaining': max(0, (expiration - now).days),
+        'status': client.status(expiring_days, now)
+    }
+    if include_registered_by:
+        data['registered_by'] = client.registered_by
+    return data
@@ -0,0 +1,342 @@
+"""
+Índice en memoria de los vehículos que están dentro del estacionamiento
+Se carga desde la base de datos con el primer uso y se actualiza después de
+cada ingreso y salida, para que buscar una patente, detectar ingresos
+duplicados y contar vehículos por tipo no requiera consultar la tabla.
+
+Cada cambio incrementa un número de versión y queda en un registro acotado
+de eventos, para que las pantallas pidan solo lo que cambió desde la última
+versión que vieron (o lo reciban por Server-Sent Events).
+
+El índice es por proceso: si la base se modifica desde otro proceso (por
+ejemplo clean_tables.py) hay que reconstruirlo con check(repair=True).
+"""
+
+import threading
+import time
+from collections import deque, namedtuple
+from app import db
+from config import Config
+from app.models.models import Vehicle
+
+# Resultados de OccupancyIndex.reserve()
+RESERVED = 'reserved'
+PLATE_INSIDE = 'plate_inside'
+LOT_FULL = 'lot_full'
+
+# Datos de un vehículo estacionado (solo lo que usan las pantallas)
+OpenVehicle = namedtuple(
+    'OpenVehicle',
+    ['id', 'plate', 'type', 'entry_time', 'is_monthly', 'operator_name']
+)
+
+
+def open_vehicle_from(vehicle):
+    """Armar el registro del índice a partir de un objeto Vehicle"""
+    return OpenVehicle(
+        id=vehicle.id,
+        plate=vehicle.plate,
+        type=vehicle.type,
+        entry_time=vehicle.entry_time,
+        is_monthly=vehicle.is_monthly,
+        operator_name=vehicle.operator_name
+    )
+
+
+def open_vehicle_to_dict(record):
+    """Registro del índice en formato JSON"""
+    return {
+        'id': record.id,
+        'plate': record.plate,
+        'type': record.type,
+        'entry_time': record.entry_time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'is_monthly': bool(record.is_monthly),
+        'operator_name': record.operator_name
+    }
+
+
+class OccupancyIndex:
+    """Vehículos estacionados por ID y por patente, con totales por tipo"""
+
+    def __init__(self, event_log_size=None, capacity=None):
+        self._lock = threading.RLock()
+        self._changed = threading.Condition(self._lock)
+        self._loaded = False
+        self._by_id = {}
+        self._by_plate = {}  # patente -> lista de IDs (normalmente uno)
+        self._counts = {}
+        self._reserved = {}  # lugares tomados por ingresos todavía sin commit
+        self._reserved_plates = set()  # patentes de esos ingresos
+        self._capacity = capacity if capacity is not None else Config.LOT_CAPACITY
+        self._version = 0
+        self._events = deque(maxlen=event_log_size or Config.OCCUPANCY_EVENT_LOG_SIZE)
+
+    @staticmethod
+    def open_vehicles_query():
+        """Vehículos sin salida registrada (usa el índice parcial ix_vehicle_open)"""
+        return db.session.query(
+            Vehicle.id, Vehicle.plate, Vehicle.type, Vehicle.entry_time,
+            Vehicle.is_monthly, Vehicle.operator_name
+        ).filter(Vehicle.exit_time.is_(None)).order_by(Vehicle.entry_time, Vehicle.id)
+
+    def _load_from_db(self):
+        """Leer los vehículos sin salida registrada"""
+        return [OpenVehicle(*row) for row in self.open_vehicles_query().all()]
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self.rebuild()
+
+    def _insert(self, record):
+        self._by_id[record.id] = record
+        self._by_plate.setdefault(record.plate, []).append(record.id)
+        self._counts[record.type] = self._counts.get(record.type, 0) + 1
+
+    def _record_event(self, event, record):
+        """Nueva versión del índice (llamar con el lock tomado)"""
+        self._version += 1
+        self._events.append((self._version, event, record))
+        self._changed.notify_all()
+
+    def rebuild(self):
+        """Recargar el índice completo desde la base de datos"""
+        records = self._load_from_db()
+
+        with self._lock:
+            self._by_id = {}
+            self._by_plate = {}
+            self._counts = {}
+            for record in records:
+                self._insert(record)
+            self._loaded = True
+
+            # Una recarga invalida el registro de eventos: los clientes deben
+            # pedir el estado completo. La versión parte del reloj para que
+            # siga creciendo aunque se reinicie el proceso.
+            self._version = max(self._version + 1, int(time.time() * 1000))
+            self._events.clear()
+            self._changed.notify_all()
+
+    def capacity_for(self, vehicle_type):
+        """Capacidad de un tipo de vehículo (None = sin límite)"""
+        return self._capacity.get(vehicle_type) or None
+
+    def reserve(self, vehicle_type, plate=None):
+        """
+        Tomar un lugar (y la patente) antes de registrar un ingreso
+
+        Las verificaciones y la reserva se hacen juntas con el lock tomado,
+        así dos ingresos simultáneos no pueden ocupar el último lugar a la vez
+        ni registrar dos veces la misma patente. Después hay que llamar a
+        add(record, reserved=True) si el ingreso se guardó, o a
+        release(vehicle_type, plate) si falló.
+
+        Returns:
+            str: RESERVED, PLATE_INSIDE (la patente ya está adentro o con un
+                 ingreso en curso) o LOT_FULL (no quedan lugares para el tipo)
+        """
+        with self._lock:
+            self._ensure_loaded()
+            if plate is not None and (plate in self._by_plate or plate in self._reserved_plates):
+                return PLATE_INSIDE
+
+            capacity = self.capacity_for(vehicle_type)
+            taken = self._counts.get(vehicle_type, 0) + self._reserved.get(vehicle_type, 0)
+            if capacity is not None and taken >= capacity:
+                return LOT_FULL
+
+            self._reserved[vehicle_type] = self._reserved.get(vehicle_type, 0) + 1
+            if plate is not None:
+                self._reserved_plates.add(plate)
+            return RESERVED
+
+    def release(self, vehicle_type, plate=None):
+        """Liberar el lugar (y la patente) reservados por un ingreso que no se guardó"""
+        with self._lock:
+            if self._reserved.get(vehicle_type, 0) > 0:
+                self._reserved[vehicle_type] -= 1
+            self._reserved_plates.discard(plate)
+
+    def add(self, record, reserved=False):
+        """Registrar un ingreso (llamar después del commit)"""
+        with self._lock:
+            self._ensure_loaded()
+            if reserved:
+                self.release(record.type, record.plate)
+            if record.id not in self._by_id:
+                self._insert(record)
+                self._record_event('entry', record)
+
+    def remove(self, vehicle_id):
+        """Registrar una salida (llamar después del commit)"""
+        with self._lock:
+            self._ensure_loaded()
+            record = self._by_id.pop(vehicle_id, None)
+            if not record:
+                return
+
+            ids = self._by_plate.get(record.plate, [])
+            if vehicle_id in ids:
+                ids.remove(vehicle_id)
+            if not ids:
+                self._by_plate.pop(record.plate, None)
+
+            self._counts[record.type] -= 1
+            if not self._counts[record.type]:
+                del self._counts[record.type]
+
+            self._record_event('exit', record)
+
+    def get(self, vehicle_id):
+        """Vehículo estacionado por ID, o None"""
+        with self._lock:
+            self._ensure_loaded()
+            return self._by_id.get(vehicle_id)
+
+    def find_plate(self, plate):
+        """Vehículo estacionado con esa patente, o None"""
+        with self._lock:
+            self._ensure_loaded()
+            ids = self._by_plate.get(plate)
+            return self._by_id[ids[0]] if ids else None
+
+    def vehicles(self):
+        """Vehículos estacionados ordenados por hora de ingreso"""
+        with self._lock:
+            self._ensure_loaded()
+            records = list(self._by_id.values())
+        return sorted(records, key=lambda r: (r.entry_time, r.id))
+
+    def counts(self):
+        """Cantidad de vehículos estacionados por tipo"""
+        with self._lock:
+            self._ensure_loaded()
+            return dict(self._counts)
+
+    def total(self):
+        """Cantidad total de vehículos estacionados"""
+        with self._lock:
+            self._ensure_loaded()
+            return len(self._by_id)
+
+    def availability(self):
+        """
+        Ocupación y lugares libres por tipo (solo lee memoria)
+
+        Returns:
+            dict: {'version', 'total', 'types': tipo -> {'occupied',
+                  'capacity', 'available', 'full'}}
+        """
+        with self._lock:
+            self._ensure_loaded()
+            counts = dict(self._counts)
+            version = self._version
+
+        types = {}
+        for vehicle_type in sorted(set(self._capacity) | set(counts)):
+            occupied = counts.get(vehicle_type, 0)
+            capacity = self.capacity_for(vehicle_type)
+            available = None if capacity is None else max(0, capacity - occupied)
+            types[vehicle_type] = {
+                'occupied': occupied,
+                'capacity': capacity,
+                'available': available,
+                'full': available == 0
+            }
+
+        return {'version': version, 'total': sum(counts.values()), 'types': types}
+
+    def version(self):
+        """Versión actual del índice (cambia con cada ingreso o salida)"""
+        with self._lock:
+            self._ensure_loaded()
+            return self._version
+
+    def snapshot(self):
+        """Versión y vehículos estacionados, leídos juntos"""
+        with self._lock:
+            self._ensure_loaded()
+            return self._version, self.vehicles()
+
+    def changes_since(self, version):
+        """
+        Cambios posteriores a una versión
+
+        Args:
+            version: última versión que conoce el cliente
+
+        Returns:
+            dict: {'version', 'reset', 'events'} con eventos 'entry'/'exit', o
+                  con reset=True, 'vehicles' y 'events' vacío si el cliente
+                  debe recargar todo (versión desconocida o ya fuera del
+                  registro de eventos)
+        """
+        with self._lock:
+            self._ensure_loaded()
+            current = self._version
+            oldest = self._events[0][0] if self._events else current + 1
+
+            if version == current:
+                return {'version': current, 'reset': False, 'events': []}
+
+            if version is None or version > current or version < oldest - 1:
+                return {
+                    'version': current,
+                    'reset': True,
+                    'vehicles': [open_vehicle_to_dict(r) for r in self.vehicles()],
+                    'events': []
+                }
+
+            events = [
+                {'version': v, 'event': event, 'vehicle': open_vehicle_to_dict(record)}
+                for v, event, record in self._events if v > version
+            ]
+            return {'version': current, 'reset': False, 'events': events}
+
+    def wait_for_change(self, version, timeout):
+        """
+        Esperar hasta que la versión sea distinta de la indicada
+
+        Returns:
+            bool: True si hubo cambios, False si venció el tiempo
+        """
+        with self._changed:
+            self._ensure_loaded()
+            return self._changed.wait_for(lambda: self._version != version, timeout)
+
+    def check(self, repair=False):
+        """
+        Comparar el índice con la base de datos
+
+        Args:
+            repair: True para reconstruir el índice si hay diferencias
+
+        Returns:
+            dict: IDs que faltan o sobran en el índice y si está consistente
+        """
+        db_records = {r.id: r for r in self._load_from_db()}
+
+        with self._lock:
+            self._ensure_loaded()
+            missing = sorted(set(db_records) - set(self._by_id))
+            extra = sorted(set(self._by_id) - set(db_records))
+            changed = sorted(
+                vid for vid in set(db_records) & set(self._by_id)
+                if db_records[vid] != self._by_id[vid]
+            )
+
+        consistent = not (missing or extra or changed)
+        if repair and not consistent:
+            self.rebuild()
+
+        return {
+            'consistent': consistent,
+            'missing': missing,
+            'extra': extra,
+            'changed': changed,
+            'repaired': repair and not consistent
+        }
+
+
+# Instancia global del índice
+occupancy = OccupancyIndex()
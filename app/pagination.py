@@ -0,0 +1,94 @@
+"""
+Paginación por clave (keyset / seek)
+En lugar de OFFSET, cada página continúa desde la última fila de la anterior
+comparando las columnas de orden (por ejemplo entry_time, id) con un WHERE
+que usa el índice. Así la página 100 cuesta lo mismo que la primera.
+
+La posición se entrega al cliente como un cursor opaco firmado con la
+SECRET_KEY: no se puede leer ni modificar desde el navegador.
+"""
+
+from collections import namedtuple
+from datetime import date, datetime
+from flask import current_app
+from itsdangerous import BadSignature, URLSafeSerializer
+from sqlalchemy import tuple_
+
+# Página de resultados: items y cursor de la siguiente (None si es la última)
+KeysetPage = namedtuple('KeysetPage', ['items', 'next_cursor', 'per_page'])
+
+
+class InvalidCursor(ValueError):
+    """Cursor dañado, modificado o de otra consulta"""
+
+
+def _serializer():
+    return URLSafeSerializer(current_app.config['SECRET_KEY'], salt='keyset-cursor')
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat()}
+    if isinstance(value, date):
+        return {'d': value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if 'dt' in value:
+            return datetime.fromisoformat(value['dt'])
+        if 'd' in value:
+            return date.fromisoformat(value['d'])
+    return value
+
+
+def encode_cursor(name, values):
+    """Cursor opaco con los valores de orden de la última fila de una página"""
+    return _serializer().dumps([name, [_encode_value(v) for v in values]])
+
+
+def decode_cursor(name, cursor):
+    """Valores de orden guardados en un cursor (InvalidCursor si no es válido)"""
+    try:
+        cursor_name, values = _serializer().loads(cursor)
+    except (BadSignature, TypeError, ValueError):
+        raise InvalidCursor("Cursor de paginación inválido")
+    if cursor_name != name:
+        raise InvalidCursor("El cursor corresponde a otra lista")
+    return [_decode_value(v) for v in values]
+
+
+def keyset_paginate(query, name, order_columns, cursor=None, per_page=50, descending=True):
+    """
+    Obtener una página de una consulta ordenada por columnas únicas
+
+    Args:
+        query: query de SQLAlchemy con los filtros ya aplicados (sin order_by)
+        name: nombre de la lista (un cursor solo sirve para la misma lista)
+        order_columns: columnas de orden; la última debe ser única (el id)
+        cursor: cursor recibido del cliente (None = primera página)
+        per_page: filas por página
+        descending: True para mostrar primero los más recientes
+
+    Returns:
+        KeysetPage
+    """
+    if cursor:
+        values = decode_cursor(name, cursor)
+        if len(values) != len(order_columns):
+            raise InvalidCursor("El cursor corresponde a otra lista")
+        position = tuple_(*order_columns)
+        query = query.filter(position < tuple_(*values) if descending
+                             else position > tuple_(*values))
+
+    query = query.order_by(*(col.desc() if descending else col.asc() for col in order_columns))
+    rows = query.limit(per_page + 1).all()
+
+    items = rows[:per_page]
+    next_cursor = None
+    if len(rows) > per_page:
+        last = items[-1]
+        next_cursor = encode_cursor(name, [getattr(last, col.key) for col in order_columns])
+
+    return KeysetPage(items=items, next_cursor=next_cursor, per_page=per_page)
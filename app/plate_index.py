@@ -0,0 +1,387 @@
+"""
+Índice en memoria para buscar patentes mientras se escriben
+Reúne las patentes de los vehículos estacionados y de los clientes mensuales
+en dos estructuras:
+- Un trie de prefijos para autocompletar: devuelve las patentes que empiezan
+  con lo escrito recorriendo solo la rama de ese prefijo.
+- Un índice de errores de lectura para sugerir "¿quiso decir...?": encuentra
+  las patentes que difieren en confusiones típicas (O/0, I/1, B/8, S/5...) y
+  a lo sumo un carácter más, sin comparar contra todas. Las sugerencias se
+  ordenan por distancia de edición, donde una confusión cuesta la mitad que
+  cualquier otro cambio.
+
+El índice no consulta la base: se sincroniza al buscar, aplicando los eventos
+de ingreso y salida del índice de ocupación desde la última versión vista y
+las patentes que cambiaron en la caché de clientes mensuales (solo cuando su
+generación cambió). Como ellos, es por proceso.
+"""
+
+import threading
+from collections import Counter, namedtuple
+from itertools import islice
+from app.occupancy import occupancy
+from app.monthly_cache import monthly_cache
+
+# Pares de caracteres que se confunden al leer o tipear una patente
+CONFUSABLE_PAIRS = ('O0', 'D0', 'Q0', 'I1', 'L1', 'B8', 'S5', 'Z2', 'G6')
+
+# Costos de edición (enteros: una confusión vale 1 y cualquier otro cambio 2)
+CONFUSION_COST = 1
+EDIT_COST = 2
+
+_CONFUSABLE = frozenset(frozenset(pair) for pair in CONFUSABLE_PAIRS)
+_FOLD = str.maketrans({letter: digit for letter, digit in CONFUSABLE_PAIRS})
+
+# Patente encontrada: si está estacionada (y el ID del vehículo) y si es de un mensual
+PlateMatch = namedtuple('PlateMatch', ['plate', 'open', 'vehicle_id', 'monthly', 'distance'])
+
+
+def normalize_plate(text):
+    """Patente escrita, en el formato en que se guarda (como en el ingreso)"""
+    return text.upper().strip()
+
+
+def substitution_cost(a, b):
+    if a == b:
+        return 0
+    return CONFUSION_COST if frozenset((a, b)) in _CONFUSABLE else EDIT_COST
+
+
+def plate_distance(a, b):
+    """
+    Distancia de edición ponderada entre dos patentes
+
+    Insertar, borrar o cambiar un carácter cuesta EDIT_COST; cambiarlo por
+    uno con el que se confunde cuesta CONFUSION_COST. Los costos son
+    simétricos, así que sirve para ordenar las sugerencias.
+    """
+    if a == b:
+        return 0
+    previous = list(range(0, (len(b) + 1) * EDIT_COST, EDIT_COST))
+    for i, char_a in enumerate(a, 1):
+        current = [i * EDIT_COST]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + EDIT_COST,
+                current[j - 1] + EDIT_COST,
+                previous[j - 1] + substitution_cost(char_a, char_b)
+            ))
+        previous = current
+    return previous[-1]
+
+
+def fold_distance(a, b):
+    """1 si dos claves plegadas difieren en una sola edición, 2 si en más"""
+    if a == b:
+        return 0
+    if abs(len(a) - len(b)) > 1:
+        return 2
+    if len(a) > len(b):
+        a, b = b, a
+    prefix = 0
+    while prefix < len(a) and a[prefix] == b[prefix]:
+        prefix += 1
+    if len(a) == len(b):
+        return 1 if a[prefix + 1:] == b[prefix + 1:] else 2
+    return 1 if a[prefix:] == b[prefix + 1:] else 2
+
+
+class _TrieNode:
+    __slots__ = ('children', 'terminal')
+
+    def __init__(self):
+        self.children = {}
+        self.terminal = False
+
+
+class PrefixTrie:
+    """Conjunto de patentes que se puede recorrer por prefijo en orden"""
+
+    def __init__(self):
+        self._root = _TrieNode()
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def insert(self, plate):
+        node = self._root
+        for char in plate:
+            node = node.children.setdefault(char, _TrieNode())
+        if not node.terminal:
+            node.terminal = True
+            self._size += 1
+
+    def remove(self, plate):
+        """Quitar una patente, borrando las ramas que quedan vacías"""
+        path = [self._root]
+        for char in plate:
+            node = path[-1].children.get(char)
+            if node is None:
+                return
+            path.append(node)
+        if not path[-1].terminal:
+            return
+
+        path[-1].terminal = False
+        self._size -= 1
+        for depth in range(len(plate), 0, -1):
+            if path[depth].terminal or path[depth].children:
+                break
+            del path[depth - 1].children[plate[depth - 1]]
+
+    def iterate(self, prefix):
+        """Patentes que empiezan con el prefijo, en orden alfabético (generador)"""
+        node = self._root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return
+
+        stack = [(prefix, node)]
+        while stack:
+            text, node = stack.pop()
+            if node.terminal:
+                yield text
+            # Apilar en orden inverso para sacar primero la letra menor
+            for char in sorted(node.children, reverse=True):
+                stack.append((text + char, node.children[char]))
+
+    def complete(self, prefix, limit):
+        """Hasta limit patentes que empiezan con el prefijo"""
+        return list(islice(self.iterate(prefix), limit))
+
+
+class TypoIndex:
+    """
+    Patentes agrupadas para encontrar las que difieren en una lectura errónea
+
+    Cada patente se "pliega" reemplazando los caracteres confundibles por uno
+    solo (O, D y Q por 0; I y L por 1; B por 8...), así que las patentes que
+    difieren solo en confusiones comparten la misma clave. Además cada clave
+    se registra bajo todas sus variantes con un carácter borrado: dos claves a
+    una edición de distancia (cambio, inserción o borrado) siempre comparten
+    alguna variante. Buscar cuesta unas pocas consultas a diccionarios, sin
+    recorrer las demás patentes, y agregar o quitar una patente solo toca sus
+    propias variantes.
+    """
+
+    def __init__(self):
+        self._plates = {}    # clave plegada -> patentes con esa clave
+        self._variants = {}  # variante con un borrado -> claves plegadas
+
+    def __len__(self):
+        return sum(len(plates) for plates in self._plates.values())
+
+    @staticmethod
+    def fold(plate):
+        return plate.translate(_FOLD)
+
+    @staticmethod
+    def _deletions(key):
+        return {key[:i] + key[i + 1:] for i in range(len(key))} | {key}
+
+    def add(self, plate):
+        key = self.fold(plate)
+        plates = self._plates.setdefault(key, set())
+        if not plates:
+            for variant in self._deletions(key):
+                self._variants.setdefault(variant, set()).add(key)
+        plates.add(plate)
+
+    def remove(self, plate):
+        key = self.fold(plate)
+        plates = self._plates.get(key)
+        if not plates or plate not in plates:
+            return
+        plates.discard(plate)
+        if plates:
+            return
+
+        del self._plates[key]
+        for variant in self._deletions(key):
+            keys = self._variants.get(variant)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._variants[variant]
+
+    def search(self, plate):
+        """
+        Patentes que difieren de plate en confusiones y a lo sumo una edición
+        más: lista de (plate_distance, patente), sin incluir la misma patente
+        """
+        key = self.fold(plate)
+        keys = set()
+        for variant in self._deletions(key):
+            keys.update(self._variants.get(variant, ()))
+
+        results = []
+        for candidate_key in keys:
+            # Dos claves con una variante en común pueden estar a dos ediciones
+            # (por ejemplo, una trasposición): se descartan
+            if fold_distance(key, candidate_key) > 1:
+                continue
+            for candidate in self._plates[candidate_key]:
+                if candidate != plate:
+                    results.append((plate_distance(plate, candidate), candidate))
+        return results
+
+
+class PlateIndex:
+    """Patentes de vehículos estacionados y de clientes mensuales"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._trie = PrefixTrie()
+        self._typos = TypoIndex()
+        self._open = Counter()  # patente -> vehículos estacionados con esa patente
+        self._monthly = set()
+        self._open_version = None
+        self._monthly_generation = None
+
+    # ---- Sincronización -------------------------------------------------
+
+    def _known(self, plate):
+        return plate in self._open or plate in self._monthly
+
+    def _added(self, plate):
+        """La patente pasó a estar en alguna de las fuentes"""
+        self._trie.insert(plate)
+        self._typos.add(plate)
+
+    def _removed(self, plate):
+        """La patente ya no está en ninguna fuente"""
+        self._trie.remove(plate)
+        self._typos.remove(plate)
+
+    def _set_open(self, plates):
+        """Reemplazar los estacionados por una lista completa"""
+        previous = set(self._open)
+        self._open = Counter(plates)
+        for plate in set(self._open) - previous:
+            if plate not in self._monthly:
+                self._added(plate)
+        for plate in previous - set(self._open):
+            if plate not in self._monthly:
+                self._removed(plate)
+
+    def _sync_open(self):
+        changes = occupancy.changes_since(self._open_version)
+        if changes['reset']:
+            self._set_open(v['plate'] for v in changes['vehicles'])
+
+        for event in changes['events']:
+            plate = event['vehicle']['plate']
+            if event['event'] == 'entry':
+                if not self._known(plate):
+                    self._added(plate)
+                self._open[plate] += 1
+            elif self._open[plate] > 0:
+                self._open[plate] -= 1
+                if not self._open[plate]:
+                    del self._open[plate]
+                    if plate not in self._monthly:
+                        self._removed(plate)
+            else:
+                self._open.pop(plate, None)
+        self._open_version = changes['version']
+
+    def _sync_monthly(self):
+        generation, entries = monthly_cache.snapshot()
+        if generation == self._monthly_generation:
+            return
+
+        plates = set(entries)
+        added, removed = plates - self._monthly, self._monthly - plates
+        self._monthly = plates
+        for plate in added:
+            if plate not in self._open:
+                self._added(plate)
+        for plate in removed:
+            if plate not in self._open:
+                self._removed(plate)
+        self._monthly_generation = generation
+
+    def _sync(self):
+        self._sync_open()
+        self._sync_monthly()
+
+    def sync(self):
+        """Aplicar los cambios de ocupación y de clientes mensuales pendientes"""
+        with self._lock:
+            self._sync()
+
+    def rebuild(self):
+        """Reconstruir el índice completo desde las otras cachés"""
+        with self._lock:
+            self._trie = PrefixTrie()
+            self._typos = TypoIndex()
+            self._open = Counter()
+            self._monthly = set()
+            self._open_version = None
+            self._monthly_generation = None
+            self._sync()
+
+    # ---- Búsquedas ------------------------------------------------------
+
+    def _match(self, plate, distance=0):
+        record = occupancy.find_plate(plate) if plate in self._open else None
+        return PlateMatch(
+            plate=plate,
+            open=plate in self._open,
+            vehicle_id=record.id if record else None,
+            monthly=plate in self._monthly,
+            distance=distance
+        )
+
+    def _allowed(self, plate, sources):
+        return (('open' in sources and plate in self._open) or
+                ('monthly' in sources and plate in self._monthly))
+
+    def complete(self, prefix, limit=10, sources=('open', 'monthly')):
+        """
+        Patentes que empiezan con el prefijo
+
+        Returns:
+            list: PlateMatch en orden alfabético
+        """
+        prefix = normalize_plate(prefix)
+        with self._lock:
+            self._sync()
+            plates = (p for p in self._trie.iterate(prefix) if self._allowed(p, sources))
+            return [self._match(plate) for plate in islice(plates, limit)]
+
+    def similar(self, plate, limit=10, sources=('open', 'monthly')):
+        """
+        Patentes parecidas ("¿quiso decir...?"), sin incluir la misma patente
+
+        Args:
+            plate: patente escrita
+            limit: cantidad máxima de resultados
+            sources: 'open' (estacionados) y/o 'monthly' (clientes mensuales)
+
+        Returns:
+            list: PlateMatch de la más parecida a la menos parecida
+        """
+        plate = normalize_plate(plate)
+        with self._lock:
+            self._sync()
+            found = sorted(
+                (distance, candidate)
+                for distance, candidate in self._typos.search(plate)
+                if self._allowed(candidate, sources)
+            )
+            return [self._match(candidate, distance) for distance, candidate in found[:limit]]
+
+    def stats(self):
+        """Cantidad de patentes indexadas, en total y por fuente"""
+        with self._lock:
+            return {
+                'plates': len(self._trie),
+                'open': len(self._open),
+                'monthly': len(self._monthly)
+            }
+
+
+plate_index = PlateIndex()
@@ -0,0 +1,178 @@
+"""
+Cola de impresión persistente para tickets de entrada y salida
+Los trabajos se guardan en la tabla print_job junto con el movimiento del
+vehículo y un hilo en segundo plano los envía a la impresora, con reintentos
+y espera exponencial si la impresora no responde.
+"""
+
+import threading
+from datetime import datetime, timedelta
+from app import db
+from app.models.models import PrintJob, Vehicle
+from app.printer_service import printer_service
+
+
+class PrintSpooler:
+    """Cola de trabajos de impresión atendida por un hilo en segundo plano"""
+
+    def __init__(self):
+        self.app = None
+        self.max_attempts = 5
+        self.retry_base = 2
+        self.retry_max = 60
+        self.poll_interval = 10
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._wakeup = threading.Event()
+
+    def init_app(self, app):
+        """Registrar la cola en la aplicación Flask"""
+        self.app = app
+        self.max_attempts = app.config.get('PRINT_MAX_ATTEMPTS', self.max_attempts)
+        self.retry_base = app.config.get('PRINT_RETRY_BASE', self.retry_base)
+        self.retry_max = app.config.get('PRINT_RETRY_MAX', self.retry_max)
+        self.poll_interval = app.config.get('PRINT_POLL_INTERVAL', self.poll_interval)
+
+        # El hilo se inicia con la primera petición, así el proceso
+        # supervisor del modo debug no imprime tickets por duplicado
+        app.before_request(self.ensure_started)
+
+    def ensure_started(self):
+        """Iniciar el hilo de impresión si todavía no está corriendo"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+
+            self._recover_interrupted_jobs()
+            self._thread = threading.Thread(
+                target=self._run,
+                name='print-spooler',
+                daemon=True
+            )
+            self._thread.start()
+
+    def enqueue(self, kind, vehicle):
+        """
+        Agregar un ticket a la cola dentro de la transacción actual
+
+        El trabajo queda guardado con el mismo commit que el movimiento del
+        vehículo; después del commit hay que llamar a notify().
+
+        Args:
+            kind: 'entry' o 'exit'
+            vehicle: Objeto Vehicle ya agregado a la sesión
+
+        Returns:
+            PrintJob: trabajo creado (sin commit)
+        """
+        job = PrintJob(kind=kind, vehicle_id=vehicle.id)
+        db.session.add(job)
+        return job
+
+    def notify(self):
+        """Despertar al hilo de impresión para atender trabajos nuevos"""
+        self.ensure_started()
+        self._wakeup.set()
+
+    def process_pending(self):
+        """
+        Procesar todos los trabajos pendientes cuyo reintento ya venció
+
+        Returns:
+            int: cantidad de trabajos procesados
+        """
+        processed = 0
+
+        while True:
+            job = PrintJob.query.filter(
+                PrintJob.status == 'pending',
+                PrintJob.next_attempt_at <= datetime.now()
+            ).order_by(PrintJob.id).first()
+
+            if not job:
+                return processed
+
+            # Reclamar el trabajo de forma atómica
+            claimed = PrintJob.query.filter_by(
+                id=job.id,
+                status='pending'
+            ).update({'status': 'printing'})
+            db.session.commit()
+
+            if claimed:
+                self._process_job(db.session.get(PrintJob, job.id))
+                processed += 1
+
+    def _process_job(self, job):
+        """Enviar un trabajo a la impresora y registrar el resultado"""
+        job.attempts += 1
+        vehicle = db.session.get(Vehicle, job.vehicle_id)
+
+        try:
+            if not vehicle:
+                success, message = (False, "Vehículo no encontrado")
+            elif job.kind == 'entry':
+                success, message = printer_service.print_entry_ticket(vehicle)
+            else:
+                success, message = printer_service.print_exit_ticket(vehicle)
+        except Exception as e:
+            success, message = (False, f"Error al imprimir: {str(e)}")
+
+        if success:
+            job.status = 'done'
+            job.last_error = None
+            job.printed_at = datetime.now()
+        elif not vehicle or not printer_service.enabled or job.attempts >= self.max_attempts:
+            # No tiene sentido reintentar
+            job.status = 'failed'
+            job.last_error = message[:200]
+        else:
+            delay = min(self.retry_base * 2 ** (job.attempts - 1), self.retry_max)
+            job.status = 'pending'
+            job.last_error = message[:200]
+            job.next_attempt_at = datetime.now() + timedelta(seconds=delay)
+
+        db.session.commit()
+
+    def _seconds_until_next_job(self):
+        """Segundos hasta el próximo reintento programado"""
+        next_attempt = db.session.query(
+            db.func.min(PrintJob.next_attempt_at)
+        ).filter(PrintJob.status == 'pending').scalar()
+
+        if next_attempt is None:
+            return self.poll_interval
+
+        wait = (next_attempt - datetime.now()).total_seconds()
+        return max(0, min(wait, self.poll_interval))
+
+    def _recover_interrupted_jobs(self):
+        """Volver a encolar trabajos que quedaron a medias por un reinicio"""
+        try:
+            with self.app.app_context():
+                PrintJob.query.filter_by(status='printing').update({'status': 'pending'})
+                db.session.commit()
+        except Exception as e:
+            print(f"Error recuperando cola de impresión: {e}")
+
+    def _run(self):
+        """Bucle principal del hilo de impresión"""
+        while True:
+            self._wakeup.clear()
+
+            try:
+                with self.app.app_context():
+                    self.process_pending()
+                    wait = self._seconds_until_next_job()
+            except Exception as e:
+                print(f"Error en cola de impresión: {e}")
+                wait = self.poll_interval
+
+            self._wakeup.wait(wait)
+
+
+# Instancia global de la cola
+print_spooler = PrintSpooler()
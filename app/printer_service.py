@@ -5,11 +5,14 @@ Utiliza comandos ESC/POS para imprimir tickets de entrada y salida
 
 from escpos.printer import Network
 from escpos.exceptions import Error as EscposError
-from datetime import datetime
-import io
-import base64
-from PIL import Image
+import select
+import socket
+import threading
+import time
 from config import Config
+from app.ticket_templates import (
+    ticket_templates, entry_ticket_blocks, exit_ticket_blocks, test_ticket_blocks
+)
 
 class PrinterService:
     """Servicio para manejar impresión de tickets térmicos"""
@@ -20,25 +23,78 @@ class PrinterService:
         self.printer_ip = Config.PRINTER_IP
         self.printer_port = Config.PRINTER_PORT
         self.timeout = Config.PRINTER_TIMEOUT
+        self.keep_alive = Config.PRINTER_KEEP_ALIVE
+        self.idle_timeout = Config.PRINTER_IDLE_TIMEOUT
+        self.use_templates = Config.PRINTER_TEMPLATES
+        self.native_qr = Config.PRINTER_NATIVE_QR
         self.printer = None
+        
+        # Los hilos de Flask y la cola de impresión comparten la conexión
+        self._lock = threading.RLock()
+        self._last_used = 0
+        self._reused = False
+        self.stats = {
+            'tickets': 0,
+            'connections': 0,
+            'reused': 0,
+            'reconnects': 0,
+            'connect_ms_total': 0.0,
+            'ticket_ms_total': 0.0,
+            'last_connect_ms': None,
+            'last_ticket_ms': None
+        }
+    
+    def _is_alive(self):
+        """Verificar que la conexión abierta siga viva"""
+        device = getattr(self.printer, '_device', None) if self.printer else None
+        if not device:
+            return False
+        
+        if time.monotonic() - self._last_used > self.idle_timeout:
+            return False
+        
+        try:
+            # Un socket legible que devuelve 0 bytes fue cerrado por la impresora
+            readable, _, _ = select.select([device], [], [], 0)
+            if readable and not device.recv(1, socket.MSG_PEEK):
+                return False
+            return True
+        except (OSError, ValueError):
+            return False
     
     def _connect(self):
-        """Conectar a la impresora"""
+        """Conectar a la impresora (reutiliza la conexión en modo keep-alive)"""
         if not self.enabled:
             return False
         
+        if self.keep_alive and self._is_alive():
+            self._reused = True
+            self.stats['reused'] += 1
+            return True
+        
+        self._disconnect()
+        self._reused = False
+        
         try:
             if self.printer_type == 'network':
+                start = time.perf_counter()
                 self.printer = Network(
                     self.printer_ip,
                     port=self.printer_port,
                     timeout=self.timeout
                 )
+                self.printer.open()
+                
+                connect_ms = (time.perf_counter() - start) * 1000
+                self.stats['connections'] += 1
+                self.stats['connect_ms_total'] += connect_ms
+                self.stats['last_connect_ms'] = round(connect_ms, 2)
                 return True
             else:
                 raise ValueError(f"Tipo de impresora no soportado: {self.printer_type}")
         except Exception as e:
             print(f"Error conectando a impresora: {e}")
+            self.printer = None
             return False
     
     def _disconnect(self):
@@ -50,32 +106,89 @@ class PrinterService:
                 pass
             self.printer = None
     
-    def _print_header(self):
-        """Imprimir encabezado del ticket"""
-        self.printer.set(align='center', bold=True, width=2, height=2)
-        self.printer.text("ESTACIONAMIENTO\n")
-        self.printer.set(align='center', bold=False)
-        self.printer.text("================================\n")
+    def _release(self):
+        """Liberar la impresora después de un ticket"""
+        self._last_used = time.monotonic()
+        if not self.keep_alive:
+            self._disconnect()
     
-    def _print_qr_from_base64(self, qr_base64):
-        """Imprimir código QR desde base64"""
-        try:
-            # Decodificar imagen base64
-            img_data = base64.b64decode(qr_base64)
-            img = Image.open(io.BytesIO(img_data))
-            
-            # Convertir a formato compatible
-            img = img.convert('1')  # Convertir a blanco y negro
-            
-            # Imprimir imagen
-            self.printer.set(align='center')
-            self.printer.image(img, impl='bitImageColumn')
-            self.printer.text("\n")
-        except Exception as e:
-            print(f"Error imprimiendo QR: {e}")
-            # Si falla, imprimir el ID como texto
-            self.printer.set(align='center', bold=True)
-            self.printer.text(f"ID: {qr_base64[:10]}\n")
+    def _send(self, render):
+        """
+        Ejecutar render() con la impresora conectada
+        
+        Si una conexión reutilizada falla, se reconecta y se reintenta una vez.
+        
+        Args:
+            render: Función que escribe el ticket en self.printer
+        
+        Returns:
+            bool: False si no se pudo conectar a la impresora
+        """
+        with self._lock:
+            start = time.perf_counter()
+            
+            for attempt in range(2):
+                if not self._connect():
+                    return False
+                
+                try:
+                    render()
+                except (OSError, EscposError):
+                    self._disconnect()
+                    if self._reused and attempt == 0:
+                        self.stats['reconnects'] += 1
+                        continue
+                    raise
+                except Exception:
+                    self._disconnect()
+                    raise
+                
+                self._release()
+                break
+            
+            ticket_ms = (time.perf_counter() - start) * 1000
+            self.stats['tickets'] += 1
+            self.stats['ticket_ms_total'] += ticket_ms
+            self.stats['last_ticket_ms'] = round(ticket_ms, 2)
+            return True
+    
+    def get_stats(self):
+        """
+        Métricas de conexión para comparar conexión nueva vs reutilizada
+        
+        Returns:
+            dict: contadores y promedios en milisegundos
+        """
+        with self._lock:
+            stats = dict(self.stats)
+        
+        stats['keep_alive'] = self.keep_alive
+        stats['connect_ms_total'] = round(stats['connect_ms_total'], 2)
+        stats['ticket_ms_total'] = round(stats['ticket_ms_total'], 2)
+        stats['avg_connect_ms'] = round(
+            stats['connect_ms_total'] / stats['connections'], 2
+        ) if stats['connections'] else None
+        stats['avg_ticket_ms'] = round(
+            stats['ticket_ms_total'] / stats['tickets'], 2
+        ) if stats['tickets'] else None
+        return stats
+    
+    def _write_ticket(self, blocks):
+        """
+        Escribir un ticket en la impresora conectada
+        
+        Con plantillas activas el ticket se arma en un único buffer (partes
+        fijas desde caché) y se envía en una sola escritura; si no, cada
+        bloque se envía por separado.
+        
+        Args:
+            blocks: Lista de (clave, función) de app.ticket_templates
+        """
+        if self.use_templates:
+            self.printer._raw(ticket_templates.build(blocks))
+        else:
+            for _, render in blocks:
+                render(self.printer)
     
     def print_entry_ticket(self, vehicle):
         """
@@ -91,77 +204,20 @@ class PrinterService:
             return (False, "Impresora deshabilitada")
         
         try:
-            # Conectar a impresora
-            if not self._connect():
+            if not self._send(lambda: self._render_entry_ticket(vehicle)):
                 return (False, "No se pudo conectar a la impresora")
             
-            # Encabezado
-            self._print_header()
-            
-            # Tipo de ticket
-            self.printer.set(align='center', bold=True)
-            self.printer.text("*** TICKET DE ENTRADA ***\n\n")
-            
-            # Código QR
-            if vehicle.qr_code:
-                self._print_qr_from_base64(vehicle.qr_code)
-            
-            # Información del vehículo
-            self.printer.set(align='left', bold=False)
-            self.printer.text(f"ID: {vehicle.id}\n")
-            self.printer.text(f"Patente: {vehicle.plate}\n")
-            
-            # Tipo de vehículo
-            vehicle_icon = "Auto" if vehicle.type == 'auto' else "Moto"
-            self.printer.text(f"Tipo: {vehicle_icon}\n")
-            
-            # Fecha y hora
-            entry_time = vehicle.entry_time.strftime('%d/%m/%Y %H:%M:%S')
-            self.printer.text(f"Entrada: {entry_time}\n")
-            
-            # Operador
-            self.printer.text(f"Operador: {vehicle.operator_name}\n")
-            
-            # Cliente mensual
-            if vehicle.is_monthly:
-                self.printer.text("\n")
-                self.printer.set(align='center', bold=True)
-                self.printer.text("*** CLIENTE MENSUAL ***\n")
-                self.printer.set(align='left', bold=False)
-            else:
-                # Tarifas
-                self.printer.text("\n")
-                self.printer.text("TARIFAS:\n")
-                if vehicle.type == 'auto':
-                    self.printer.text("1ra hora: $500\n")
-                    self.printer.text("c/15 min: $125\n")
-                else:
-                    self.printer.text("1ra hora: $300\n")
-                    self.printer.text("c/15 min: $75\n")
-            
-            # Pie de página
-            self.printer.text("\n")
-            self.printer.set(align='center')
-            self.printer.text("================================\n")
-            self.printer.text("Conserve este ticket\n")
-            self.printer.text("Gracias por su visita\n")
-            self.printer.text("\n\n")
-            
-            # Cortar papel
-            self.printer.cut()
-            
-            # Desconectar
-            self._disconnect()
-            
             return (True, "Ticket impreso correctamente")
             
         except EscposError as e:
-            self._disconnect()
             return (False, f"Error de impresora: {str(e)}")
         except Exception as e:
-            self._disconnect()
             return (False, f"Error inesperado: {str(e)}")
     
+    def _render_entry_ticket(self, vehicle):
+        """Escribir el ticket de entrada en la impresora conectada"""
+        self._write_ticket(entry_ticket_blocks(vehicle, native_qr=self.native_qr))
+    
     def print_exit_ticket(self, vehicle):
         """
         Imprimir ticket de salida
@@ -176,82 +232,20 @@ class PrinterService:
             return (False, "Impresora deshabilitada")
         
         try:
-            # Conectar a impresora
-            if not self._connect():
+            if not self._send(lambda: self._render_exit_ticket(vehicle)):
                 return (False, "No se pudo conectar a la impresora")
             
-            # Encabezado
-            self._print_header()
-            
-            # Tipo de ticket
-            self.printer.set(align='center', bold=True)
-            self.printer.text("*** TICKET DE SALIDA ***\n\n")
-            
-            # Información del vehículo
-            self.printer.set(align='left', bold=False)
-            self.printer.text(f"ID: {vehicle.id}\n")
-            self.printer.text(f"Patente: {vehicle.plate}\n")
-            
-            # Tipo de vehículo
-            vehicle_icon = "Auto" if vehicle.type == 'auto' else "Moto"
-            self.printer.text(f"Tipo: {vehicle_icon}\n")
-            
-            # Fechas y horas
-            entry_time = vehicle.entry_time.strftime('%d/%m/%Y %H:%M:%S')
-            exit_time = vehicle.exit_time.strftime('%d/%m/%Y %H:%M:%S')
-            
-            self.printer.text("\n")
-            self.printer.text(f"Entrada:  {entry_time}\n")
-            self.printer.text(f"Salida:   {exit_time}\n")
-            
-            # Calcular tiempo de permanencia
-            time_diff = vehicle.exit_time - vehicle.entry_time
-            total_minutes = int(time_diff.total_seconds() / 60)
-            hours = total_minutes // 60
-            minutes = total_minutes % 60
-            
-            self.printer.text(f"Tiempo:   {hours}h {minutes}min\n")
-            
-            # Operadores
-            self.printer.text("\n")
-            self.printer.text(f"Op. Entrada: {vehicle.operator_name}\n")
-            self.printer.text(f"Op. Salida:  {vehicle.exit_operator_name}\n")
-            
-            # Total a pagar
-            self.printer.text("\n")
-            self.printer.text("================================\n")
-            
-            if vehicle.is_monthly:
-                self.printer.set(align='center', bold=True, width=2, height=2)
-                self.printer.text("CLIENTE MENSUAL\n")
-                self.printer.set(align='center', bold=True)
-                self.printer.text("SIN CARGO\n")
-            else:
-                self.printer.set(align='center', bold=True, width=2, height=2)
-                self.printer.text(f"TOTAL: ${vehicle.total_cost}\n")
-            
-            # Pie de página
-            self.printer.set(align='center', bold=False)
-            self.printer.text("================================\n")
-            self.printer.text("Gracias por su visita\n")
-            self.printer.text("Vuelva pronto\n")
-            self.printer.text("\n\n")
-            
-            # Cortar papel
-            self.printer.cut()
-            
-            # Desconectar
-            self._disconnect()
-            
             return (True, "Ticket impreso correctamente")
             
         except EscposError as e:
-            self._disconnect()
             return (False, f"Error de impresora: {str(e)}")
         except Exception as e:
-            self._disconnect()
             return (False, f"Error inesperado: {str(e)}")
     
+    def _render_exit_ticket(self, vehicle):
+        """Escribir el ticket de salida en la impresora conectada"""
+        self._write_ticket(exit_ticket_blocks(vehicle))
+    
     def test_connection(self):
         """
         Probar conexión con la impresora
@@ -263,27 +257,17 @@ class PrinterService:
             return (False, "Impresora deshabilitada en configuración")
         
         try:
-            if not self._connect():
+            if not self._send(self._render_test_ticket):
                 return (False, "No se pudo conectar a la impresora")
             
-            # Imprimir ticket de prueba
-            self.printer.set(align='center', bold=True)
-            self.printer.text("TEST DE IMPRESORA\n")
-            self.printer.set(align='center', bold=False)
-            self.printer.text("================================\n")
-            self.printer.text(f"Fecha: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}\n")
-            self.printer.text(f"IP: {self.printer_ip}\n")
-            self.printer.text("Conexion exitosa!\n")
-            self.printer.text("================================\n")
-            self.printer.text("\n\n")
-            self.printer.cut()
-            
-            self._disconnect()
             return (True, "Conexión exitosa - Ticket de prueba impreso")
             
         except Exception as e:
-            self._disconnect()
             return (False, f"Error: {str(e)}")
+    
+    def _render_test_ticket(self):
+        """Escribir el ticket de prueba en la impresora conectada"""
+        self._write_ticket(test_ticket_blocks(self.printer_ip))
 
 
 # Instancia global del servicio
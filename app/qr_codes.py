@@ -0,0 +1,60 @@
+"""
+Generación de códigos QR de vehículos
+El QR solo contiene el ID del vehículo, así que se genera a pedido y se guarda
+en una caché LRU acotada en lugar de almacenarlo en la base de datos.
+"""
+
+from functools import lru_cache
+import io
+import qrcode
+import qrcode.image.svg
+from config import Config
+
+
+def _make_qr(vehicle_id):
+    """Armar el QR con el mismo formato que el ticket original"""
+    qr = qrcode.QRCode(version=1, box_size=10, border=4)
+    qr.add_data(str(vehicle_id))
+    qr.make(fit=True)
+    return qr
+
+
+@lru_cache(maxsize=Config.QR_CACHE_SIZE)
+def qr_png(vehicle_id):
+    """
+    QR del vehículo en formato PNG
+
+    Args:
+        vehicle_id: ID del vehículo
+
+    Returns:
+        bytes: imagen PNG
+    """
+    img = _make_qr(vehicle_id).make_image(fill_color="black", back_color="white")
+
+    buffer = io.BytesIO()
+    img.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+@lru_cache(maxsize=Config.QR_CACHE_SIZE)
+def qr_svg(vehicle_id):
+    """
+    QR del vehículo en formato SVG
+
+    Args:
+        vehicle_id: ID del vehículo
+
+    Returns:
+        bytes: documento SVG
+    """
+    img = _make_qr(vehicle_id).make_image(image_factory=qrcode.image.svg.SvgPathImage)
+
+    buffer = io.BytesIO()
+    img.save(buffer)
+    return buffer.getvalue()
+
+
+def qr_etag(vehicle_id, fmt):
+    """ETag del QR: el contenido depende solo del ID y del formato"""
+    return f"qr-{vehicle_id}-{fmt}"
@@ -0,0 +1,240 @@
+"""
+Consultas agregadas para reportes y estadísticas
+Los totales se calculan en la base de datos con COUNT/SUM sobre rangos de
+fechas [inicio, fin), que pueden usar el índice de entry_time (o de
+login_time en asistencias), en lugar de cargar cada fila y sumar en Python.
+
+Los listados de solo lectura leen filas livianas (named tuples con las
+columnas que se muestran) en lugar de objetos del ORM, que además de sus
+columnas arman el estado de sesión y pasan por el identity map.
+"""
+
+from datetime import datetime, time, timedelta
+from sqlalchemy import case, func
+from sqlalchemy.orm import joinedload
+from app import db
+from app.models.models import Vehicle, Attendance, User
+
+# Columnas de vehicle que muestran los listados (reportes y auditoría)
+VEHICLE_LIST_COLUMNS = (
+    Vehicle.id, Vehicle.plate, Vehicle.type, Vehicle.entry_time, Vehicle.exit_time,
+    Vehicle.is_monthly, Vehicle.total_cost, Vehicle.operator_name, Vehicle.exit_operator_name
+)
+
+
+def day_range(day):
+    """
+    Rango [inicio, fin) de un día calendario
+
+    Args:
+        day: date (o datetime) del día
+
+    Returns:
+        tuple: (datetime de inicio, datetime del inicio del día siguiente)
+    """
+    if isinstance(day, datetime):
+        day = day.date()
+    start = datetime.combine(day, time.min)
+    return start, start + timedelta(days=1)
+
+
+def vehicle_totals_query(start, end=None):
+    """Query de COUNT/SUM de vehicle_totals (sin ejecutar)"""
+    query = db.session.query(
+        func.count(Vehicle.id),
+        func.coalesce(func.sum(
+            case((Vehicle.exit_time.isnot(None), Vehicle.total_cost), else_=0)
+        ), 0),
+        func.coalesce(func.sum(
+            case((Vehicle.exit_time.is_(None), 1), else_=0)
+        ), 0)
+    ).filter(Vehicle.entry_time >= start)
+
+    if end is not None:
+        query = query.filter(Vehicle.entry_time < end)
+    return query
+
+
+def vehicle_totals(start, end=None):
+    """
+    Totales de los vehículos que ingresaron en un rango
+
+    Args:
+        start: inicio del rango (inclusive)
+        end: fin del rango (exclusivo, None = sin límite)
+
+    Returns:
+        dict: {'vehicles', 'earnings', 'active'}; la recaudación solo
+              cuenta vehículos con salida registrada
+    """
+    vehicles, earnings, active = vehicle_totals_query(start, end).one()
+    return {'vehicles': vehicles, 'earnings': earnings, 'active': active}
+
+
+def vehicle_rows():
+    """Query de filas (named tuples) con VEHICLE_LIST_COLUMNS, sin filtros"""
+    return db.session.query(*VEHICLE_LIST_COLUMNS)
+
+
+def vehicles_of_day(day):
+    """Vehículos que ingresaron en una jornada, en orden de ingreso (query sin ejecutar)"""
+    return vehicle_rows().filter(
+        Vehicle.business_day == day
+    ).order_by(Vehicle.entry_time, Vehicle.id)
+
+
+def vehicles_in_range(start, end):
+    """Vehículos que ingresaron en el rango, en orden de ingreso (query sin ejecutar)"""
+    return vehicle_rows().filter(
+        Vehicle.entry_time >= start,
+        Vehicle.entry_time < end
+    ).order_by(Vehicle.entry_time, Vehicle.id)
+
+
+def attendances_with_user():
+    """
+    Query de asistencias que trae al usuario en el mismo SELECT
+
+    Los listados muestran usuario, nombre y rol de cada asistencia; sin el
+    JOIN cada usuario distinto se lee con otro SELECT al armar la página.
+    """
+    return Attendance.query.options(
+        joinedload(Attendance.user).load_only(User.username, User.name, User.role)
+    )
+
+
+def week_start(day):
+    """Lunes (a las 00:00) de la semana de un día"""
+    if isinstance(day, datetime):
+        day = day.date()
+    return datetime.combine(day - timedelta(days=day.weekday()), time.min)
+
+
+# ============================================
+# ASISTENCIAS
+# ============================================
+
+# Jornada de la asistencia y lunes de su semana (SQLite: 'weekday 0' avanza al domingo)
+_attendance_day = Attendance.business_day
+_attendance_week = func.date(Attendance.business_day, 'weekday 0', '-6 days')
+
+
+def _attendance_range(query, start, end):
+    query = query.filter(Attendance.login_time >= start)
+    if end is not None:
+        query = query.filter(Attendance.login_time < end)
+    return query
+
+
+def _hours_sum():
+    return func.round(func.coalesce(func.sum(Attendance.total_hours), 0), 2)
+
+
+def attendance_by_user(start, end=None):
+    """
+    Totales de asistencia por usuario en un rango (una fila por usuario)
+
+    Args:
+        start: inicio del rango (inclusive)
+        end: fin del rango (exclusivo, None = sin límite)
+
+    Returns:
+        dict: {user_id: {'sessions', 'days', 'total_hours'}}; los usuarios
+              sin asistencias en el rango no aparecen
+    """
+    query = _attendance_range(db.session.query(
+        Attendance.user_id,
+        func.count(Attendance.id),
+        func.count(func.distinct(_attendance_day)),
+        _hours_sum()
+    ), start, end).group_by(Attendance.user_id)
+
+    return {
+        user_id: {'sessions': sessions, 'days': days, 'total_hours': hours}
+        for user_id, sessions, days, hours in query
+    }
+
+
+def attendance_by_week(start, end=None):
+    """
+    Totales de asistencia por semana (de lunes a domingo) en un rango
+
+    Returns:
+        list: dicts {'week_start', 'sessions', 'employees', 'total_hours'}
+              ordenados por semana
+    """
+    query = _attendance_range(db.session.query(
+        _attendance_week,
+        func.count(Attendance.id),
+        func.count(func.distinct(Attendance.user_id)),
+        _hours_sum()
+    ), start, end).group_by(_attendance_week).order_by(_attendance_week)
+
+    return [
+        {
+            'week_start': datetime.strptime(week, '%Y-%m-%d'),
+            'sessions': sessions,
+            'employees': employees,
+            'total_hours': hours
+        }
+        for week, sessions, employees, hours in query
+    ]
+
+
+def attendance_by_day(user_id, start, end=None):
+    """
+    Asistencia de un usuario agrupada por día (una fila por día trabajado)
+
+    Returns:
+        list: dicts {'day', 'sessions', 'first_login', 'last_logout',
+              'total_hours'} ordenados por día
+    """
+    query = _attendance_range(db.session.query(
+        _attendance_day,
+        func.count(Attendance.id),
+        func.min(Attendance.login_time),
+        func.max(Attendance.logout_time),
+        _hours_sum()
+    ).filter(Attendance.user_id == user_id), start, end)
+    query = query.group_by(_attendance_day).order_by(_attendance_day)
+
+    return [
+        {
+            'day': day,
+            'sessions': sessions,
+            'first_login': first_login,
+            'last_logout': last_logout,
+            'total_hours': hours
+        }
+        for day, sessions, first_login, last_logout, hours in query
+    ]
+
+
+def attendance_by_weekday(user_id, start, end=None):
+    """
+    Jornadas completadas y horas de un usuario por día de la semana
+
+    Returns:
+        list: 7 dicts {'weekday', 'sessions', 'total_hours'}, de lunes (0)
+              a domingo (6), incluyendo los días sin registros
+    """
+    # strftime('%w'): 0 = domingo ... 6 = sábado
+    weekday = func.strftime('%w', Attendance.business_day)
+    query = _attendance_range(db.session.query(
+        weekday,
+        func.count(Attendance.id),
+        _hours_sum()
+    ).filter(
+        Attendance.user_id == user_id,
+        Attendance.total_hours > 0
+    ), start, end).group_by(weekday)
+
+    totals = {(int(day) - 1) % 7: (sessions, hours) for day, sessions, hours in query}
+    return [
+        {
+            'weekday': index,
+            'sessions': totals.get(index, (0, 0))[0],
+            'total_hours': totals.get(index, (0, 0))[1]
+        }
+        for index in range(7)
+    ]
@@ -0,0 +1,149 @@
+"""
+Totales materializados de vehículos (tabla vehicle_rollup)
+Cada fila acumula los vehículos que ingresaron en un día y hora, de un tipo
+y registrados por un operador: ingresos, ingresos de mensuales, salidas,
+recaudación y minutos de permanencia. La fila se actualiza con un UPSERT en
+la misma transacción del ingreso y de la salida, así que los reportes de
+semanas o meses suman unos cientos de filas en lugar de todo el historial.
+
+Reconstruir un rango (por ejemplo después de editar la base a mano):
+    python backfill_rollup.py [desde] [hasta]
+"""
+
+from datetime import datetime
+from sqlalchemy import and_, func, or_, text
+from sqlalchemy.dialects.sqlite import insert
+from app import db
+from app.models.models import VehicleRollup
+
+
+def _bucket(vehicle):
+    """Clave de la fila de un vehículo (según su ingreso)"""
+    return {
+        'day': vehicle.entry_time.date(),
+        'hour': vehicle.entry_time.hour,
+        'vehicle_type': vehicle.type,
+        'operator_name': vehicle.operator_name or ''
+    }
+
+
+def _upsert(values, increments):
+    """Sumar los incrementos a la fila, creándola si no existe"""
+    table = VehicleRollup.__table__
+    row = dict(values, entries=0, monthly_entries=0, exits=0, revenue=0.0, total_minutes=0.0)
+    row.update(increments)
+
+    statement = insert(table).values(**row).on_conflict_do_update(
+        index_elements=[table.c.day, table.c.hour, table.c.vehicle_type, table.c.operator_name],
+        set_={name: table.c[name] + amount for name, amount in increments.items()}
+    )
+    db.session.execute(statement)
+
+
+def record_entry(vehicle):
+    """Sumar un ingreso (dentro de la transacción del ingreso, antes del commit)"""
+    _upsert(_bucket(vehicle), {
+        'entries': 1,
+        'monthly_entries': 1 if vehicle.is_monthly else 0
+    })
+
+
+def record_exit(vehicle):
+    """Sumar una salida (dentro de la transacción de la salida, antes del commit)"""
+    minutes = (vehicle.exit_time - vehicle.entry_time).total_seconds() / 60
+    _upsert(_bucket(vehicle), {
+        'exits': 1,
+        'revenue': vehicle.total_cost or 0.0,
+        'total_minutes': minutes
+    })
+
+
+def rebuild_rollup(conn, start=None, end=None):
+    """
+    Recalcular las filas de un rango de días desde la tabla vehicle
+
+    Args:
+        conn: conexión o sesión de SQLAlchemy (el llamador hace el commit)
+        start: primer día (date, None = desde el principio)
+        end: día siguiente al último (date, None = hasta el final)
+
+    Returns:
+        int: filas generadas
+    """
+    vehicle_filter = ["entry_time IS NOT NULL"]
+    day_filter = ["1 = 1"]
+    params = {}
+    if start is not None:
+        vehicle_filter.append("entry_time >= :start")
+        day_filter.append("day >= :start_day")
+        params['start'] = str(datetime.combine(start, datetime.min.time()))
+        params['start_day'] = start.isoformat()
+    if end is not None:
+        vehicle_filter.append("entry_time < :end")
+        day_filter.append("day < :end_day")
+        params['end'] = str(datetime.combine(end, datetime.min.time()))
+        params['end_day'] = end.isoformat()
+
+    conn.execute(text(f"DELETE FROM vehicle_rollup WHERE {' AND '.join(day_filter)}"), params)
+    result = conn.execute(text(f"""
+        INSERT INTO vehicle_rollup (day, hour, vehicle_type, operator_name, entries,
+                                    monthly_entries, exits, revenue, total_minutes)
+        SELECT date(entry_time),
+               CAST(strftime('%H', entry_time) AS INTEGER),
+               type,
+               COALESCE(operator_name, ''),
+               COUNT(*),
+               SUM(CASE WHEN is_monthly THEN 1 ELSE 0 END),
+               SUM(CASE WHEN exit_time IS NOT NULL THEN 1 ELSE 0 END),
+               COALESCE(SUM(CASE WHEN exit_time IS NOT NULL THEN total_cost END), 0),
+               COALESCE(SUM(CASE WHEN exit_time IS NOT NULL
+                            THEN (julianday(exit_time) - julianday(entry_time)) * 1440 END), 0)
+        FROM vehicle
+        WHERE {' AND '.join(vehicle_filter)}
+        GROUP BY 1, 2, 3, 4
+    """), params)
+    return result.rowcount
+
+
+def rollup_query(start, end=None):
+    """
+    Filas de la tabla desde la hora de start hasta la hora de end (exclusiva)
+
+    Los límites se redondean a la hora, que es la resolución de la tabla.
+    """
+    query = VehicleRollup.query.filter(or_(
+        VehicleRollup.day > start.date(),
+        and_(VehicleRollup.day == start.date(), VehicleRollup.hour >= start.hour)
+    ))
+    if end is not None:
+        query = query.filter(or_(
+            VehicleRollup.day < end.date(),
+            and_(VehicleRollup.day == end.date(), VehicleRollup.hour < end.hour)
+        ))
+    return query
+
+
+def rollup_totals(start, end=None):
+    """
+    Totales de los vehículos que ingresaron en un rango, leídos de la tabla
+
+    Returns:
+        dict: {'vehicles', 'earnings', 'active', 'monthly', 'minutes'} con el
+              mismo significado que app.reports.vehicle_totals
+    """
+    entries, exits, earnings, monthly, minutes = rollup_query(start, end).with_entities(
+        func.coalesce(func.sum(VehicleRollup.entries), 0),
+        func.coalesce(func.sum(VehicleRollup.exits), 0),
+        func.coalesce(func.sum(VehicleRollup.revenue), 0),
+        func.coalesce(func.sum(VehicleRollup.monthly_entries), 0),
+        func.coalesce(func.sum(VehicleRollup.total_minutes), 0)
+    ).one()
+
+    return {
+        'vehicles': entries,
+        'earnings': earnings,
+        'active': entries - exits,
+        'monthly': monthly,
+        'minutes': minutes
+    }
+
@@ -1,17 +1,33 @@
 from flask import Blueprint, render_template, request, jsonify, current_app, flash, redirect, url_for
 from flask_login import login_required, current_user
-from app.models.models import Vehicle, MonthlyClient, User, Attendance
+from sqlalchemy import func
+from app.models.models import Vehicle, MonthlyClient, User, Attendance, PrintJob
 from app import db
-import qrcode
 from datetime import datetime
 import os
-import io
-import base64
-from flask import send_file, abort
+from flask import send_file, abort, Response
 from datetime import datetime, timedelta
 from functools import wraps
+import json
+import time
 from flask import abort
+from app.print_spooler import print_spooler
 from app.printer_service import printer_service
+from app.qr_codes import qr_png, qr_svg, qr_etag
+from app.occupancy import occupancy, open_vehicle_from, PLATE_INSIDE, LOT_FULL
+from app.tariffs import tariff_engine
+from app.monthly_cache import monthly_cache
+from app.plate_index import plate_index
+from app.monthly_clients import MONTHLY_SORTS, MONTHLY_STATUSES, filtered_query, client_to_dict
+from app.monthly_bulk import import_monthly_clients, renew_clients, InvalidImportFile
+from app.business_day import current_business_day, business_day_range
+from app.reports import (day_range, vehicles_of_day, vehicle_rows, attendances_with_user,
+                         week_start as week_start_of, attendance_by_user, attendance_by_week,
+                         attendance_by_day, attendance_by_weekday)
+from app.rollup import record_entry, record_exit, rollup_totals
+from app.search import plate_contains, operator_contains
+from app.pagination import keyset_paginate, InvalidCursor
+from app.exports import stream_export, ATTENDANCE_COLUMNS, VEHICLE_COLUMNS, MONTHLY_COLUMNS
 
 main = Blueprint('main', __name__)
 
@@ -33,28 +49,160 @@ def exit_page():
 @main.route('/monthly')
 @login_required
 def monthly_page():
-    clients = MonthlyClient.query.all()
-    return render_template('monthly.html', clients=clients)
+    # La lista se carga por partes desde /api/monthly
+    now = datetime.now()
+    expiring_days = current_app.config['MONTHLY_EXPIRING_DAYS']
+    
+    # Resumen de vencimientos (rangos sobre el índice de expiration_date)
+    expiring_count = MonthlyClient.expiring_within(expiring_days, now).count()
+    expired_count = MonthlyClient.expired(now).count()
+    
+    return render_template('monthly.html',
+                         search=request.args.get('q', '').strip(),
+                         expiring_days=expiring_days,
+                         expiring_count=expiring_count,
+                         expired_count=expired_count)
+
+@main.route('/api/monthly')
+@login_required
+def monthly_api():
+    """
+    Lista paginada de clientes mensuales
+    
+    Parámetros (todos opcionales): plate (prefijo), owner (texto del titular),
+    q (prefijo de patente o texto del titular), type, status (active,
+    expiring, expired), sort (created, plate, owner, expiration), order
+    (asc, desc), per_page y cursor (next_cursor de la página anterior).
+    """
+    sort = request.args.get('sort', 'created')
+    order = request.args.get('order', 'asc')
+    status = request.args.get('status') or None
+    vehicle_type = request.args.get('type') or None
+    
+    if sort not in MONTHLY_SORTS or order not in ('asc', 'desc'):
+        return jsonify({'success': False, 'message': 'Orden inválido'}), 400
+    if status and status not in MONTHLY_STATUSES:
+        return jsonify({'success': False, 'message': 'Estado inválido'}), 400
+    
+    max_per_page = current_app.config['MONTHLY_PAGE_SIZE']
+    per_page = min(max(request.args.get('per_page', max_per_page, type=int), 1), max_per_page)
+    
+    now = datetime.now()
+    expiring_days = current_app.config['MONTHLY_EXPIRING_DAYS']
+    query = filtered_query(
+        now, expiring_days,
+        plate=request.args.get('plate', '').strip(),
+        owner=request.args.get('owner', '').strip(),
+        q=request.args.get('q', '').strip(),
+        vehicle_type=vehicle_type,
+        status=status
+    )
+    
+    cursor = request.args.get('cursor')
+    # El total solo se calcula en la primera página
+    total = None if cursor else query.count()
+    
+    try:
+        # El cursor solo sirve para el mismo orden
+        page = keyset_paginate(
+            query, f'monthly-api:{sort}:{order}', MONTHLY_SORTS[sort],
+            cursor=cursor, per_page=per_page, descending=(order == 'desc')
+        )
+    except InvalidCursor as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    is_admin = current_user.role == 'admin'
+    return jsonify({
+        'success': True,
+        'clients': [client_to_dict(c, now, expiring_days, include_registered_by=is_admin)
+                    for c in page.items],
+        'next_cursor': page.next_cursor,
+        'has_more': page.next_cursor is not None,
+        'total': total
+    })
 
 @main.route('/status')
 @login_required
 def status_page():
-    active_vehicles = Vehicle.query.filter_by(exit_time=None).all()
-    return render_template('status.html', vehicles=active_vehicles, now=datetime.now())
+    version, active_vehicles = occupancy.snapshot()
+    now = datetime.now()
+    estimated_costs = tariff_engine.quote_open_stays(active_vehicles, now)
+    return render_template('status.html',
+                         vehicles=active_vehicles,
+                         estimated_costs=estimated_costs,
+                         version=version,
+                         tariffs=tariff_engine.to_dict(),
+                         now=now)
+
+@main.route('/status/changes')
+@login_required
+def status_changes():
+    """Ingresos y salidas posteriores a la versión ?since= (o el estado completo)"""
+    since = request.args.get('since', type=int)
+    return jsonify(occupancy.changes_since(since))
+
+@main.route('/status/stream')
+@login_required
+def status_stream():
+    """
+    Server-Sent Events con los ingresos y salidas
+    El ID de cada mensaje es la versión del índice: al reconectar, el
+    navegador la manda en Last-Event-ID y recibe solo lo que se perdió.
+    """
+    since = request.headers.get('Last-Event-ID', type=int)
+    if since is None:
+        since = request.args.get('since', type=int)
+    
+    heartbeat = current_app.config['STATUS_STREAM_HEARTBEAT']
+    timeout = current_app.config['STATUS_STREAM_TIMEOUT']
+    occupancy.version()  # Cargar el índice antes de salir del contexto del request
+    
+    def generate():
+        version = since
+        deadline = time.monotonic() + timeout
+        yield f"retry: {heartbeat * 1000}\n\n"
+        
+        while True:
+            changes = occupancy.changes_since(version)
+            if changes['reset']:
+                yield f"id: {changes['version']}\nevent: reset\ndata: {json.dumps(changes)}\n\n"
+            for event in changes['events']:
+                yield f"id: {event['version']}\nevent: {event['event']}\ndata: {json.dumps(event)}\n\n"
+            version = changes['version']
+            
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            if not occupancy.wait_for_change(version, min(heartbeat, remaining)):
+                yield ": keep-alive\n\n"
+    
+    response = Response(generate(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
 
 @main.route('/vehicle/entry', methods=['POST'])
 @login_required
 def vehicle_entry():
+    """
+    Registrar el ingreso de un vehículo
+    
+    Presupuesto por ingreso (sin contar la carga del usuario de la sesión):
+    1 INSERT de vehículo, 1 INSERT del trabajo de impresión, 1 UPSERT de
+    totales (vehicle_rollup) y un único COMMIT. Los clientes mensuales se
+    buscan en monthly_cache. Se verifica con benchmarks/check_entry_budget.py.
+    """
+    reserved = None
     try:
         plate = request.form.get('plate').upper().strip()
         vehicle_type = request.form.get('type')
         
-        # Verificar si es cliente mensual
-        monthly_client = MonthlyClient.query.filter_by(plate=plate).first()
+        # Verificar si es cliente mensual (caché en memoria, sin consultar la base)
+        monthly_client = monthly_cache.lookup(plate)
         
         if monthly_client:
             # Verificar si está vencido
-            if monthly_client.is_expired():
+            if monthly_client.expiration_date < datetime.now():
                 return jsonify({
                     'success': False,
                     'message': 'El abono mensual ha vencido. Por favor, renovar.'
@@ -64,54 +212,70 @@ def vehicle_entry():
         else:
             is_monthly = False
         
+        # Tomar un lugar y la patente (se controlan juntos en memoria, sin
+        # consultar la base: dos ingresos simultáneos de la misma patente no
+        # pueden pasar los dos)
+        reservation = occupancy.reserve(vehicle_type, plate)
+        if reservation == PLATE_INSIDE:
+            inside = occupancy.find_plate(plate)
+            detail = (f'(ID {inside.id}, ingreso {inside.entry_time.strftime("%H:%M:%S")})'
+                      if inside else '(ingreso en curso)')
+            return jsonify({
+                'success': False,
+                'message': f'La patente {plate} ya se encuentra en el estacionamiento {detail}'
+            }), 400
+        if reservation == LOT_FULL:
+            return jsonify({
+                'success': False,
+                'message': f'Estacionamiento lleno: no quedan lugares para {vehicle_type}s '
+                           f'(capacidad {occupancy.capacity_for(vehicle_type)})'
+            }), 400
+        reserved = (vehicle_type, plate)
+        
         # Crear registro de vehículo
         vehicle = Vehicle(
             plate=plate,
             type=vehicle_type,
             is_monthly=is_monthly,
+            entry_time=datetime.now(),
             operator_name=current_user.username
         )
         
         db.session.add(vehicle)
-        db.session.commit()
-        
-        # Generar QR en memoria
-        qr = qrcode.QRCode(version=1, box_size=10, border=4)
-        qr.add_data(str(vehicle.id))
-        qr.make(fit=True)
+        db.session.flush()  # Obtener el ID sin cerrar la transacción
         
-        img = qr.make_image(fill_color="black", back_color="white")
-        
-        # Convertir a base64
-        buffer = io.BytesIO()
-        img.save(buffer, format='PNG')
-        buffer.seek(0)
-        img_base64 = base64.b64encode(buffer.getvalue()).decode()
-        
-        vehicle.qr_code = img_base64
-        db.session.commit()
-        
-        # Intentar imprimir ticket de entrada
-        print_success = False
-        print_message = ""
-        try:
-            print_success, print_message = printer_service.print_entry_ticket(vehicle)
-        except Exception as e:
-            print_message = f"Error al imprimir: {str(e)}"
+        # Totales del día y ticket de entrada en la misma transacción
+        record_entry(vehicle)
+        print_job = print_spooler.enqueue('entry', vehicle)
+        db.session.flush()
         
-        return jsonify({
+        # Armar la respuesta antes del commit: después del commit leer los
+        # atributos provocaría un SELECT extra por objeto
+        result = {
             'success': True,
             'vehicle_id': vehicle.id,
-            'qr_code': img_base64,
+            'qr_url': url_for('main.vehicle_qr', vehicle_id=vehicle.id, fmt='png'),
             'is_monthly': is_monthly,
             'plate': vehicle.plate,
             'entry_time': vehicle.entry_time.strftime('%H:%M:%S'),
-            'printed': print_success,
-            'print_message': print_message
-        })
+            'printed': False,
+            'print_job_id': print_job.id,
+            'print_message': 'Ticket enviado a la impresora'
+        }
+        
+        record = open_vehicle_from(vehicle)
+        
+        db.session.commit()
+        occupancy.add(record, reserved=True)
+        reserved = None
+        print_spooler.notify()
+        
+        return jsonify(result)
         
     except Exception as e:
         db.session.rollback()
+        if reserved:
+            occupancy.release(*reserved)
         return jsonify({
             'success': False,
             'message': str(e)
@@ -128,10 +292,15 @@ def vehicle_exit():
             # Buscar por patente si no hay ID
             plate = request.form.get('plate', '').upper().strip()
             if plate:
-                vehicle = Vehicle.query.filter_by(
-                    plate=plate,
-                    exit_time=None
-                ).first()
+                inside = occupancy.find_plate(plate)
+                if inside:
+                    vehicle = db.session.get(Vehicle, inside.id)
+                else:
+                    # El índice puede no tener un ingreso hecho desde otro
+                    # proceso: confirmar en la base y, si está, reconstruirlo
+                    vehicle = Vehicle.query.filter_by(plate=plate, exit_time=None).first()
+                    if vehicle:
+                        occupancy.check(repair=True)
             else:
                 return jsonify({
                     'success': False,
@@ -141,10 +310,18 @@ def vehicle_exit():
             vehicle = Vehicle.query.get(vehicle_id)
         
         if not vehicle:
-            return jsonify({
+            response = {
                 'success': False,
                 'message': 'Vehículo no encontrado'
-            }), 404
+            }
+            if not vehicle_id:
+                # Posible error de tipeo: ofrecer las patentes estacionadas parecidas
+                limit = current_app.config['PLATE_SUGGEST_LIMIT']
+                response['suggestions'] = [
+                    _plate_match_to_dict(m, with_distance=True)
+                    for m in plate_index.similar(plate, limit, sources=('open',))
+                ]
+            return jsonify(response), 404
         
         if vehicle.exit_time:
             return jsonify({
@@ -156,46 +333,24 @@ def vehicle_exit():
         vehicle.exit_time = datetime.now()
         vehicle.exit_operator_name = current_user.username
         
-        # Calcular tarifa si no es cliente mensual
-        cost = 0
-        hours_decimal = 0
-        
-        if not vehicle.is_monthly:
-            time_diff = vehicle.exit_time - vehicle.entry_time
-            total_minutes = time_diff.total_seconds() / 60
-            hours_decimal = total_minutes / 60
-            
-            # ⭐ NUEVO CÁLCULO: CADA 15 MINUTOS
-            # Tarifas según tipo
-            if vehicle.type == 'auto':
-                first_hour_rate = 500
-                quarter_hour_rate = 125  # $500 / 4 = $125 cada 15 min
-            else:  # moto
-                first_hour_rate = 300
-                quarter_hour_rate = 75   # $300 / 4 = $75 cada 15 min
-            
-            # Cálculo: primera hora completa + cuartos de hora adicionales
-            if total_minutes <= 60:
-                cost = first_hour_rate
-            else:
-                cost = first_hour_rate
-                remaining_minutes = total_minutes - 60
-                # Calcular cuartos de hora (redondear hacia arriba)
-                quarter_hours = int(remaining_minutes / 15)
-                if remaining_minutes % 15 > 0:
-                    quarter_hours += 1
-                cost += quarter_hours * quarter_hour_rate
+        # Calcular tarifa (los clientes mensuales no pagan)
+        time_diff = vehicle.exit_time - vehicle.entry_time
+        hours_decimal = 0 if vehicle.is_monthly else time_diff.total_seconds() / 3600
+        cost = tariff_engine.quote(
+            vehicle.type,
+            time_diff.total_seconds() / 60,
+            is_monthly=vehicle.is_monthly
+        )
         
         vehicle.total_cost = cost
-        db.session.commit()
+        record_exit(vehicle)
         
-        # Intentar imprimir ticket de salida
-        print_success = False
-        print_message = ""
-        try:
-            print_success, print_message = printer_service.print_exit_ticket(vehicle)
-        except Exception as e:
-            print_message = f"Error al imprimir: {str(e)}"
+        # Encolar ticket de salida (se imprime en segundo plano)
+        print_job = print_spooler.enqueue('exit', vehicle)
+        vehicle_id = vehicle.id
+        db.session.commit()
+        occupancy.remove(vehicle_id)
+        print_spooler.notify()
         
         return jsonify({
             'success': True,
@@ -211,8 +366,9 @@ def vehicle_exit():
                 'operator': vehicle.operator_name,
                 'exit_operator': vehicle.exit_operator_name
             },
-            'printed': print_success,
-            'print_message': print_message
+            'printed': False,
+            'print_job_id': print_job.id,
+            'print_message': 'Ticket enviado a la impresora'
         })
         
     except Exception as e:
@@ -222,6 +378,116 @@ def vehicle_exit():
             'message': str(e)
         }), 500
 
+@main.route('/vehicle/<int:vehicle_id>/qr.<fmt>')
+@login_required
+def vehicle_qr(vehicle_id, fmt):
+    """Código QR del vehículo generado a pedido (PNG o SVG)"""
+    if fmt == 'png':
+        data, mimetype = qr_png(vehicle_id), 'image/png'
+    elif fmt == 'svg':
+        data, mimetype = qr_svg(vehicle_id), 'image/svg+xml'
+    else:
+        abort(404)
+    
+    response = Response(data, mimetype=mimetype)
+    response.set_etag(qr_etag(vehicle_id, fmt))
+    response.cache_control.private = True
+    response.cache_control.max_age = current_app.config['QR_MAX_AGE']
+    response.cache_control.immutable = True
+    return response.make_conditional(request)
+
+def _plate_match_to_dict(match, with_distance=False):
+    data = {
+        'plate': match.plate,
+        'open': match.open,
+        'vehicle_id': match.vehicle_id,
+        'monthly': match.monthly
+    }
+    if with_distance:
+        data['distance'] = match.distance
+    return data
+
+@main.route('/plates/suggest')
+@login_required
+def plate_suggest():
+    """
+    Autocompletar patentes y sugerir las parecidas ("¿quiso decir...?")
+    Se responde desde memoria con el índice de patentes de vehículos
+    estacionados y clientes mensuales. Parámetros: q (lo escrito) y
+    source (open, monthly o all).
+    """
+    text = request.args.get('q', '').upper().strip()
+    source = request.args.get('source', 'all')
+    sources = {'open': ('open',), 'monthly': ('monthly',), 'all': ('open', 'monthly')}.get(source)
+    if sources is None:
+        return jsonify({'success': False, 'message': f'Origen inválido: {source}'}), 400
+    
+    limit = current_app.config['PLATE_SUGGEST_LIMIT']
+    matches = plate_index.complete(text, limit, sources) if text else []
+    
+    suggestions = []
+    if len(text) >= current_app.config['PLATE_SUGGEST_MIN_LENGTH']:
+        listed = {match.plate for match in matches}
+        suggestions = [m for m in plate_index.similar(text, limit, sources) if m.plate not in listed]
+    
+    return jsonify({
+        'success': True,
+        'query': text,
+        'matches': [_plate_match_to_dict(m) for m in matches],
+        'suggestions': [_plate_match_to_dict(m, with_distance=True) for m in suggestions]
+    })
+
+@main.route('/occupancy')
+def occupancy_summary():
+    """
+    Ocupación por tipo para carteles y pantallas (sin login)
+    Se responde desde memoria; el ETag es la versión del índice, así que
+    los clientes que consultan seguido reciben 304 mientras nada cambie.
+    """
+    summary = occupancy.availability()
+    
+    response = jsonify(summary)
+    response.set_etag(f"occupancy-{summary['version']}")
+    response.cache_control.public = True
+    response.cache_control.max_age = current_app.config['OCCUPANCY_MAX_AGE']
+    return response.make_conditional(request)
+
+@main.route('/admin/occupancy/check')
+@login_required
+def occupancy_check():
+    """Verificar el índice de vehículos estacionados contra la base de datos"""
+    if current_user.role != 'admin':
+        abort(403)
+    
+    repair = request.args.get('repair', type=int) == 1
+    result = occupancy.check(repair=repair)
+    result['counts'] = occupancy.counts()
+    return jsonify(result)
+
+@main.route('/print/jobs/<int:job_id>')
+@login_required
+def print_job_status(job_id):
+    """Estado de un trabajo de la cola de impresión"""
+    job = PrintJob.query.get_or_404(job_id)
+    
+    return jsonify({
+        'id': job.id,
+        'kind': job.kind,
+        'vehicle_id': job.vehicle_id,
+        'status': job.status,
+        'finished': job.is_finished(),
+        'attempts': job.attempts,
+        'last_error': job.last_error,
+        'created_at': job.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+        'printed_at': job.printed_at.strftime('%Y-%m-%d %H:%M:%S') if job.printed_at else None
+    })
+
+@main.route('/print/stats')
+@login_required
+def print_stats():
+    """Métricas de conexión con la impresora (conexión nueva vs reutilizada)"""
+    return jsonify(printer_service.get_stats())
+
 @main.route('/monthly/add', methods=['POST'])
 @login_required
 def add_monthly_client():
@@ -260,6 +526,7 @@ def add_monthly_client():
         
         db.session.add(client)
         db.session.commit()
+        monthly_cache.invalidate()
         
         duration_text = client.get_duration_text()
         expiration = client.get_expiration_date()
@@ -289,60 +556,31 @@ def renew_monthly_client(id):
         client = MonthlyClient.query.get_or_404(id)
         duration_months_to_add = int(request.form.get('duration_months', 1))
         
-        if client.is_expired():
-            # ============================================
-            # CASO 1: RENOVAR (Cliente VENCIDO)
-            # ============================================
-            # Reiniciar completamente desde hoy
-            client.start_date = datetime.now()
-            client.duration_months = duration_months_to_add
-            
-            expiration = client.get_expiration_date()
-            duration_text = client.get_duration_text()
-            
-            db.session.commit()
-            
-            return jsonify({
-                'success': True,
-                'message': f'✅ Abono RENOVADO exitosamente.\n' + 
-                          f'Duración: {duration_text}\n' +
-                          f'Válido hasta: {expiration.strftime("%d/%m/%Y")}'
-            })
+        # Vencido: reinicia desde hoy. Activo: suma la duración manteniendo el inicio
+        renewed = client.renew(duration_months_to_add)
+        expiration = client.expiration_date
+        duration_text = client.get_duration_text()
+        total_days = client.duration_months * 30
+        
+        db.session.commit()
+        monthly_cache.invalidate()
+        
+        if renewed:
+            message = (f'✅ Abono RENOVADO exitosamente.\n' +
+                       f'Duración: {duration_text}\n' +
+                       f'Válido hasta: {expiration.strftime("%d/%m/%Y")}')
         else:
-            # ============================================
-            # CASO 2: EXTENDER (Cliente ACTIVO)
-            # ============================================
-            # Sumar la duración manteniendo la fecha de inicio original
-            
-            # Duración actual en meses
-            current_duration = client.duration_months
-            
-            # Nueva duración total = actual + lo que se agrega
-            new_total_duration = current_duration + duration_months_to_add
-            
-            # Actualizar
-            client.duration_months = new_total_duration
-            
-            # Obtener nueva fecha de vencimiento
-            expiration = client.get_expiration_date()
-            
-            # Textos para el mensaje
             added_text = f"{duration_months_to_add} {'mes' if duration_months_to_add == 1 else 'meses'}"
-            total_text = client.get_duration_text()
-            
-            # Calcular días para mostrar
-            total_days = new_total_duration * 30
             added_days = duration_months_to_add * 30
-            
-            db.session.commit()
-            
-            return jsonify({
-                'success': True,
-                'message': f'✅ Abono EXTENDIDO exitosamente.\n' +
-                          f'Se agregaron: {added_text} ({added_days} días)\n' +
-                          f'Duración total: {total_text} ({total_days} días)\n' +
-                          f'Nuevo vencimiento: {expiration.strftime("%d/%m/%Y")}'
-            })
+            message = (f'✅ Abono EXTENDIDO exitosamente.\n' +
+                       f'Se agregaron: {added_text} ({added_days} días)\n' +
+                       f'Duración total: {duration_text} ({total_days} días)\n' +
+                       f'Nuevo vencimiento: {expiration.strftime("%d/%m/%Y")}')
+        
+        return jsonify({
+            'success': True,
+            'message': message
+        })
         
     except Exception as e:
         db.session.rollback()
@@ -358,6 +596,7 @@ def delete_monthly_client(id):
         client = MonthlyClient.query.get_or_404(id)
         db.session.delete(client)
         db.session.commit()
+        monthly_cache.invalidate()
         
         flash('Cliente mensual eliminado correctamente', 'success')
         return redirect(url_for('main.monthly_page'))
@@ -409,6 +648,7 @@ def edit_monthly_client(id):
             client.vehicle_type = vehicle_type
             
             db.session.commit()
+            monthly_cache.invalidate()
             
             return jsonify({
                 'success': True,
@@ -437,21 +677,24 @@ def edit_monthly_client(id):
 @main.route('/reports')
 @login_required
 def reports_page():
-    # Estadísticas del día
-    today = datetime.now().date()
-    today_vehicles = Vehicle.query.filter(
-        db.func.date(Vehicle.entry_time) == today
-    ).all()
+    # Estadísticas de la jornada (tabla de totales por hora)
+    today = current_business_day()
+    totals = rollup_totals(*business_day_range(today))
     
-    total_vehicles = len(today_vehicles)
-    total_earnings = sum(v.total_cost or 0 for v in today_vehicles if v.exit_time)
-    active_vehicles = len([v for v in today_vehicles if not v.exit_time])
+    # Detalle paginado
+    page = request.args.get('page', 1, type=int)
+    pagination = vehicles_of_day(today).paginate(
+        page=page,
+        per_page=current_app.config['REPORTS_PER_PAGE'],
+        error_out=False
+    )
     
     return render_template('reports.html', 
-                         total_vehicles=total_vehicles,
-                         total_earnings=total_earnings,
-                         active_vehicles=active_vehicles,
-                         vehicles=today_vehicles)
+                         total_vehicles=totals['vehicles'],
+                         total_earnings=totals['earnings'],
+                         active_vehicles=totals['active'],
+                         vehicles=pagination.items,
+                         pagination=pagination)
 
 # ============================================
 # RUTAS PARA PANEL DE AUDITORÍA
@@ -538,7 +781,8 @@ def audit_search():
     plate = request.form.get('plate', '').upper().strip()
     operator = request.form.get('operator', '').strip()
     
-    query = Vehicle.query
+    # Solo las columnas que se devuelven (filas livianas, no objetos del ORM)
+    query = vehicle_rows()
     
     if start_date:
         query = query.filter(Vehicle.entry_time >= datetime.strptime(start_date, '%Y-%m-%d'))
@@ -547,19 +791,25 @@ def audit_search():
         end_datetime = datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)
         query = query.filter(Vehicle.entry_time < end_datetime)
     
+    # Subcadenas: índice de trigramas (app/search.py)
     if plate:
-        query = query.filter(Vehicle.plate.like(f'%{plate}%'))
+        query = query.filter(plate_contains(plate))
     
     if operator:
-        query = query.filter(
-            (Vehicle.operator_name.like(f'%{operator}%')) | 
-            (Vehicle.exit_operator_name.like(f'%{operator}%'))
-        )
+        query = query.filter(operator_contains(operator))
     
-    vehicles = query.order_by(Vehicle.entry_time.desc()).limit(100).all()
+    # Páginas por (entry_time, id): ?cursor= continúa desde la página anterior
+    try:
+        page = keyset_paginate(
+            query, 'audit', [Vehicle.entry_time, Vehicle.id],
+            cursor=request.form.get('cursor'),
+            per_page=current_app.config['AUDIT_PAGE_SIZE']
+        )
+    except InvalidCursor as e:
+        return jsonify({'results': [], 'count': 0, 'message': str(e)}), 400
     
     results = []
-    for v in vehicles:
+    for v in page.items:
         results.append({
             'id': v.id,
             'plate': v.plate,
@@ -572,35 +822,38 @@ def audit_search():
             'exit_operator': v.exit_operator_name
         })
     
-    return jsonify({'results': results, 'count': len(results)})
+    return jsonify({
+        'results': results,
+        'count': len(results),
+        'next_cursor': page.next_cursor,
+        'has_more': page.next_cursor is not None
+    })
 
 @main.route('/admin/stats/summary')
 @login_required
 def stats_summary():
     """Estadísticas generales para el panel"""
-    # Última semana
-    week_ago = datetime.now() - timedelta(days=7)
-    week_vehicles = Vehicle.query.filter(Vehicle.entry_time >= week_ago).all()
+    now = datetime.now()
     
-    # Último mes
-    month_ago = datetime.now() - timedelta(days=30)
-    month_vehicles = Vehicle.query.filter(Vehicle.entry_time >= month_ago).all()
+    # Última semana y último mes (tabla de totales por hora)
+    week = rollup_totals(now - timedelta(days=7))
+    month = rollup_totals(now - timedelta(days=30))
     
-    # Todo el tiempo
-    total_vehicles = Vehicle.query.count()
+    # Todo el tiempo (COUNT directo sobre la tabla, sin subconsulta de columnas)
+    total_vehicles = db.session.query(func.count()).select_from(Vehicle).scalar()
     
     stats = {
         'ultima_semana': {
-            'vehiculos': len(week_vehicles),
-            'recaudacion': sum(v.total_cost or 0 for v in week_vehicles if v.exit_time)
+            'vehiculos': week['vehicles'],
+            'recaudacion': week['earnings']
         },
         'ultimo_mes': {
-            'vehiculos': len(month_vehicles),
-            'recaudacion': sum(v.total_cost or 0 for v in month_vehicles if v.exit_time)
+            'vehiculos': month['vehicles'],
+            'recaudacion': month['earnings']
         },
         'total': {
             'vehiculos': total_vehicles,
-            'clientes_mensuales': MonthlyClient.query.count()
+            'clientes_mensuales': db.session.query(func.count()).select_from(MonthlyClient).scalar()
         }
     }
     
@@ -627,14 +880,13 @@ def admin_required(f):
 @admin_required
 def attendance_panel():
     """Panel de control de asistencias"""
-    # Asistencias del día actual
-    today = datetime.now().date()
-    today_attendances = Attendance.query.filter(
-        db.func.date(Attendance.login_time) == today
+    # Asistencias de la jornada actual
+    today_attendances = attendances_with_user().filter(
+        Attendance.business_day == current_business_day()
     ).order_by(Attendance.login_time.desc()).all()
     
     # Usuarios actualmente trabajando
-    active_users = Attendance.query.filter_by(logout_time=None).all()
+    active_users = attendances_with_user().filter(Attendance.logout_time.is_(None)).all()
     
     return render_template('attendance.html', 
                          today_attendances=today_attendances,
@@ -651,7 +903,7 @@ def attendance_history():
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
     
-    query = Attendance.query
+    query = attendances_with_user()
     
     # Aplicar filtros
     if user_id:
@@ -664,11 +916,19 @@ def attendance_history():
         end_datetime = datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)
         query = query.filter(Attendance.login_time < end_datetime)
     
-    attendances = query.order_by(Attendance.login_time.desc()).limit(200).all()
+    try:
+        page = keyset_paginate(
+            query, 'attendance', [Attendance.login_time, Attendance.id],
+            cursor=request.args.get('cursor'),
+            per_page=current_app.config['ATTENDANCE_PAGE_SIZE']
+        )
+    except InvalidCursor:
+        abort(400)
     users = User.query.all()
     
     return render_template('attendance_history.html', 
-                         attendances=attendances,
+                         attendances=page.items,
+                         next_cursor=page.next_cursor,
                          users=users,
                          now=datetime.now())
 
@@ -697,20 +957,21 @@ def attendance_user_report(user_id):
     
     attendances = query.order_by(Attendance.login_time.desc()).all()
     
-    # Calcular estadísticas
-    total_days = len(attendances)
-    total_hours = sum(a.total_hours or 0 for a in attendances)
-    avg_hours = total_hours / total_days if total_days > 0 else 0
+    # Estadísticas agrupadas por día en SQL (una fila por día trabajado)
+    range_start = datetime.strptime(start_date, '%Y-%m-%d')
+    daily = attendance_by_day(user_id, range_start, end_datetime)
+    total_days = len(daily)
+    total_hours = sum(d['total_hours'] for d in daily)
     
     # Días con más/menos horas
-    completed_attendances = [a for a in attendances if a.total_hours]
-    max_hours_day = max(completed_attendances, key=lambda x: x.total_hours) if completed_attendances else None
-    min_hours_day = min(completed_attendances, key=lambda x: x.total_hours) if completed_attendances else None
+    worked_days = [d for d in daily if d['total_hours']]
+    max_hours_day = max(worked_days, key=lambda d: d['total_hours']) if worked_days else None
+    min_hours_day = min(worked_days, key=lambda d: d['total_hours']) if worked_days else None
     
     stats = {
         'total_days': total_days,
         'total_hours': round(total_hours, 2),
-        'avg_hours': round(avg_hours, 2),
+        'avg_hours': round(total_hours / total_days, 2) if total_days > 0 else 0,
         'max_hours_day': max_hours_day,
         'min_hours_day': min_hours_day
     }
@@ -719,6 +980,7 @@ def attendance_user_report(user_id):
                          user=user,
                          attendances=attendances,
                          stats=stats,
+                         weekdays=attendance_by_weekday(user_id, range_start, end_datetime),
                          start_date=start_date,
                          end_date=end_date)
 
@@ -727,40 +989,37 @@ def attendance_user_report(user_id):
 @admin_required
 def attendance_stats():
     """Estadísticas generales de asistencia"""
-    # Semana actual
     today = datetime.now()
-    week_start = today - timedelta(days=today.weekday())
-    week_attendances = Attendance.query.filter(
-        Attendance.login_time >= week_start
-    ).all()
-    
-    # Mes actual
-    month_start = today.replace(day=1)
-    month_attendances = Attendance.query.filter(
-        Attendance.login_time >= month_start
-    ).all()
-    
-    # Todos los empleados con sus totales
-    users = User.query.all()
-    user_stats = []
+    week_start = week_start_of(today)
+    month_start, _ = day_range(today.replace(day=1))
     
-    for user in users:
-        month_user_attendances = [a for a in month_attendances if a.user_id == user.id]
-        total_hours = sum(a.total_hours or 0 for a in month_user_attendances)
-        total_days = len(month_user_attendances)
-        
+    # Totales por usuario en SQL (GROUP BY user_id): mes y semana actual
+    month_totals = attendance_by_user(month_start)
+    week_totals = attendance_by_user(week_start)
+    empty = {'sessions': 0, 'days': 0, 'total_hours': 0}
+    
+    user_stats = []
+    for user in User.query.all():
+        month = month_totals.get(user.id, empty)
+        week = week_totals.get(user.id, empty)
         user_stats.append({
             'user': user,
-            'total_days': total_days,
-            'total_hours': round(total_hours, 2),
-            'avg_hours': round(total_hours / total_days, 2) if total_days > 0 else 0
+            'total_days': month['days'],
+            'total_hours': month['total_hours'],
+            'avg_hours': round(month['total_hours'] / month['days'], 2) if month['days'] > 0 else 0,
+            'week_days': week['days'],
+            'week_hours': week['total_hours']
         })
     
     # Ordenar por horas totales
     user_stats.sort(key=lambda x: x['total_hours'], reverse=True)
     
+    # Semanas que tocan el mes actual (desde el lunes de la semana del día 1)
+    weekly = attendance_by_week(week_start_of(month_start))
+    
     return render_template('attendance_stats.html',
                          user_stats=user_stats,
+                         weekly=weekly,
                          week_start=week_start,
                          month_start=month_start)
 
@@ -768,16 +1027,20 @@ def attendance_stats():
 @login_required
 @admin_required
 def attendance_export():
-    """Exportar asistencias a CSV"""
-    import csv
-    from io import StringIO
-    from flask import Response
-    
+    """Exportar asistencias (?format=csv o ndjson) en streaming"""
     # Parámetros
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
+    user_id = request.args.get('user_id', type=int)
     
-    query = Attendance.query
+    # Solo las columnas necesarias, con JOIN a user (sin una consulta por fila)
+    query = db.session.query(
+        Attendance.id, User.username, User.name, User.role,
+        Attendance.login_time, Attendance.logout_time, Attendance.total_hours
+    ).join(User, Attendance.user_id == User.id)
+    
+    if user_id:
+        query = query.filter(Attendance.user_id == user_id)
     
     if start_date:
         query = query.filter(Attendance.login_time >= datetime.strptime(start_date, '%Y-%m-%d'))
@@ -786,38 +1049,119 @@ def attendance_export():
         end_datetime = datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)
         query = query.filter(Attendance.login_time < end_datetime)
     
-    attendances = query.order_by(Attendance.login_time.desc()).all()
+    query = query.order_by(Attendance.login_time.desc(), Attendance.id.desc())
     
-    # Crear CSV
-    si = StringIO()
-    writer = csv.writer(si)
-    
-    # Encabezados
-    writer.writerow(['ID', 'Usuario', 'Nombre', 'Rol', 'Fecha', 'Hora Entrada', 
-                    'Hora Salida', 'Horas Trabajadas', 'Estado'])
-    
-    # Datos
-    for a in attendances:
-        writer.writerow([
-            a.id,
-            a.user.username,
-            a.user.name,
-            a.user.role,
-            a.login_time.strftime('%Y-%m-%d'),
-            a.login_time.strftime('%H:%M:%S'),
-            a.logout_time.strftime('%H:%M:%S') if a.logout_time else 'En curso',
-            f"{a.total_hours:.2f}" if a.total_hours else '0.00',
-            'Completado' if a.logout_time else 'Activo'
-        ])
-    
-    # Preparar respuesta
-    output = si.getvalue()
-    si.close()
-    
-    filename = f"asistencias_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-    
-    return Response(
-        output,
-        mimetype="text/csv",
-        headers={"Content-Disposition": f"attachment;filename={filename}"}
-    )
+    response = stream_export(query, ATTENDANCE_COLUMNS,
+                             request.args.get('format', 'csv'), 'asistencias')
+    return response or abort(400)
+
+# ============================================
+# EXPORTACIONES DE VEHÍCULOS Y CLIENTES MENSUALES
+# ============================================
+
+@main.route('/admin/vehicles/export')
+@login_required
+@admin_required
+def vehicles_export():
+    """Exportar el historial de vehículos (?format=csv o ndjson) en streaming"""
+    start_date = request.args.get('start_date')
+    end_date = request.args.get('end_date')
+    
+    query = vehicle_rows()
+    
+    if start_date:
+        query = query.filter(Vehicle.entry_time >= datetime.strptime(start_date, '%Y-%m-%d'))
+    
+    if end_date:
+        end_datetime = datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)
+        query = query.filter(Vehicle.entry_time < end_datetime)
+    
+    query = query.order_by(Vehicle.entry_time.desc(), Vehicle.id.desc())
+    
+    response = stream_export(query, VEHICLE_COLUMNS,
+                             request.args.get('format', 'csv'), 'vehiculos')
+    return response or abort(400)
+
+@main.route('/admin/monthly/export')
+@login_required
+@admin_required
+def monthly_export():
+    """Exportar los clientes mensuales (?format=csv o ndjson) en streaming"""
+    query = db.session.query(
+        MonthlyClient.id, MonthlyClient.plate, MonthlyClient.owner_name,
+        MonthlyClient.model, MonthlyClient.phone, MonthlyClient.vehicle_type,
+        MonthlyClient.start_date, MonthlyClient.duration_months, MonthlyClient.expiration_date,
+        MonthlyClient.registered_by
+    ).order_by(MonthlyClient.id)
+    
+    response = stream_export(query, MONTHLY_COLUMNS,
+                             request.args.get('format', 'csv'), 'clientes_mensuales')
+    return response or abort(400)
+
+@main.route('/admin/monthly/import', methods=['POST'])
+@login_required
+@admin_required
+def monthly_import():
+    """Importar clientes mensuales desde un CSV (dry_run=1 solo valida)"""
+    upload = request.files.get('file')
+    if not upload or not upload.filename:
+        return jsonify({'success': False, 'message': 'Seleccione un archivo CSV'}), 400
+    
+    dry_run = request.form.get('dry_run') in ('1', 'true', 'on')
+    try:
+        text = upload.read().decode('utf-8-sig')
+        result = import_monthly_clients(text, current_user.username, dry_run=dry_run)
+    except UnicodeDecodeError:
+        return jsonify({'success': False, 'message': 'El archivo debe estar en UTF-8'}), 400
+    except InvalidImportFile as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+    
+    action = 'válidos para importar' if dry_run else 'importados'
+    return jsonify({
+        'success': True,
+        'dry_run': dry_run,
+        'total': result.total,
+        'imported': result.imported,
+        'errors': [
+            {'line': error.line, 'plate': error.plate, 'message': error.message}
+            for error in result.errors
+        ],
+        'message': f'{result.imported} de {result.total} clientes {action}' +
+                   (f'\n{len(result.errors)} fila(s) con errores' if result.errors else '')
+    })
+
+@main.route('/monthly/renew/batch', methods=['POST'])
+@login_required
+def renew_monthly_clients_batch():
+    """Renovar (vencidos) o extender (activos) varios abonos a la vez"""
+    client_ids = request.form.getlist('ids', type=int)
+    duration_months = request.form.get('duration_months', 1, type=int)
+    
+    if not client_ids:
+        return jsonify({'success': False, 'message': 'Seleccione al menos un cliente'}), 400
+    if not duration_months or duration_months < 1:
+        return jsonify({'success': False, 'message': 'Duración inválida'}), 400
+    
+    try:
+        result = renew_clients(client_ids, duration_months)
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'Error: {str(e)}'}), 500
+    
+    def summary(client):
+        return {
+            'id': client['id'],
+            'plate': client['plate'],
+            'expiration_date': client['expiration_date'].strftime('%Y-%m-%d')
+        }
+    
+    return jsonify({
+        'success': True,
+        'renewed': [summary(c) for c in result['renewed']],
+        'extended': [summary(c) for c in result['extended']],
+        'missing': result['missing'],
+        'message': f'✅ {len(result["renewed"])} abono(s) renovado(s) y '
+                   f'{len(result["extended"])} extendido(s) por {duration_months} '
+                   f'{"mes" if duration_months == 1 else "meses"}'
+    })
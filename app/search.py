@@ -0,0 +1,80 @@
+"""
+Búsqueda por subcadena de patentes y operadores
+La tabla virtual vehicle_search (SQLite FTS5 con tokenizador trigram) indexa
+plate, operator_name y exit_operator_name de vehicle; la mantienen al día los
+triggers creados en la migración 6. Buscar '%ABC%' con LIKE recorre todo el
+historial, en cambio con el índice de trigramas solo se leen los vehículos
+que contienen la subcadena.
+
+El tokenizador trigram necesita al menos 3 caracteres: con búsquedas más
+cortas, o si el SQLite instalado no tiene FTS5, se usa LIKE como antes.
+"""
+
+from sqlalchemy import inspect, or_, select, table, column, literal_column
+from app import db
+from app.models.models import Vehicle
+
+TRIGRAM_MIN_LENGTH = 3
+
+vehicle_search = table('vehicle_search', column('rowid'))
+
+# Columnas de vehicle_search para cada tipo de búsqueda
+PLATE_COLUMNS = ('plate',)
+OPERATOR_COLUMNS = ('operator_name', 'exit_operator_name')
+
+_available = {}
+
+
+def search_index_available():
+    """True si la base tiene la tabla vehicle_search (se consulta una vez por base)"""
+    url = str(db.engine.url)
+    if url not in _available:
+        _available[url] = inspect(db.engine).has_table('vehicle_search')
+    return _available[url]
+
+
+def fts_phrase(text):
+    """Texto como frase literal de FTS5 (las comillas se duplican)"""
+    return '"' + text.replace('"', '""') + '"'
+
+
+def _matching_ids(columns, text):
+    """Subconsulta con los IDs de vehículo que contienen el texto en esas columnas"""
+    match = '{' + ' '.join(columns) + '} : ' + fts_phrase(text)
+    return select(vehicle_search.c.rowid).where(
+        literal_column('vehicle_search').op('MATCH')(match)
+    )
+
+
+def like_pattern(text):
+    """Patrón LIKE de subcadena (escapando los comodines, usar con escape='\\')"""
+    escaped = text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'%{escaped}%'
+
+
+def substring_filter(columns, text):
+    """
+    Condición 'alguna de las columnas contiene el texto'
+
+    Args:
+        columns: nombres de columnas de vehicle (PLATE_COLUMNS u OPERATOR_COLUMNS)
+        text: subcadena buscada
+
+    Returns:
+        Condición de SQLAlchemy para Vehicle.query.filter()
+    """
+    if len(text) >= TRIGRAM_MIN_LENGTH and search_index_available():
+        return Vehicle.id.in_(_matching_ids(columns, text))
+
+    pattern = like_pattern(text)
+    return or_(*(getattr(Vehicle, name).like(pattern, escape='\\') for name in columns))
+
+
+def plate_contains(plate):
+    """Vehículos cuya patente contiene el texto"""
+    return substring_filter(PLATE_COLUMNS, plate)
+
+
+def operator_contains(operator):
+    """Vehículos registrados (ingreso o salida) por un operador que contiene el texto"""
+    return substring_filter(OPERATOR_COLUMNS, operator)
@@ -0,0 +1,183 @@
+"""
+Motor de tarifas del estacionamiento
+Las tarifas por tipo de vehículo se definen en Config.TARIFFS y se compilan
+una sola vez a una fórmula cerrada:
+
+    costo = primera hora + fracciones iniciadas después de la primera hora
+
+Tiene una API escalar para las salidas y una API por lotes (vectorizada con
+NumPy si está instalado) para cotizar miles de estadías de una vez.
+"""
+
+import math
+import threading
+from collections import namedtuple
+from datetime import datetime
+from config import Config
+
+try:
+    import numpy as np
+except ImportError:  # El cálculo por lotes funciona igual, sin vectorizar
+    np = None
+
+# Tarifa compilada de un tipo de vehículo
+RateTable = namedtuple(
+    'RateTable',
+    ['vehicle_type', 'first_minutes', 'first_rate', 'fraction_minutes', 'fraction_rate']
+)
+
+
+def compile_rates(tariffs):
+    """
+    Convertir la configuración de tarifas en tablas listas para calcular
+
+    Args:
+        tariffs: dict tipo -> {'first_minutes', 'first_rate',
+                 'fraction_minutes', 'fraction_rate'}
+
+    Returns:
+        dict: tipo -> RateTable
+    """
+    tables = {}
+    for vehicle_type, rates in tariffs.items():
+        table = RateTable(
+            vehicle_type=vehicle_type,
+            first_minutes=rates.get('first_minutes', 60),
+            first_rate=rates['first_rate'],
+            fraction_minutes=rates.get('fraction_minutes', 15),
+            fraction_rate=rates['fraction_rate']
+        )
+        if table.first_minutes < 0 or table.fraction_minutes <= 0:
+            raise ValueError(f"Tarifa inválida para {vehicle_type}: {rates}")
+        tables[vehicle_type] = table
+    return tables
+
+
+class TariffEngine:
+    """Calcula el costo de una o muchas estadías"""
+
+    def __init__(self, tariffs=None, default_type=None):
+        self._lock = threading.Lock()
+        self.reload(tariffs, default_type)
+
+    def reload(self, tariffs=None, default_type=None):
+        """Volver a compilar las tarifas (por defecto desde Config)"""
+        tables = compile_rates(tariffs if tariffs is not None else Config.TARIFFS)
+        default_type = default_type or Config.TARIFF_DEFAULT_TYPE
+        if default_type not in tables:
+            raise ValueError(f"No hay tarifa para el tipo por defecto '{default_type}'")
+
+        with self._lock:
+            self.tables = tables
+            self.default_type = default_type
+
+    def rates_for(self, vehicle_type):
+        """Tarifa de un tipo (los tipos desconocidos usan la tarifa por defecto)"""
+        return self.tables.get(vehicle_type) or self.tables[self.default_type]
+
+    def to_dict(self):
+        """Tarifas en formato JSON (para calcular estimaciones en el navegador)"""
+        return {
+            'default_type': self.default_type,
+            'rates': {t: rates._asdict() for t, rates in self.tables.items()}
+        }
+
+    # ============================================
+    # API ESCALAR
+    # ============================================
+
+    def quote(self, vehicle_type, minutes, is_monthly=False):
+        """
+        Costo de una estadía
+
+        Args:
+            vehicle_type: 'auto' o 'moto'
+            minutes: minutos de permanencia (puede tener decimales)
+            is_monthly: los clientes mensuales no pagan
+
+        Returns:
+            int: costo en pesos
+        """
+        if is_monthly:
+            return 0
+
+        rates = self.rates_for(vehicle_type)
+        extra = max(0.0, minutes - rates.first_minutes)
+        fractions = math.ceil(extra / rates.fraction_minutes)
+        return rates.first_rate + fractions * rates.fraction_rate
+
+    def quote_stay(self, vehicle_type, entry_time, exit_time=None, is_monthly=False):
+        """Costo entre dos fechas (sin salida: hasta ahora)"""
+        exit_time = exit_time or datetime.now()
+        minutes = (exit_time - entry_time).total_seconds() / 60
+        return self.quote(vehicle_type, minutes, is_monthly)
+
+    # ============================================
+    # API POR LOTES
+    # ============================================
+
+    def quote_batch(self, vehicle_types, minutes, is_monthly=None):
+        """
+        Costo de muchas estadías a la vez
+
+        Args:
+            vehicle_types: secuencia de tipos de vehículo
+            minutes: secuencia de minutos de permanencia
+            is_monthly: secuencia opcional de booleanos
+
+        Returns:
+            Arreglo de NumPy (o lista sin NumPy) con el costo de cada estadía
+        """
+        if np is None:
+            monthly = is_monthly if is_monthly is not None else [False] * len(minutes)
+            return [self.quote(t, m, f) for t, m, f in zip(vehicle_types, minutes, monthly)]
+
+        types = np.asarray(vehicle_types)
+        minutes = np.asarray(minutes, dtype=np.float64)
+
+        # Parámetros de la tarifa de cada estadía (tipos desconocidos -> por defecto)
+        default = self.tables[self.default_type]
+        first_minutes = np.full(minutes.shape, default.first_minutes, dtype=np.float64)
+        first_rate = np.full(minutes.shape, default.first_rate, dtype=np.float64)
+        fraction_minutes = np.full(minutes.shape, default.fraction_minutes, dtype=np.float64)
+        fraction_rate = np.full(minutes.shape, default.fraction_rate, dtype=np.float64)
+
+        for vehicle_type, rates in self.tables.items():
+            mask = types == vehicle_type
+            first_minutes[mask] = rates.first_minutes
+            first_rate[mask] = rates.first_rate
+            fraction_minutes[mask] = rates.fraction_minutes
+            fraction_rate[mask] = rates.fraction_rate
+
+        extra = np.maximum(minutes - first_minutes, 0.0)
+        costs = first_rate + np.ceil(extra / fraction_minutes) * fraction_rate
+
+        if is_monthly is not None:
+            costs[np.asarray(is_monthly, dtype=bool)] = 0
+
+        return costs.astype(np.int64)
+
+    def quote_open_stays(self, vehicles, now=None):
+        """
+        Costo estimado de vehículos que siguen estacionados
+
+        Args:
+            vehicles: objetos con type, entry_time e is_monthly
+            now: hora de referencia (por defecto ahora)
+
+        Returns:
+            dict: id del vehículo -> costo estimado
+        """
+        if not vehicles:
+            return {}
+
+        now = now or datetime.now()
+        minutes = [(now - v.entry_time).total_seconds() / 60 for v in vehicles]
+        costs = self.quote_batch(
+            [v.type for v in vehicles], minutes, [bool(v.is_monthly) for v in vehicles]
+        )
+        return {v.id: int(cost) for v, cost in zip(vehicles, costs)}
+
+
+# Instancia global del motor de tarifas
+tariff_engine = TariffEngine()
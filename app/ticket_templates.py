@@ -0,0 +1,316 @@
+"""
+Plantillas ESC/POS precompiladas para los tickets
+Cada ticket se describe como una secuencia de bloques. Los bloques fijos
+(encabezado, tarifas, pie de página) se generan una sola vez y se guardan
+como bytes; los bloques con datos del vehículo se completan en cada ticket
+y todo se envía a la impresora en una única escritura.
+"""
+
+from escpos.printer import Dummy
+from datetime import datetime
+import io
+from PIL import Image
+from app.qr_codes import qr_png
+from app.tariffs import tariff_engine
+
+SEPARATOR = "================================\n"
+TICKET_CODEPAGE = 'CP437'
+NATIVE_QR_SIZE = 8  # Tamaño de cada módulo del QR en puntos de impresión
+
+
+# ============================================
+# BLOQUES DEL TICKET
+# ============================================
+
+def render_header(printer):
+    """Encabezado común a todos los tickets"""
+    printer.set(align='center', bold=True, width=2, height=2)
+    printer.text("ESTACIONAMIENTO\n")
+    printer.set(align='center', bold=False)
+    printer.text(SEPARATOR)
+
+
+def render_title(printer, title):
+    """Tipo de ticket"""
+    printer.set(align='center', bold=True)
+    printer.text(f"*** {title} ***\n\n")
+
+
+def render_native_qr(printer, vehicle_id):
+    """
+    Imprimir código QR generado por la propia impresora (comando GS ( k)
+
+    Solo viaja el ID del vehículo, en lugar de la imagen rasterizada.
+    """
+    printer.set(align='center')
+    printer.qr(str(vehicle_id), size=NATIVE_QR_SIZE, native=True)
+    printer.text("\n")
+
+
+def render_qr_image(printer, vehicle_id):
+    """Imprimir código QR como imagen (impresoras sin QR nativo)"""
+    try:
+        img = Image.open(io.BytesIO(qr_png(vehicle_id)))
+
+        # Convertir a formato compatible
+        img = img.convert('1')  # Convertir a blanco y negro
+
+        # Imprimir imagen
+        printer.set(align='center')
+        printer.image(img, impl='bitImageColumn')
+        printer.text("\n")
+    except Exception as e:
+        print(f"Error imprimiendo QR: {e}")
+        # Si falla, imprimir el ID como texto
+        printer.set(align='center', bold=True)
+        printer.text(f"ID: {vehicle_id}\n")
+
+
+def render_vehicle_info(printer, vehicle):
+    """ID, patente y tipo de vehículo"""
+    printer.set(align='left', bold=False)
+    printer.text(f"ID: {vehicle.id}\n")
+    printer.text(f"Patente: {vehicle.plate}\n")
+
+    vehicle_icon = "Auto" if vehicle.type == 'auto' else "Moto"
+    printer.text(f"Tipo: {vehicle_icon}\n")
+
+
+def render_entry_details(printer, vehicle):
+    """Hora de entrada y operador"""
+    entry_time = vehicle.entry_time.strftime('%d/%m/%Y %H:%M:%S')
+    printer.text(f"Entrada: {entry_time}\n")
+    printer.text(f"Operador: {vehicle.operator_name}\n")
+
+
+def render_entry_monthly(printer):
+    """Leyenda de cliente mensual en el ticket de entrada"""
+    printer.text("\n")
+    printer.set(align='center', bold=True)
+    printer.text("*** CLIENTE MENSUAL ***\n")
+    printer.set(align='left', bold=False)
+
+
+def render_tariffs(printer, rates):
+    """Tabla de tarifas de un tipo de vehículo (RateTable)"""
+    printer.text("\n")
+    printer.text("TARIFAS:\n")
+    if rates.first_minutes == 60:
+        printer.text(f"1ra hora: ${rates.first_rate}\n")
+    else:
+        printer.text(f"1ros {rates.first_minutes} min: ${rates.first_rate}\n")
+    printer.text(f"c/{rates.fraction_minutes} min: ${rates.fraction_rate}\n")
+
+
+def render_entry_footer(printer):
+    """Pie de página del ticket de entrada"""
+    printer.text("\n")
+    printer.set(align='center')
+    printer.text(SEPARATOR)
+    printer.text("Conserve este ticket\n")
+    printer.text("Gracias por su visita\n")
+    printer.text("\n\n")
+
+
+def render_exit_details(printer, vehicle):
+    """Horarios, permanencia y operadores del ticket de salida"""
+    entry_time = vehicle.entry_time.strftime('%d/%m/%Y %H:%M:%S')
+    exit_time = vehicle.exit_time.strftime('%d/%m/%Y %H:%M:%S')
+
+    printer.text("\n")
+    printer.text(f"Entrada:  {entry_time}\n")
+    printer.text(f"Salida:   {exit_time}\n")
+
+    # Calcular tiempo de permanencia
+    time_diff = vehicle.exit_time - vehicle.entry_time
+    total_minutes = int(time_diff.total_seconds() / 60)
+    hours = total_minutes // 60
+    minutes = total_minutes % 60
+
+    printer.text(f"Tiempo:   {hours}h {minutes}min\n")
+
+    # Operadores
+    printer.text("\n")
+    printer.text(f"Op. Entrada: {vehicle.operator_name}\n")
+    printer.text(f"Op. Salida:  {vehicle.exit_operator_name}\n")
+
+    printer.text("\n")
+    printer.text(SEPARATOR)
+
+
+def render_exit_monthly(printer):
+    """Total de un cliente mensual"""
+    printer.set(align='center', bold=True, width=2, height=2)
+    printer.text("CLIENTE MENSUAL\n")
+    printer.set(align='center', bold=True)
+    printer.text("SIN CARGO\n")
+
+
+def render_exit_total(printer, total_cost):
+    """Total a pagar"""
+    printer.set(align='center', bold=True, width=2, height=2)
+    printer.text(f"TOTAL: ${total_cost}\n")
+
+
+def render_exit_footer(printer):
+    """Pie de página del ticket de salida"""
+    printer.set(align='center', bold=False)
+    printer.text(SEPARATOR)
+    printer.text("Gracias por su visita\n")
+    printer.text("Vuelva pronto\n")
+    printer.text("\n\n")
+
+
+def render_test_header(printer):
+    """Encabezado del ticket de prueba"""
+    printer.set(align='center', bold=True)
+    printer.text("TEST DE IMPRESORA\n")
+    printer.set(align='center', bold=False)
+    printer.text(SEPARATOR)
+
+
+def render_test_details(printer, printer_ip):
+    """Fecha e IP del ticket de prueba"""
+    printer.text(f"Fecha: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}\n")
+    printer.text(f"IP: {printer_ip}\n")
+
+
+def render_test_footer(printer):
+    """Pie de página del ticket de prueba"""
+    printer.text("Conexion exitosa!\n")
+    printer.text(SEPARATOR)
+    printer.text("\n\n")
+
+
+def render_cut(printer):
+    """Cortar papel"""
+    printer.cut()
+
+
+# ============================================
+# SECUENCIAS DE BLOQUES
+# ============================================
+# Cada bloque es (clave, función). Los bloques con clave son fijos y se
+# guardan en caché; los que tienen clave None dependen del ticket.
+
+def entry_ticket_blocks(vehicle, native_qr=True):
+    """
+    Bloques del ticket de entrada
+
+    Args:
+        vehicle: Objeto Vehicle
+        native_qr: True para que la impresora genere el QR; False para
+            enviarlo como imagen
+    """
+    blocks = [
+        ('header', render_header),
+        ('entry_title', lambda p: render_title(p, "TICKET DE ENTRADA")),
+    ]
+
+    if native_qr:
+        blocks.append((None, lambda p: render_native_qr(p, vehicle.id)))
+    else:
+        blocks.append((None, lambda p: render_qr_image(p, vehicle.id)))
+
+    blocks.append((None, lambda p: render_vehicle_info(p, vehicle)))
+    blocks.append((None, lambda p: render_entry_details(p, vehicle)))
+
+    if vehicle.is_monthly:
+        blocks.append(('entry_monthly', render_entry_monthly))
+    else:
+        # La clave incluye la tarifa: si cambia, el bloque se vuelve a compilar
+        rates = tariff_engine.rates_for(vehicle.type)
+        blocks.append((('tariffs', rates), lambda p: render_tariffs(p, rates)))
+
+    blocks.append(('entry_footer', render_entry_footer))
+    blocks.append(('cut', render_cut))
+    return blocks
+
+
+def exit_ticket_blocks(vehicle):
+    """Bloques del ticket de salida"""
+    blocks = [
+        ('header', render_header),
+        ('exit_title', lambda p: render_title(p, "TICKET DE SALIDA")),
+        (None, lambda p: render_vehicle_info(p, vehicle)),
+        (None, lambda p: render_exit_details(p, vehicle)),
+    ]
+
+    if vehicle.is_monthly:
+        blocks.append(('exit_monthly', render_exit_monthly))
+    else:
+        blocks.append((None, lambda p: render_exit_total(p, vehicle.total_cost)))
+
+    blocks.append(('exit_footer', render_exit_footer))
+    blocks.append(('cut', render_cut))
+    return blocks
+
+
+def test_ticket_blocks(printer_ip):
+    """Bloques del ticket de prueba"""
+    return [
+        ('test_header', render_test_header),
+        (None, lambda p: render_test_details(p, printer_ip)),
+        ('test_footer', render_test_footer),
+        ('cut', render_cut),
+    ]
+
+
+class TicketTemplates:
+    """Compila bloques de ticket a bytes ESC/POS y guarda los fijos en caché"""
+
+    def __init__(self):
+        self._cache = {}
+
+    @staticmethod
+    def _new_printer():
+        """Impresora en memoria con página de códigos fija"""
+        printer = Dummy()
+        # Fijar la página de códigos evita que escpos la busque en cada texto
+        printer.charcode(TICKET_CODEPAGE)
+        return printer
+
+    def build(self, blocks):
+        """
+        Armar el ticket completo en un único buffer
+
+        Args:
+            blocks: Lista de (clave, función) como la de entry_ticket_blocks
+
+        Returns:
+            bytes: comandos ESC/POS del ticket
+        """
+        buffer = bytearray()
+        variable = None
+
+        for key, render in blocks:
+            if key is None:
+                # Bloques variables consecutivos comparten la misma impresora
+                if variable is None:
+                    variable = self._new_printer()
+                render(variable)
+                continue
+
+            if variable is not None:
+                buffer += variable.output
+                variable = None
+
+            cached = self._cache.get(key)
+            if cached is None:
+                printer = self._new_printer()
+                render(printer)
+                cached = self._cache[key] = printer.output
+            buffer += cached
+
+        if variable is not None:
+            buffer += variable.output
+
+        return bytes(buffer)
+
+    def clear(self):
+        """Descartar los bloques compilados (por ejemplo, al cambiar tarifas)"""
+        self._cache.clear()
+
+
+# Instancia global de las plantillas
+ticket_templates = TicketTemplates()
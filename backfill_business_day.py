@@ -0,0 +1,32 @@
+"""
+Script para recalcular el día de jornada (business_day) de vehículos y asistencias
+Usarlo después de cambiar BUSINESS_DAY_START_HOUR, para que los registros
+anteriores queden en la jornada que corresponde con la nueva hora de corte.
+Ejecutar:
+    python backfill_business_day.py
+"""
+
+import sys
+from app import create_app, db
+from app.business_day import backfill_business_days
+from config import Config
+
+
+if __name__ == '__main__':
+    app = create_app()
+
+    with app.app_context():
+        print("\n" + "=" * 60)
+        print("🔄 RECÁLCULO DE DÍA DE JORNADA")
+        print("=" * 60)
+        print(f"   Inicio de jornada: {Config.BUSINESS_DAY_START_HOUR:02d}:00")
+
+        try:
+            updated = backfill_business_days(db.session)
+            db.session.commit()
+            for table, rows in updated.items():
+                print(f"✅ {table}: {rows} filas actualizadas")
+        except Exception as e:
+            db.session.rollback()
+            print(f"\n❌ Error: {e}")
+            sys.exit(1)
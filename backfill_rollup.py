@@ -0,0 +1,45 @@
+"""
+Script para reconstruir la tabla de totales por hora (vehicle_rollup)
+Recalcula las filas desde la tabla vehicle para un rango de días, por
+ejemplo después de corregir vehículos a mano o de restaurar un backup.
+Ejecutar:
+    python backfill_rollup.py                          # todo el historial
+    python backfill_rollup.py 2024-01-01               # desde esa fecha
+    python backfill_rollup.py 2024-01-01 2024-02-01    # rango [desde, hasta)
+"""
+
+import sys
+from datetime import datetime
+from app import create_app, db
+from app.rollup import rebuild_rollup
+
+
+def parse_day(value):
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+if __name__ == '__main__':
+    try:
+        start = parse_day(sys.argv[1]) if len(sys.argv) > 1 else None
+        end = parse_day(sys.argv[2]) if len(sys.argv) > 2 else None
+    except ValueError:
+        print("❌ Formato de fecha inválido. Usar AAAA-MM-DD")
+        sys.exit(1)
+
+    app = create_app()
+
+    with app.app_context():
+        print("\n" + "=" * 60)
+        print("🔄 RECONSTRUCCIÓN DE TOTALES POR HORA")
+        print("=" * 60)
+        print(f"   Desde: {start or 'el principio'}")
+        print(f"   Hasta: {end or 'hoy'}")
+
+        try:
+            rows = rebuild_rollup(db.session, start, end)
+            db.session.commit()
+            print(f"\n✅ {rows} filas recalculadas")
+        except Exception as e:
+            db.session.rollback()
+            print(f"\n❌ Error: {e}")
+            sys.exit(1)
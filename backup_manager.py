@@ -10,6 +10,7 @@ import sqlite3
 from datetime import datetime, timedelta
 import json
 import csv
+from app.business_day import current_business_day, business_day_range
 
 class BackupManager:
     def __init__(self):
@@ -46,29 +47,34 @@ class BackupManager:
 
     def generate_daily_report(self):
         """Generar reporte diario en múltiples formatos"""
-        today = datetime.now().date()
+        today = current_business_day()
+        start, end = business_day_range(today)
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         
         try:
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
             
-            # Obtener todos los movimientos del día
+            # Obtener todos los movimientos de la jornada
             cursor.execute("""
                 SELECT id, plate, type, entry_time, exit_time, 
                        total_cost, is_monthly, operator_name, exit_operator_name
                 FROM vehicle
-                WHERE DATE(entry_time) = ?
+                WHERE business_day = ?
                 ORDER BY entry_time DESC
-            """, (today,))
+            """, (today.isoformat(),))
             
             vehicles = cursor.fetchall()
             
-            # Calcular estadísticas
-            total_vehicles = len(vehicles)
-            total_earnings = sum(v[5] for v in vehicles if v[5])
-            active_vehicles = sum(1 for v in vehicles if not v[4])
-            monthly_clients = sum(1 for v in vehicles if v[6])
+            # Estadísticas desde la tabla de totales por hora
+            cursor.execute("""
+                SELECT COALESCE(SUM(entries), 0), COALESCE(SUM(revenue), 0),
+                       COALESCE(SUM(entries - exits), 0), COALESCE(SUM(monthly_entries), 0)
+                FROM vehicle_rollup
+                WHERE (day, hour) >= (?, ?) AND (day, hour) < (?, ?)
+            """, (start.date().isoformat(), start.hour, end.date().isoformat(), end.hour))
+            
+            total_vehicles, total_earnings, active_vehicles, monthly_clients = cursor.fetchone()
             
             # Reporte TXT legible
             txt_filename = f"reporte_{today}__{timestamp}.txt"
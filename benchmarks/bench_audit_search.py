@@ -0,0 +1,129 @@
+"""
+Benchmark de audit_search: LIKE '%texto%' vs índice de trigramas (FTS5)
+Carga varios años de vehículos sintéticos y compara las búsquedas por
+subcadena de patente y de operador, verificando que ambas devuelvan los
+mismos vehículos.
+Ejecutar: python benchmarks/bench_audit_search.py [vehículos por día] [años]
+"""
+
+import sys
+import os
+import random
+import string
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Base de datos temporal (debe definirse antes de importar config)
+db_dir = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(db_dir, 'search.db')
+
+from sqlalchemy import or_, text
+from app import create_app, db
+from app.migrations import upgrade
+from app.models.models import Vehicle
+from app.search import plate_contains, operator_contains, search_index_available
+
+OPERATORS = ['operador1', 'operador2', 'operador3', 'operador4', 'admin', 'supervisor_norte']
+
+
+def random_plate(rng):
+    """Patente argentina vieja (ABC123) o nueva (AB123CD)"""
+    letters = string.ascii_uppercase
+    if rng.random() < 0.5:
+        return ''.join(rng.choices(letters, k=3)) + f'{rng.randint(0, 999):03d}'
+    return (''.join(rng.choices(letters, k=2)) + f'{rng.randint(0, 999):03d}' +
+            ''.join(rng.choices(letters, k=2)))
+
+
+def synthetic_history(per_day, years, seed=7):
+    rng = random.Random(seed)
+    plates = [random_plate(rng) for _ in range(5000)]
+    start = datetime.now() - timedelta(days=365 * years)
+
+    rows = []
+    for day in range(365 * years):
+        for _ in range(per_day):
+            entry = start + timedelta(days=day, seconds=rng.randint(0, 86399))
+            rows.append({
+                'plate': rng.choice(plates),
+                'type': rng.choice(('auto', 'moto')),
+                'entry_time': entry,
+                'exit_time': entry + timedelta(minutes=rng.randint(5, 600)),
+                'operator_name': rng.choice(OPERATORS),
+                'exit_operator_name': rng.choice(OPERATORS),
+            })
+    return rows, plates
+
+
+def run(criterion, start=None):
+    query = Vehicle.query.with_entities(Vehicle.id).filter(criterion)
+    if start is not None:
+        query = query.filter(Vehicle.entry_time >= start)
+    begin = time.perf_counter()
+    ids = [row.id for row in query.order_by(Vehicle.entry_time.desc()).limit(100)]
+    return ids, (time.perf_counter() - begin) * 1000
+
+
+def main():
+    per_day = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    years = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    app = create_app()
+    ok = True
+
+    with app.app_context():
+        upgrade(db.engine, log=lambda message: None)
+        if not search_index_available():
+            print("❌ El SQLite instalado no tiene FTS5 con tokenizador trigram")
+            sys.exit(1)
+
+        rows, plates = synthetic_history(per_day, years)
+        with db.engine.begin() as conn:
+            conn.execute(
+                text("INSERT INTO vehicle (plate, type, entry_time, exit_time, is_monthly, "
+                     "total_cost, operator_name, exit_operator_name) VALUES (:plate, :type, "
+                     ":entry_time, :exit_time, 0, 500, :operator_name, :exit_operator_name)"),
+                rows
+            )
+            conn.execute(text("ANALYZE"))
+
+        month_ago = datetime.now() - timedelta(days=30)
+        plate = plates[0]
+        cases = [
+            (f"patente '{plate[1:5]}'", Vehicle.plate.like(f'%{plate[1:5]}%'),
+             plate_contains(plate[1:5]), None),
+            (f"patente '{plate[2:5]}'", Vehicle.plate.like(f'%{plate[2:5]}%'),
+             plate_contains(plate[2:5]), None),
+            ("patente inexistente 'QQQ999'", Vehicle.plate.like('%QQQ999%'),
+             plate_contains('QQQ999'), None),
+            (f"patente '{plate[1:5]}' último mes", Vehicle.plate.like(f'%{plate[1:5]}%'),
+             plate_contains(plate[1:5]), month_ago),
+            ("operador 'norte'",
+             or_(Vehicle.operator_name.like('%norte%'), Vehicle.exit_operator_name.like('%norte%')),
+             operator_contains('norte'), None),
+        ]
+
+        print("=" * 78)
+        print(f"AUDITORÍA: {len(rows)} vehículos sintéticos ({years} años)")
+        print("=" * 78)
+        print(f"{'Búsqueda':34} | {'LIKE':>9} | {'Trigramas':>9} | {'Mejora':>7} | Iguales")
+
+        for name, like, fts, start in cases:
+            like_ids, like_ms = run(like, start)
+            fts_ids, fts_ms = run(fts, start)
+            same = like_ids == fts_ids
+            ok = ok and same
+            print(f"{name:34} | {like_ms:7.1f}ms | {fts_ms:7.1f}ms | "
+                  f"{like_ms / fts_ms if fts_ms else 0:6.1f}x | {'✓' if same else '✗'} "
+                  f"({len(fts_ids)})")
+
+        print("=" * 78)
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
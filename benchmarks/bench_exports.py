@@ -0,0 +1,144 @@
+"""
+Benchmark de exportaciones en streaming
+Exporta el historial de vehículos y las asistencias de una base sintética
+grande y mide el pico de memoria de Python (tracemalloc) y las consultas
+ejecutadas, comparando con el armado anterior del CSV completo en memoria.
+Ejecutar: python benchmarks/bench_exports.py [cantidad de vehículos]
+"""
+
+import sys
+import os
+import csv
+import random
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from io import StringIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Base de datos temporal (debe definirse antes de importar config)
+db_dir = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(db_dir, 'exports.db')
+
+from sqlalchemy import event, text
+from app import create_app, db
+from app.migrations import upgrade
+from app.models.models import User, Vehicle, Attendance
+
+
+def populate(count):
+    rng = random.Random(3)
+    start = datetime.now() - timedelta(days=365)
+    vehicles = []
+    for i in range(count):
+        entry = start + timedelta(seconds=rng.randint(0, 365 * 86400))
+        vehicles.append({
+            'plate': f'EX{i % 99999:05d}', 'type': rng.choice(('auto', 'moto')),
+            'entry_time': entry, 'exit_time': entry + timedelta(minutes=rng.randint(5, 600)),
+            'total_cost': 500, 'operator_name': 'operador1', 'exit_operator_name': 'operador2',
+        })
+    attendances = [{
+        'user_id': (i % 10) + 1,
+        'login_time': start + timedelta(hours=i),
+        'logout_time': start + timedelta(hours=i, minutes=480),
+        'total_hours': 8.0,
+    } for i in range(count // 10)]
+
+    with db.engine.begin() as conn:
+        conn.execute(text("INSERT INTO vehicle (plate, type, entry_time, exit_time, is_monthly, "
+                          "total_cost, operator_name, exit_operator_name) VALUES (:plate, :type, "
+                          ":entry_time, :exit_time, 0, :total_cost, :operator_name, "
+                          ":exit_operator_name)"), vehicles)
+        conn.execute(text("INSERT INTO attendance (user_id, login_time, logout_time, total_hours) "
+                          "VALUES (:user_id, :login_time, :logout_time, :total_hours)"), attendances)
+
+
+def legacy_vehicle_export():
+    """Armado anterior: cargar todos los Vehicle y escribir el CSV en un StringIO"""
+    si = StringIO()
+    writer = csv.writer(si)
+    for v in Vehicle.query.order_by(Vehicle.entry_time.desc()).all():
+        writer.writerow([v.id, v.plate, v.type, v.entry_time, v.exit_time, v.is_monthly,
+                         v.total_cost, v.operator_name, v.exit_operator_name])
+    return si.getvalue()
+
+
+def legacy_attendance_export():
+    """Armado anterior de attendance_export (con a.user por fila)"""
+    si = StringIO()
+    writer = csv.writer(si)
+    for a in Attendance.query.order_by(Attendance.login_time.desc()).all():
+        writer.writerow([a.id, a.user.username, a.user.name, a.user.role, a.login_time,
+                         a.logout_time, a.total_hours])
+    return si.getvalue()
+
+
+def measure(func):
+    """(bytes generados, pico de memoria en MB, segundos)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, peak / 1024 / 1024, elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+
+    app = create_app()
+    with app.app_context():
+        upgrade(db.engine, log=lambda message: None)
+        for i in range(10):
+            user = User(username=f'user{i}', name=f'Usuario {i}', role='admin')
+            user.set_password('1234')
+            db.session.add(user)
+        db.session.commit()
+        populate(count)
+        engine = db.engine
+
+    statements = []
+    event.listen(engine, 'before_cursor_execute', lambda *args: statements.append(1))
+
+    client = app.test_client()
+    client.post('/login', data={'username': 'user0', 'password': '1234'})
+
+    def streamed(path):
+        def run():
+            response = client.get(path, buffered=False)
+            size = sum(len(chunk) for chunk in response.response)
+            response.close()
+            return size
+        return run
+
+    def legacy(func):
+        def run():
+            with app.app_context():
+                return len(func().encode())
+        return run
+
+    cases = [
+        ('Vehículos CSV (anterior)', legacy(legacy_vehicle_export)),
+        ('Vehículos CSV (streaming)', streamed('/admin/vehicles/export')),
+        ('Vehículos NDJSON (streaming)', streamed('/admin/vehicles/export?format=ndjson')),
+        ('Asistencias CSV (anterior)', legacy(legacy_attendance_export)),
+        ('Asistencias CSV (streaming)', streamed('/admin/attendance/export')),
+    ]
+
+    print("=" * 84)
+    print(f"EXPORTACIONES: {count} vehículos, {count // 10} asistencias")
+    print("=" * 84)
+    print(f"{'Exportación':30} | {'Tamaño':>9} | {'Pico memoria':>12} | {'Tiempo':>8} | Consultas")
+    for name, func in cases:
+        statements.clear()
+        size, peak, elapsed = measure(func)
+        print(f"{name:30} | {size / 1024 / 1024:7.1f}MB | {peak:10.1f}MB | {elapsed:7.2f}s | "
+              f"{len(statements)}")
+    print("=" * 84)
+
+
+if __name__ == '__main__':
+    main()
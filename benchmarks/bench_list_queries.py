@@ -0,0 +1,178 @@
+"""
+Benchmark de los listados de solo lectura: objetos del ORM vs filas livianas
+Carga un año de vehículos y asistencias sintéticos y compara, para cada
+listado, la consulta anterior (objetos Vehicle / Attendance completos) con
+la actual (named tuples con las columnas que se muestran, o asistencias con
+el usuario en el mismo SELECT): tiempo, memoria máxima (tracemalloc) y
+cantidad de SELECT, verificando que ambas muestren los mismos datos.
+Ejecutar: python benchmarks/bench_list_queries.py [vehículos por día]
+"""
+
+import sys
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Base de datos temporal (debe definirse antes de importar config)
+db_dir = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(db_dir, 'lists.db')
+
+from sqlalchemy import event, func, text
+from app import create_app, db
+from app.business_day import business_day, current_business_day
+from app.migrations import upgrade
+from app.models.models import Vehicle, Attendance, User
+from app.pagination import keyset_paginate
+from app.reports import vehicle_rows, vehicles_of_day, vehicles_in_range, attendances_with_user
+
+RUNS = 5
+USERS = 30
+
+
+def synthetic_data(per_day, seed=11):
+    """Filas de vehicle y attendance de los últimos 365 días"""
+    rng = random.Random(seed)
+    now = datetime.now()
+    first_day = datetime.combine(now.date(), datetime.min.time()) - timedelta(days=364)
+
+    vehicles, attendances = [], []
+    for day in range(365):
+        for _ in range(per_day):
+            entry = first_day + timedelta(days=day, seconds=rng.randint(0, 86399))
+            if entry > now:
+                continue
+            exit_time = entry + timedelta(minutes=rng.randint(5, 600))
+            vehicles.append({
+                'plate': f'SY{rng.randint(0, 99999):05d}',
+                'type': rng.choice(('auto', 'moto')),
+                'entry_time': entry,
+                'exit_time': exit_time if exit_time <= now else None,
+                'is_monthly': rng.random() < 0.1,
+                'total_cost': rng.choice((500.0, 1000.0, 1500.0)),
+                'operator_name': f'operador{rng.randint(1, USERS)}',
+                'exit_operator_name': f'operador{rng.randint(1, USERS)}',
+                'business_day': business_day(entry),
+            })
+        for user_id in range(1, USERS + 1):
+            login = first_day + timedelta(days=day, hours=rng.randint(6, 14))
+            if login > now:
+                continue
+            attendances.append({
+                'user_id': user_id,
+                'login_time': login,
+                'logout_time': login + timedelta(hours=8),
+                'total_hours': 8.0,
+                'business_day': business_day(login),
+            })
+    return vehicles, attendances
+
+
+def vehicle_values(rows):
+    """Lo que muestran las pantallas de cada vehículo"""
+    return [(v.id, v.plate, v.type, v.entry_time, v.exit_time, v.is_monthly,
+             v.total_cost, v.operator_name, v.exit_operator_name) for v in rows]
+
+
+def attendance_values(rows):
+    return [(a.id, a.user.username, a.user.name, a.user.role, a.login_time,
+             a.logout_time, a.get_duration_text()) for a in rows]
+
+
+def measure(function, statements):
+    """Mediana de tiempo, memoria máxima y SELECT de una ejecución (sesión vacía)"""
+    samples = []
+    for _ in range(RUNS):
+        db.session.expunge_all()
+        begin = time.perf_counter()
+        result = function()
+        samples.append((time.perf_counter() - begin) * 1000)
+
+    db.session.expunge_all()
+    statements.clear()
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1] / 1024
+    tracemalloc.stop()
+    return result, sorted(samples)[RUNS // 2], peak, len(statements)
+
+
+def main():
+    per_day = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    app = create_app()
+    ok = True
+
+    with app.app_context():
+        upgrade(db.engine, log=lambda message: None)
+        vehicles, attendances = synthetic_data(per_day)
+        db.session.execute(User.__table__.insert(), [{
+            'username': f'operador{i}', 'name': f'Operador {i}', 'role': 'operador',
+            'password_hash': '-'
+        } for i in range(1, USERS + 1)])
+        db.session.execute(Vehicle.__table__.insert(), vehicles)
+        db.session.execute(Attendance.__table__.insert(), attendances)
+        db.session.commit()
+        db.session.execute(text("ANALYZE"))
+
+        statements = []
+        event.listen(db.engine, 'before_cursor_execute',
+                     lambda *args: statements.append(args[2]))
+
+        today = current_business_day()
+        month_ago = datetime.now() - timedelta(days=30)
+
+        def audit_page(query):
+            return keyset_paginate(query.filter(Vehicle.operator_name == 'operador1'),
+                                   'audit', [Vehicle.entry_time, Vehicle.id], per_page=100).items
+
+        def attendance_page(query):
+            return keyset_paginate(query, 'attendance', [Attendance.login_time, Attendance.id],
+                                   per_page=200).items
+
+        cases = [
+            ('Reportes: vehículos de la jornada',
+             lambda: vehicle_values(Vehicle.query.filter(Vehicle.business_day == today)
+                                    .order_by(Vehicle.entry_time, Vehicle.id).all()),
+             lambda: vehicle_values(vehicles_of_day(today).all())),
+            ('Auditoría: página de 100',
+             lambda: vehicle_values(audit_page(Vehicle.query)),
+             lambda: vehicle_values(audit_page(vehicle_rows()))),
+            ('Listado del último mes',
+             lambda: vehicle_values(Vehicle.query.filter(Vehicle.entry_time >= month_ago)
+                                    .order_by(Vehicle.entry_time, Vehicle.id).all()),
+             lambda: vehicle_values(vehicles_in_range(month_ago, datetime.now()).all())),
+            ('Estadísticas: total de vehículos',
+             lambda: Vehicle.query.count(),
+             lambda: db.session.query(func.count()).select_from(Vehicle).scalar()),
+            ('Historial de asistencias (200)',
+             lambda: attendance_values(attendance_page(Attendance.query)),
+             lambda: attendance_values(attendance_page(attendances_with_user()))),
+        ]
+
+        print("=" * 92)
+        print(f"LISTADOS: {len(vehicles)} vehículos y {len(attendances)} asistencias sintéticos")
+        print("=" * 92)
+        print(f"{'Listado':34} | {'ORM':>9} | {'Filas':>9} | {'Memoria ORM':>12} | "
+              f"{'Filas':>9} | SELECT | Iguales")
+
+        for name, legacy, current in cases:
+            old, old_ms, old_kb, old_selects = measure(legacy, statements)
+            new, new_ms, new_kb, new_selects = measure(current, statements)
+            same = old == new
+            ok = ok and same
+            print(f"{name:34} | {old_ms:7.1f}ms | {new_ms:7.1f}ms | {old_kb:9.0f} KB | "
+                  f"{new_kb:6.0f} KB | {old_selects:>2} → {new_selects:<2}| "
+                  f"{'✓' if same else '✗'}")
+
+        print("=" * 92)
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
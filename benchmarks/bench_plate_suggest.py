@@ -0,0 +1,168 @@
+"""
+Benchmark de /plates/suggest: índice de patentes vs recorrer todas las patentes
+Carga clientes mensuales y vehículos estacionados sintéticos, arma el índice
+y mide autocompletar por prefijo y las sugerencias por errores de lectura
+(O/0, I/1, B/8...) contra una búsqueda lineal, verificando que ambas
+devuelvan las mismas patentes. También mide la sincronización incremental
+después de ingresos y salidas.
+Ejecutar: python benchmarks/bench_plate_suggest.py [mensuales] [estacionados]
+"""
+
+import sys
+import os
+import random
+import string
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Base de datos temporal (debe definirse antes de importar config)
+db_dir = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(db_dir, 'plates.db')
+
+from app import create_app, db
+from app.migrations import upgrade
+from app.models.models import MonthlyClient, Vehicle
+from app.occupancy import occupancy, OpenVehicle
+from app.monthly_cache import monthly_cache
+from app.plate_index import plate_index, CONFUSABLE_PAIRS, TypoIndex, fold_distance, plate_distance
+
+QUERIES = 500
+MISREADS = {a: b for pair in CONFUSABLE_PAIRS for a, b in (pair, pair[::-1])}
+
+
+def random_plate(rng):
+    """Patente argentina vieja (ABC123) o nueva (AB123CD)"""
+    letters = string.ascii_uppercase
+    if rng.random() < 0.5:
+        return ''.join(rng.choices(letters, k=3)) + f'{rng.randint(0, 999):03d}'
+    return (''.join(rng.choices(letters, k=2)) + f'{rng.randint(0, 999):03d}' +
+            ''.join(rng.choices(letters, k=2)))
+
+
+def misread(plate, rng):
+    """La patente con una confusión típica, o con un carácter cambiado"""
+    positions = [i for i, char in enumerate(plate) if char in MISREADS]
+    if positions and rng.random() < 0.7:
+        i = rng.choice(positions)
+        return plate[:i] + MISREADS[plate[i]] + plate[i + 1:]
+    i = rng.randrange(len(plate))
+    return plate[:i] + rng.choice(string.ascii_uppercase) + plate[i + 1:]
+
+
+def load(monthly_count, open_count, rng):
+    plates = set()
+    while len(plates) < monthly_count + open_count:
+        plates.add(random_plate(rng))
+    plates = sorted(plates)
+    rng.shuffle(plates)
+
+    now = datetime.now()
+    db.session.execute(MonthlyClient.__table__.insert(), [{
+        'plate': plate,
+        'owner_name': f'Titular {i}',
+        'vehicle_type': 'auto',
+        'start_date': now - timedelta(days=i % 60),
+        'duration_months': 1,
+        'created_at': now
+    } for i, plate in enumerate(plates[:monthly_count])])
+    db.session.execute(Vehicle.__table__.insert(), [{
+        'plate': plate,
+        'type': 'auto',
+        'entry_time': now - timedelta(minutes=i % 600),
+        'is_monthly': False,
+        'operator_name': 'operador1'
+    } for i, plate in enumerate(plates[monthly_count:])])
+    db.session.commit()
+    return plates
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return samples[len(samples) // 2], samples[int(len(samples) * 0.99)]
+
+
+def timed(function, queries):
+    samples, results = [], []
+    for query in queries:
+        begin = time.perf_counter()
+        results.append(function(query))
+        samples.append((time.perf_counter() - begin) * 1000)
+    return results, samples
+
+
+def main():
+    monthly_count = int(sys.argv[1]) if len(sys.argv) > 1 else 30000
+    open_count = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+
+    rng = random.Random(7)
+    app = create_app()
+    ok = True
+
+    with app.app_context():
+        upgrade(db.engine, log=lambda message: None)
+        plates = load(monthly_count, open_count, rng)
+        occupancy.rebuild()
+        monthly_cache.rebuild()
+
+        begin = time.perf_counter()
+        plate_index.rebuild()
+        build_ms = (time.perf_counter() - begin) * 1000
+
+        prefixes = [rng.choice(plates)[:rng.randint(2, 4)] for _ in range(QUERIES)]
+        typos = [misread(rng.choice(plates), rng) for _ in range(QUERIES)]
+
+        def linear_complete(prefix):
+            return sorted(p for p in plates if p.startswith(prefix))[:10]
+
+        def linear_similar(plate):
+            key = TypoIndex.fold(plate)
+            found = sorted((plate_distance(plate, p), p) for p in plates
+                           if p != plate and fold_distance(key, TypoIndex.fold(p)) <= 1)
+            return [p for _, p in found[:10]]
+
+        cases = [
+            ("autocompletar (2-4 caracteres)", prefixes,
+             lambda q: [m.plate for m in plate_index.complete(q)], linear_complete),
+            ("¿quiso decir? (lectura errónea)", typos,
+             lambda q: [m.plate for m in plate_index.similar(q)], linear_similar),
+        ]
+
+        print("=" * 78)
+        print(f"PATENTES: {monthly_count} mensuales + {open_count} estacionadas "
+              f"(índice armado en {build_ms:.0f}ms)")
+        print("=" * 78)
+        print(f"{'Búsqueda':32} | {'Lineal p50':>10} | {'Índice p50':>10} | {'p99':>8} | Iguales")
+
+        for name, queries, indexed, linear in cases:
+            linear_results, linear_ms = timed(linear, queries[:50])
+            indexed_results, indexed_ms = timed(indexed, queries)
+            same = linear_results == indexed_results[:50]
+            ok = ok and same
+            p50, p99 = percentiles(indexed_ms)
+            print(f"{name:32} | {percentiles(linear_ms)[0]:8.2f}ms | {p50:8.3f}ms | "
+                  f"{p99:6.3f}ms | {'✓' if same else '✗'}")
+
+        # Ingresos y salidas: el índice los aplica en la próxima búsqueda
+        samples = []
+        for i in range(QUERIES):
+            plate = random_plate(rng)
+            occupancy.add(OpenVehicle(10 ** 7 + i, plate, 'auto', datetime.now(), False, 'bench'))
+            begin = time.perf_counter()
+            found = plate_index.complete(plate, 1, sources=('open',))
+            samples.append((time.perf_counter() - begin) * 1000)
+            occupancy.remove(10 ** 7 + i)
+            ok = ok and bool(found) and found[0].plate == plate
+
+        p50, p99 = percentiles(samples)
+        print(f"{'ingreso + autocompletar':32} | {'-':>10} | {p50:8.3f}ms | {p99:6.3f}ms | "
+              f"{'✓' if ok else '✗'}")
+        print("=" * 78)
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+"""
+Benchmark de reportes sobre un año de datos sintéticos
+Carga un año de vehículos en una base temporal y compara el cálculo
+anterior (cargar cada Vehicle y sumar en Python) con las consultas
+agregadas de app/reports.py y con la tabla de totales por hora
+(app/rollup.py), verificando que los tres den los mismos totales.
+Ejecutar: python benchmarks/bench_reports.py [vehículos por día]
+"""
+
+import sys
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Base de datos temporal (debe definirse antes de importar config)
+db_dir = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(db_dir, 'reports.db')
+
+from sqlalchemy import text
+from app import create_app, db
+from app.migrations import upgrade
+from app.models.models import Vehicle, User
+from app.reports import day_range, vehicle_totals
+from app.rollup import rebuild_rollup, rollup_totals
+from app.tariffs import tariff_engine
+
+
+def synthetic_year(per_day, seed=42):
+    """Filas de vehículo de los últimos 365 días (los de hoy pueden seguir adentro)"""
+    rng = random.Random(seed)
+    now = datetime.now()
+    first_day = datetime.combine(now.date(), datetime.min.time()) - timedelta(days=364)
+
+    rows = []
+    for day in range(365):
+        for _ in range(per_day):
+            entry = first_day + timedelta(days=day, seconds=rng.randint(0, 86399))
+            if entry > now:
+                continue
+            vehicle_type = rng.choice(('auto', 'moto'))
+            is_monthly = rng.random() < 0.1
+            exit_time = entry + timedelta(minutes=rng.randint(5, 600))
+            if exit_time > now:
+                exit_time, cost = None, None
+            else:
+                minutes = (exit_time - entry).total_seconds() / 60
+                cost = tariff_engine.quote(vehicle_type, minutes, is_monthly)
+            rows.append({
+                'plate': f'SY{rng.randint(0, 99999):05d}',
+                'type': vehicle_type,
+                'entry_time': entry,
+                'exit_time': exit_time,
+                'is_monthly': is_monthly,
+                'total_cost': cost,
+                'operator_name': rng.choice(('operador1', 'operador2', 'operador3')),
+            })
+    return rows
+
+
+def legacy_totals(start, end=None, by_date=False):
+    """Cálculo anterior: cargar los Vehicle y sumar en Python"""
+    if by_date:
+        vehicles = Vehicle.query.filter(db.func.date(Vehicle.entry_time) == start.date()).all()
+    else:
+        query = Vehicle.query.filter(Vehicle.entry_time >= start)
+        if end is not None:
+            query = query.filter(Vehicle.entry_time < end)
+        vehicles = query.all()
+    return {
+        'vehicles': len(vehicles),
+        'earnings': sum(v.total_cost or 0 for v in vehicles if v.exit_time),
+        'active': len([v for v in vehicles if not v.exit_time])
+    }
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    per_day = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+
+    app = create_app()
+    ok = True
+
+    with app.app_context():
+        upgrade(db.engine, log=lambda message: None)
+        rows = synthetic_year(per_day)
+        with db.engine.begin() as conn:
+            conn.execute(
+                text("INSERT INTO vehicle (plate, type, entry_time, exit_time, is_monthly, "
+                     "total_cost, operator_name) VALUES (:plate, :type, :entry_time, "
+                     ":exit_time, :is_monthly, :total_cost, :operator_name)"),
+                rows
+            )
+            rollup_rows = rebuild_rollup(conn)
+            conn.execute(text("ANALYZE"))
+
+        user = User(username='bench', name='Bench', role='admin')
+        user.set_password('1234')
+        db.session.add(user)
+        db.session.commit()
+
+        # Los totales por hora cuentan desde el inicio de la hora
+        now = datetime.now().replace(minute=0, second=0, microsecond=0)
+        today_start, today_end = day_range(now)
+        cases = [
+            ('Hoy', (today_start, today_end), {'by_date': True}),
+            ('Última semana', (now - timedelta(days=7),), {}),
+            ('Último mes', (now - timedelta(days=30),), {}),
+            ('Año completo', (now - timedelta(days=365),), {}),
+        ]
+
+        print("=" * 72)
+        print(f"REPORTES: {len(rows)} vehículos sintéticos ({per_day} por día), "
+              f"{rollup_rows} filas de totales")
+        print("=" * 72)
+        print(f"{'Rango':16} | {'Anterior':>10} | {'Agregado':>10} | {'Totales':>10} | Iguales")
+
+        for name, args, legacy_kwargs in cases:
+            db.session.expunge_all()
+            old, old_ms = timed(legacy_totals, *args, **legacy_kwargs)
+            new, new_ms = timed(vehicle_totals, *args)
+            rolled, rolled_ms = timed(rollup_totals, *args)
+            same = all(
+                old['vehicles'] == other['vehicles'] and old['active'] == other['active']
+                and abs(old['earnings'] - other['earnings']) < 0.01
+                for other in (new, rolled)
+            )
+            ok = ok and same
+            print(f"{name:16} | {old_ms:8.1f}ms | {new_ms:8.1f}ms | {rolled_ms:8.1f}ms | "
+                  f"{'✓' if same else '✗'}")
+
+    client = app.test_client()
+    client.post('/login', data={'username': 'bench', 'password': '1234'})
+
+    print("-" * 72)
+    for path in ('/reports', '/reports?page=2', '/admin/stats/summary'):
+        response, ms = timed(client.get, path)
+        ok = ok and response.status_code == 200
+        print(f"GET {path:30} | HTTP {response.status_code} | {ms:8.1f}ms")
+    print("=" * 72)
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
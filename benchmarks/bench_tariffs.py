@@ -0,0 +1,55 @@
+"""
+Benchmark del motor de tarifas: cálculo por lotes vs una estadía por vez
+Cotiza estadías aleatorias con la API escalar y con la API por lotes y
+verifica que ambas den exactamente el mismo resultado.
+Ejecutar: python benchmarks/bench_tariffs.py [cantidad]
+"""
+
+import sys
+import os
+import random
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.tariffs import tariff_engine, np
+
+
+def random_stays(count, seed=42):
+    """Estadías de 1 minuto a 3 días, con 10% de clientes mensuales"""
+    rng = random.Random(seed)
+    types = [rng.choice(('auto', 'moto')) for _ in range(count)]
+    minutes = [rng.uniform(1, 3 * 24 * 60) for _ in range(count)]
+    monthly = [rng.random() < 0.1 for _ in range(count)]
+    return types, minutes, monthly
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    types, minutes, monthly = random_stays(count)
+
+    start = time.perf_counter()
+    scalar = [tariff_engine.quote(t, m, f) for t, m, f in zip(types, minutes, monthly)]
+    scalar_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = tariff_engine.quote_batch(types, minutes, monthly)
+    batch_time = time.perf_counter() - start
+
+    same = list(map(int, batch)) == scalar
+
+    print("=" * 60)
+    print(f"TARIFAS: {count} estadías ({'NumPy' if np is not None else 'sin NumPy'})")
+    print("=" * 60)
+    print(f"Escalar:  {scalar_time * 1000:9.1f} ms")
+    print(f"Lotes:    {batch_time * 1000:9.1f} ms")
+    if batch_time:
+        print(f"Mejora:   {scalar_time / batch_time:9.1f}x")
+    print(f"Resultados iguales: {'✓' if same else '✗'}")
+    print("=" * 60)
+
+    sys.exit(0 if same else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""
+Benchmark de armado de tickets: bloques individuales vs plantillas precompiladas
+Compara escrituras, bytes enviados y tiempo por ticket contra una impresora
+simulada en localhost (no imprime nada).
+Ejecutar: python benchmarks/bench_tickets.py [cantidad]
+"""
+
+import sys
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from escpos.printer import Dummy, Network
+from app.ticket_templates import (
+    TicketTemplates, entry_ticket_blocks, exit_ticket_blocks, test_ticket_blocks
+)
+
+
+class PrinterSink:
+    """Servidor TCP local que descarta lo recibido (simula la impresora)"""
+
+    def __init__(self):
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.bind(('127.0.0.1', 0))
+        self.server.listen(1)
+        self.port = self.server.getsockname()[1]
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def _serve(self):
+        while True:
+            conn, _ = self.server.accept()
+            threading.Thread(target=self._drain, args=(conn,), daemon=True).start()
+
+    @staticmethod
+    def _drain(conn):
+        while conn.recv(65536):
+            pass
+
+
+def make_vehicles():
+    """Vehículos de ejemplo para cada tipo de ticket"""
+    now = datetime.now()
+    base = dict(
+        id=1234, plate='AB123CD', type='auto', operator_name='operador1',
+        exit_operator_name='operador2', entry_time=now - timedelta(minutes=95),
+        exit_time=now, total_cost=1000, is_monthly=False
+    )
+    return {
+        'entrada (QR imagen)': ('entry_raster', SimpleNamespace(**base)),
+        'entrada (QR nativo)': ('entry', SimpleNamespace(**base)),
+        'salida': ('exit', SimpleNamespace(**base)),
+        'prueba': ('test', None),
+    }
+
+
+def blocks_for(kind, vehicle):
+    if kind == 'entry':
+        return entry_ticket_blocks(vehicle, native_qr=True)
+    if kind == 'entry_raster':
+        return entry_ticket_blocks(vehicle, native_qr=False)
+    if kind == 'exit':
+        return exit_ticket_blocks(vehicle)
+    return test_ticket_blocks('127.0.0.1')
+
+
+def measure_bytes(kind, vehicle):
+    """Escrituras y bytes de cada camino"""
+    legacy = Dummy()
+    for _, render in blocks_for(kind, vehicle):
+        render(legacy)
+    template = TicketTemplates().build(blocks_for(kind, vehicle))
+    return len(legacy._output_list), len(legacy.output), 1, len(template)
+
+
+def measure_time(kind, vehicle, count, port):
+    """Milisegundos por ticket enviando a la impresora simulada"""
+    printer = Network('127.0.0.1', port=port, timeout=5)
+    printer.open()
+
+    start = time.perf_counter()
+    for _ in range(count):
+        for _, render in blocks_for(kind, vehicle):
+            render(printer)
+    legacy_ms = (time.perf_counter() - start) * 1000 / count
+
+    templates = TicketTemplates()
+    start = time.perf_counter()
+    for _ in range(count):
+        printer._raw(templates.build(blocks_for(kind, vehicle)))
+    template_ms = (time.perf_counter() - start) * 1000 / count
+
+    printer.close()
+    return legacy_ms, template_ms
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    sink = PrinterSink()
+
+    print("=" * 88)
+    print(f"BENCHMARK DE TICKETS ESC/POS ({count} tickets por caso)")
+    print("=" * 88)
+    print(f"{'Ticket':20} | {'Escrituras':>15} | {'Bytes':>17} | {'ms/ticket':>21}")
+    print(f"{'':20} | {'bloques  plant.':>15} | {'bloques   plant.':>17} | {'bloques    plant.':>21}")
+    print("-" * 88)
+
+    for name, (kind, vehicle) in make_vehicles().items():
+        legacy_writes, legacy_bytes, template_writes, template_bytes = measure_bytes(kind, vehicle)
+        legacy_ms, template_ms = measure_time(kind, vehicle, count, sink.port)
+        print(f"{name:20} | {legacy_writes:7} {template_writes:7} | "
+              f"{legacy_bytes:8} {template_bytes:8} | {legacy_ms:10.3f} {template_ms:10.3f}")
+
+    print("=" * 88)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+Verificación del presupuesto de consultas por ingreso de vehículo
+Registra ingresos contra una base temporal y cuenta las sentencias SQL y los
+COMMIT que ejecuta cada POST /vehicle/entry. Termina con código 1 si se
+supera el presupuesto documentado en vehicle_entry o si GET /occupancy
+consulta la base de datos.
+Ejecutar: python benchmarks/check_entry_budget.py
+"""
+
+import sys
+import os
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Base de datos temporal (debe definirse antes de importar config)
+db_dir = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(db_dir, 'budget.db')
+
+from sqlalchemy import event
+from app import create_app, db
+from app.migrations import upgrade
+from app.models.models import User, MonthlyClient
+from app.printer_service import printer_service
+from app.occupancy import occupancy
+from app.monthly_cache import monthly_cache
+from datetime import datetime
+
+# Carga del usuario de la sesión + 2 INSERT + UPSERT de totales (mensuales en caché)
+MAX_STATEMENTS = 4
+MAX_COMMITS = 1
+
+
+class StatementCounter:
+    """Cuenta sentencias y commits ejecutados por el hilo actual"""
+
+    def __init__(self, engine):
+        self.thread_id = threading.get_ident()
+        self.statements = []
+        self.commits = 0
+        event.listen(engine, 'before_cursor_execute', self._on_execute)
+        event.listen(engine, 'commit', self._on_commit)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if threading.get_ident() == self.thread_id:
+            self.statements.append(statement.split()[0].upper())
+
+    def _on_commit(self, conn):
+        if threading.get_ident() == self.thread_id:
+            self.commits += 1
+
+    def reset(self):
+        self.statements = []
+        self.commits = 0
+
+
+def main():
+    printer_service.enabled = False
+
+    app = create_app()
+    with app.app_context():
+        upgrade(db.engine, log=lambda message: None)
+        user = User(username='budget', name='Budget', role='operador')
+        user.set_password('1234')
+        db.session.add(user)
+        db.session.add(MonthlyClient(
+            plate='MEN001', owner_name='Mensual', vehicle_type='auto',
+            start_date=datetime.now(), duration_months=1
+        ))
+        db.session.commit()
+        occupancy.rebuild()  # Igual que run.py al iniciar
+        monthly_cache.rebuild()
+        counter = StatementCounter(db.engine)
+
+    client = app.test_client()
+    client.post('/login', data={'username': 'budget', 'password': '1234'})
+    client.get('/entry')  # Primera petición: inicia la cola de impresión
+
+    ok = True
+    print("=" * 70)
+    print(f"PRESUPUESTO POR INGRESO: {MAX_STATEMENTS} sentencias, {MAX_COMMITS} commit")
+    print("=" * 70)
+
+    for plate in ('AB123CD', 'MEN001'):
+        counter.reset()
+        response = client.post('/vehicle/entry', data={'plate': plate, 'type': 'auto'})
+        within = (response.status_code == 200 and
+                  len(counter.statements) <= MAX_STATEMENTS and
+                  counter.commits <= MAX_COMMITS)
+        ok = ok and within
+
+        print(f"{'✓' if within else '✗'} {plate:10} | HTTP {response.status_code} | "
+              f"{len(counter.statements)} sentencias ({', '.join(counter.statements)}) | "
+              f"{counter.commits} commit")
+
+    # La ocupación se responde desde memoria (sin sesión ni base de datos)
+    counter.reset()
+    response = app.test_client().get('/occupancy')
+    within = response.status_code == 200 and not counter.statements
+    ok = ok and within
+    print(f"{'✓' if within else '✗'} {'/occupancy':10} | HTTP {response.status_code} | "
+          f"{len(counter.statements)} sentencias")
+
+    print("=" * 70)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+"""
+Verificación de índices de las consultas frecuentes
+Ejecuta EXPLAIN QUERY PLAN sobre las consultas que usan las rutas más
+transitadas y termina con código 1 si alguna recorre una tabla completa.
+Ejecutar: python benchmarks/check_query_plans.py
+"""
+
+import sys
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Base de datos temporal (debe definirse antes de importar config)
+db_dir = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(db_dir, 'plans.db')
+
+from app import create_app, db
+from app.migrations import upgrade
+from app.models.models import Vehicle, Attendance, PrintJob, MonthlyClient
+from app.occupancy import occupancy
+from app.reports import vehicles_of_day, attendances_with_user
+from app.business_day import current_business_day, business_day_range
+from app.rollup import rollup_query
+from app.search import plate_contains, operator_contains
+from app.monthly_clients import filtered_query
+
+
+def hot_queries():
+    """Consultas de las rutas (nombre, query de SQLAlchemy)"""
+    now = datetime.now()
+    week_ago = now - timedelta(days=7)
+    today = current_business_day()
+
+    return [
+        ('vehicle_exit: patente estacionada',
+         Vehicle.query.filter_by(plate='AB123CD', exit_time=None)),
+        ('occupancy: vehículos estacionados',
+         occupancy.open_vehicles_query()),
+        ('audit_search: rango de fechas',
+         Vehicle.query.filter(Vehicle.entry_time >= week_ago, Vehicle.entry_time < now)
+         .order_by(Vehicle.entry_time.desc())),
+        ('audit_search: página siguiente (keyset)',
+         Vehicle.query.filter(db.tuple_(Vehicle.entry_time, Vehicle.id) < db.tuple_(week_ago, 1000))
+         .order_by(Vehicle.entry_time.desc(), Vehicle.id.desc()).limit(100)),
+        ('attendance_history: página siguiente (keyset)',
+         Attendance.query.filter(db.tuple_(Attendance.login_time, Attendance.id) < db.tuple_(week_ago, 1000))
+         .order_by(Attendance.login_time.desc(), Attendance.id.desc()).limit(200)),
+        ('monthly_api: prefijo de patente',
+         filtered_query(now, 7, plate='AB').order_by(MonthlyClient.plate, MonthlyClient.id).limit(100)),
+        ('monthly_api: por titular, página siguiente',
+         MonthlyClient.query.filter(db.tuple_(MonthlyClient.owner_name, MonthlyClient.id) > db.tuple_('M', 10))
+         .order_by(MonthlyClient.owner_name, MonthlyClient.id).limit(100)),
+        ('monthly_api: por vencer, por vencimiento',
+         filtered_query(now, 7, status='expiring')
+         .order_by(MonthlyClient.expiration_date, MonthlyClient.id).limit(100)),
+        ('monthly_page: abonos por vencer',
+         MonthlyClient.expiring_within(7, now)),
+        ('monthly_api: página siguiente (keyset)',
+         MonthlyClient.query.filter(MonthlyClient.id > 1000).order_by(MonthlyClient.id).limit(100)),
+        ('audit_search: patente (trigramas)',
+         Vehicle.query.filter(plate_contains('B123')).order_by(Vehicle.entry_time.desc())),
+        ('audit_search: operador (trigramas)',
+         Vehicle.query.filter(operator_contains('operador1'))),
+        ('reports_page: totales de la jornada',
+         rollup_query(*business_day_range(today))),
+        ('reports_page: detalle del día',
+         vehicles_of_day(today)),
+        ('stats_summary: última semana',
+         rollup_query(week_ago)),
+        ('get_active_attendance',
+         Attendance.query.filter_by(user_id=1, logout_time=None)),
+        ('get_today_attendance',
+         Attendance.query.filter(Attendance.user_id == 1,
+                                 Attendance.business_day == today)),
+        ('attendance_panel: asistencias de la jornada',
+         attendances_with_user().filter(Attendance.business_day == today)
+         .order_by(Attendance.login_time.desc())),
+        ('attendance_panel: usuarios activos',
+         attendances_with_user().filter(Attendance.logout_time.is_(None))),
+        ('attendance_history: rango de fechas',
+         attendances_with_user().filter(Attendance.login_time >= week_ago)
+         .order_by(Attendance.login_time.desc())),
+        ('attendance_user_report',
+         Attendance.query.filter(Attendance.user_id == 1,
+                                 Attendance.login_time >= week_ago,
+                                 Attendance.login_time < now)),
+        ('print_spooler: próximo trabajo',
+         PrintJob.query.filter(PrintJob.status == 'pending',
+                               PrintJob.next_attempt_at <= now)),
+    ]
+
+
+def query_plan(query):
+    """Filas de EXPLAIN QUERY PLAN de una query de SQLAlchemy"""
+    compiled = query.statement.compile(db.engine)
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+
+    with db.engine.connect() as conn:
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params).fetchall()
+    return [row[-1] for row in rows]
+
+
+def uses_index(plan):
+    """False si algún paso recorre la tabla completa"""
+    for detail in plan:
+        if detail.startswith('SCAN') and 'USING' not in detail and 'VIRTUAL TABLE INDEX' not in detail:
+            return False
+    return True
+
+
+def main():
+    app = create_app()
+    ok = True
+
+    with app.app_context():
+        upgrade(db.engine, log=lambda message: None)
+
+        print("=" * 90)
+        print("PLANES DE CONSULTA")
+        print("=" * 90)
+
+        for name, query in hot_queries():
+            plan = query_plan(query)
+            indexed = uses_index(plan)
+            ok = ok and indexed
+            print(f"{'✓' if indexed else '✗'} {name:38} | {' / '.join(plan)}")
+
+        print("=" * 90)
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
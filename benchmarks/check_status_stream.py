@@ -0,0 +1,109 @@
+"""
+Verificación del stream de estado (/status/stream)
+Abre el stream sin versión (el servidor manda el estado completo con un
+evento reset) y con una versión conocida, registra un ingreso y verifica
+que el stream siga entregando eventos después del reset. Termina con
+código 1 si el stream se corta con un error o falta algún evento.
+Ejecutar: python benchmarks/check_status_stream.py
+"""
+
+import sys
+import os
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Base de datos temporal (debe definirse antes de importar config)
+db_dir = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(db_dir, 'stream.db')
+
+from app import create_app, db
+from app.migrations import upgrade
+from app.models.models import User
+from app.printer_service import printer_service
+from app.occupancy import occupancy
+
+# Segundos que queda abierto cada stream en la verificación
+STREAM_SECONDS = 2
+
+
+def read_events(client, url, during=None):
+    """
+    Tipos de evento recibidos hasta que el servidor cierra el stream
+
+    during se ejecuta en otro hilo mientras el stream está abierto.
+    """
+    response = client.get(url, buffered=False)
+    if during:
+        threading.Timer(0.3, during).start()
+
+    events = []
+    try:
+        for chunk in response.response:
+            for line in chunk.decode().splitlines():
+                if line.startswith('event: '):
+                    events.append(line[len('event: '):])
+    except Exception as e:
+        events.append(f'error: {type(e).__name__}: {e}')
+    finally:
+        response.close()
+    return response.status_code, events
+
+
+def main():
+    printer_service.enabled = False
+
+    app = create_app()
+    app.config['STATUS_STREAM_TIMEOUT'] = STREAM_SECONDS
+    app.config['STATUS_STREAM_HEARTBEAT'] = 1
+    with app.app_context():
+        upgrade(db.engine, log=lambda message: None)
+        user = User(username='stream', name='Stream', role='operador')
+        user.set_password('1234')
+        db.session.add(user)
+        db.session.commit()
+        occupancy.rebuild()  # Igual que run.py al iniciar
+
+    client = app.test_client()
+    client.post('/login', data={'username': 'stream', 'password': '1234'})
+    client.get('/entry')  # Primera petición: inicia la cola de impresión
+
+    plates = iter(('ST001', 'ST002', 'ST003'))
+
+    def enter():
+        entry = app.test_client()
+        entry.post('/login', data={'username': 'stream', 'password': '1234'})
+        entry.post('/vehicle/entry', data={'plate': next(plates), 'type': 'auto'})
+
+    version = occupancy.version()
+    cases = [
+        ('sin versión', '/status/stream', None, ['reset']),
+        ('sin versión + ingreso', '/status/stream', enter, ['reset', 'entry']),
+        ('versión anterior al reinicio', f'/status/stream?since={version - 10 ** 6}',
+         enter, ['reset', 'entry']),
+        ('versión actual + ingreso', None, enter, ['entry']),
+    ]
+
+    ok = True
+    print("=" * 70)
+    print(f"STREAM DE ESTADO: cada conexión queda abierta {STREAM_SECONDS}s")
+    print("=" * 70)
+
+    for name, url, during, expected in cases:
+        if url is None:
+            url = f'/status/stream?since={occupancy.version()}'
+        begin = time.monotonic()
+        status, events = read_events(client, url, during)
+        passed = status == 200 and events == expected
+        ok = ok and passed
+        print(f"{'✓' if passed else '✗'} {name:30} | HTTP {status} | "
+              f"{', '.join(events) or '-'} | {time.monotonic() - begin:.1f}s")
+
+    print("=" * 70)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
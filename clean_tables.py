@@ -5,7 +5,7 @@ Ejecutar: python clean_tables.py
 """
 
 from app import create_app, db
-from app.models.models import User, Vehicle, MonthlyClient, Attendance
+from app.models.models import User, Vehicle, MonthlyClient, Attendance, VehicleRollup, PrintJob
 
 def mostrar_resumen():
     """Muestra un resumen conciso de lo que se va a hacer"""
@@ -37,7 +37,7 @@ def confirmar_limpieza():
     """Solicita confirmación antes de proceder"""
     print("\n⚠️  ADVERTENCIA:")
     print("Esta acción eliminará PERMANENTEMENTE los registros de:")
-    print("  ❌ Vehículos (ingresos/salidas)")
+    print("  ❌ Vehículos (ingresos/salidas) y sus tickets en cola de impresión")
     print("  ❌ Asistencias del personal")
     print()
     print("Se mantendrán:")
@@ -75,8 +75,11 @@ def limpiar_tablas():
         print("\n🔄 Limpiando...")
         
         try:
-            # Borrar registros
+            # Borrar registros (los tickets pendientes apuntan a vehículos:
+            # se borran antes para que la cola no reintente vehículos inexistentes)
+            deleted_jobs = PrintJob.query.delete()
             deleted_vehicles = Vehicle.query.delete()
+            VehicleRollup.query.delete()  # Totales calculados de los vehículos
             deleted_attendance = Attendance.query.delete()
             
             # Confirmar cambios
@@ -84,6 +87,7 @@ def limpiar_tablas():
             
             print("\n✅ LIMPIEZA COMPLETADA")
             print(f"   🚗 Eliminados: {deleted_vehicles} vehículos")
+            print(f"   🖨️  Eliminados: {deleted_jobs} trabajos de impresión")
             print(f"   ⏰ Eliminados: {deleted_attendance} asistencias")
             print(f"   👥 Mantenidos: {stats['users']} usuarios")
             print(f"   💳 Mantenidos: {stats['monthly']} clientes")
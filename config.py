@@ -10,9 +10,60 @@ class Config:
         'sqlite:///' + os.path.join(basedir, 'app.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Tarifas por tipo de vehículo: primera hora completa y luego cada
+    # fracción de 15 minutos iniciada
+    TARIFFS = {
+        'auto': {'first_minutes': 60, 'first_rate': 500, 'fraction_minutes': 15, 'fraction_rate': 125},
+        'moto': {'first_minutes': 60, 'first_rate': 300, 'fraction_minutes': 15, 'fraction_rate': 75},
+    }
+    TARIFF_DEFAULT_TYPE = 'moto'  # Tarifa para tipos sin tarifa propia
+    
+    # Capacidad del estacionamiento por tipo (0 = sin límite)
+    LOT_CAPACITY = {
+        'auto': int(os.environ.get('LOT_CAPACITY_AUTO', 0)),
+        'moto': int(os.environ.get('LOT_CAPACITY_MOTO', 0)),
+    }
+    OCCUPANCY_MAX_AGE = 2  # Segundos de caché de /occupancy para carteles
+    
+    # Pantalla de estado en vivo
+    OCCUPANCY_EVENT_LOG_SIZE = 500  # Ingresos/salidas recientes que se pueden pedir por versión
+    STATUS_STREAM_HEARTBEAT = 15    # Segundos entre comentarios keep-alive del stream SSE
+    STATUS_STREAM_TIMEOUT = 300     # Segundos antes de cerrar el stream (el navegador reconecta)
+    
+    # Hora en que empieza la jornada: un ingreso o turno antes de esa hora
+    # cuenta para el día anterior (turnos nocturnos). Si se cambia, volver a
+    # calcular los días guardados con: python backfill_business_day.py
+    BUSINESS_DAY_START_HOUR = int(os.environ.get('BUSINESS_DAY_START_HOUR', 0))
+    
+    # Reportes
+    REPORTS_PER_PAGE = 50  # Vehículos por página en el detalle del día
+    AUDIT_PAGE_SIZE = 100  # Resultados por página en la búsqueda de auditoría
+    ATTENDANCE_PAGE_SIZE = 200  # Registros por página en el historial de asistencias
+    MONTHLY_PAGE_SIZE = 100  # Clientes mensuales por página
+    MONTHLY_IMPORT_BATCH_SIZE = 500  # Filas por executemany al importar clientes desde CSV
+    MONTHLY_EXPIRING_DAYS = 7  # Días antes del vencimiento en que un abono figura "por vencer"
+    MONTHLY_CACHE_CHECK_SECONDS = 30  # Cada cuánto la caché de mensuales busca cambios hechos por otros procesos
+    PLATE_SUGGEST_LIMIT = 10  # Patentes por lista en /plates/suggest
+    PLATE_SUGGEST_MIN_LENGTH = 4  # Caracteres escritos a partir de los cuales se sugieren patentes parecidas
+    EXPORT_BATCH_SIZE = 1000  # Filas leídas y enviadas por lote en las exportaciones
+    
     # Configuración de impresora térmica
     PRINTER_ENABLED = True
     PRINTER_TYPE = 'network'
     PRINTER_IP = '192.168.18.43'  # IP configurada en la impresora
     PRINTER_PORT = 9100
-    PRINTER_TIMEOUT = 5
\ No newline at end of file
+    PRINTER_TIMEOUT = 5
+    PRINTER_KEEP_ALIVE = True  # Mantener abierta la conexión entre tickets
+    PRINTER_IDLE_TIMEOUT = 300  # Segundos sin uso antes de reconectar
+    PRINTER_TEMPLATES = True  # Enviar cada ticket en una sola escritura
+    PRINTER_NATIVE_QR = True  # QR generado por la impresora (False = imagen)
+    
+    # Códigos QR generados a pedido
+    QR_CACHE_SIZE = 1024  # Cantidad de QR guardados en memoria por formato
+    QR_MAX_AGE = 31536000  # Segundos de caché en el navegador (1 año)
+    
+    # Cola de impresión (reintentos con espera exponencial)
+    PRINT_MAX_ATTEMPTS = 5
+    PRINT_RETRY_BASE = 2  # segundos antes del primer reintento
+    PRINT_RETRY_MAX = 60  # espera máxima entre reintentos
+    PRINT_POLL_INTERVAL = 10  # revisión periódica de trabajos pendientes
\ No newline at end of file
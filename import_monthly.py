@@ -0,0 +1,57 @@
+"""
+Script para importar clientes mensuales desde un archivo CSV
+Columnas obligatorias: Patente, Titular, Tipo (auto/moto). Opcionales:
+Modelo, Teléfono, Inicio (AAAA-MM-DD, por defecto hoy) y Meses (por defecto 1).
+El CSV de la exportación de clientes mensuales se puede importar tal cual.
+Con el servidor en marcha, los clientes importados se reconocen en los
+ingresos a más tardar MONTHLY_CACHE_CHECK_SECONDS después (ver
+app/monthly_cache.py).
+Ejecutar:
+    python import_monthly.py clientes.csv                 # importar
+    python import_monthly.py clientes.csv --dry-run       # solo validar
+"""
+
+import sys
+from app import create_app
+from app.monthly_bulk import import_monthly_clients, InvalidImportFile
+
+
+if __name__ == '__main__':
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    dry_run = '--dry-run' in sys.argv
+
+    if len(args) != 1:
+        print("❌ Uso: python import_monthly.py archivo.csv [--dry-run]")
+        sys.exit(1)
+
+    try:
+        with open(args[0], encoding='utf-8-sig') as f:
+            text = f.read()
+    except (OSError, UnicodeDecodeError) as e:
+        print(f"❌ No se pudo leer el archivo: {e}")
+        sys.exit(1)
+
+    app = create_app()
+
+    with app.app_context():
+        print("\n" + "=" * 60)
+        print("📥 IMPORTACIÓN DE CLIENTES MENSUALES" + (" (SOLO VALIDACIÓN)" if dry_run else ""))
+        print("=" * 60)
+
+        try:
+            result = import_monthly_clients(text, 'importacion', dry_run=dry_run)
+        except InvalidImportFile as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        except Exception as e:
+            print(f"\n❌ Error: {e}")
+            sys.exit(1)
+
+        for error in result.errors:
+            print(f"⚠️  Línea {error.line} ({error.plate or 'sin patente'}): {error.message}")
+
+        action = "válidos" if dry_run else "importados"
+        print(f"\n✅ {result.imported} de {result.total} clientes {action}")
+        if result.errors:
+            print(f"⚠️  {len(result.errors)} fila(s) con errores")
+            sys.exit(2)
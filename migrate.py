@@ -0,0 +1,63 @@
+"""
+Script para actualizar el esquema de la base de datos
+Aplica en orden las migraciones pendientes de app/migrations.py
+Ejecutar:
+    python migrate.py          # aplicar migraciones pendientes
+    python migrate.py status   # ver versión actual y pendientes
+"""
+
+import sys
+from app import create_app, db
+from app.migrations import (
+    MIGRATIONS, get_version, latest_version, pending_migrations, backup_database, upgrade
+)
+
+
+def mostrar_estado():
+    """Muestra la versión aplicada y las migraciones pendientes"""
+    current = get_version(db.engine)
+    pending = {m.version for m in pending_migrations(db.engine)}
+
+    print(f"\n📋 Versión de la base de datos: {current} (última: {latest_version()})")
+    print("=" * 70)
+    for m in MIGRATIONS:
+        estado = "⏳ pendiente" if m.version in pending else "✅ aplicada "
+        print(f"   {m.version:3}. {estado} | {m.description}")
+    print("=" * 70)
+
+
+def aplicar_migraciones():
+    """Aplica las migraciones pendientes con backup previo"""
+    pending = pending_migrations(db.engine)
+
+    if not pending:
+        print("\n✅ La base de datos ya está actualizada")
+        return
+
+    backup_path = backup_database(db.engine)
+    if backup_path:
+        print(f"✅ Backup creado: {backup_path}")
+
+    try:
+        upgrade(db.engine)
+        print("\n✅ MIGRACIÓN COMPLETADA")
+    except Exception as e:
+        print(f"\n❌ Error durante la migración: {e}")
+        if backup_path:
+            print(f"💡 Puedes restaurar desde el backup: {backup_path}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    app = create_app()
+
+    with app.app_context():
+        print("\n" + "=" * 70)
+        print("🔄 MIGRACIONES DE LA BASE DE DATOS")
+        print("=" * 70)
+
+        if len(sys.argv) > 1 and sys.argv[1] == 'status':
+            mostrar_estado()
+        else:
+            mostrar_estado()
+            aplicar_migraciones()
@@ -1,12 +1,22 @@
 from app import create_app, db
 from app.models.models import User, Vehicle, MonthlyClient
+from app.occupancy import occupancy
+from app.monthly_cache import monthly_cache
+from app.plate_index import plate_index
+from app.migrations import ensure_schema
 import socket
 
 app = create_app()
 
-# Crear todas las tablas de la base de datos
+# Verificar la versión del esquema (aplica migraciones pendientes)
 with app.app_context():
-    db.create_all()
+    ensure_schema(db.engine)
+    
+    # Cargar en memoria los vehículos estacionados, los clientes mensuales
+    # y el índice de patentes para autocompletar
+    occupancy.rebuild()
+    monthly_cache.rebuild()
+    plate_index.rebuild()
 
 def get_local_ip():
     """Obtiene la IP local de la máquina"""
@@ -32,6 +32,17 @@ def main():
     success = test_printer_connection()
     print()
     
+    # Test 3: Reutilizar la conexión
+    if success and printer_service.keep_alive:
+        print("3. Probando reutilización de la conexión...")
+        print("   (Esto imprimirá un segundo ticket de prueba)")
+        test_printer_connection()
+        stats = printer_service.get_stats()
+        print(f"   - Conexiones nuevas: {stats['connections']} (conexión: {stats['avg_connect_ms']} ms)")
+        print(f"   - Conexiones reutilizadas: {stats['reused']}")
+        print(f"   - Último ticket: {stats['last_ticket_ms']} ms | Promedio: {stats['avg_ticket_ms']} ms")
+        print()
+    
     if success:
         print("✓ PRUEBA EXITOSA")
         print("  La impresora está conectada y funcionando correctamente.")